@@ -1,25 +1,95 @@
 from flask import Flask
 from flask_mongoengine import MongoEngine
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
-from app.routes.authRoutes import auth_bp
-from app.routes.clientRoutes import client_bp
-from app.routes.freelancerRoutes import freelancer_bp
+from flask_mongoengine.connection import create_connections
+from mongoengine import disconnect_all
+import logging
 import os  # Import os to generate a random secret key
 
-app = Flask(__name__)
-app.config['MONGODB_SETTINGS'] = {
-    'db': 'sureConnectPython',
-    'host': 'localhost',
-    'port': 27017
-}
-app.config['JWT_SECRET_KEY'] = os.urandom(24)  # Set a random JWT secret key
-app.secret_key = os.urandom(24)  # Set a random secret key for sessions
-
-db = MongoEngine(app)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
-
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(client_bp, url_prefix='/api/clients')
-app.register_blueprint(freelancer_bp, url_prefix='/api/freelancers')
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+db = MongoEngine()
+
+def mongodb_settings(config):
+    return {
+        'host': config['MONGO_URI'],
+        'maxPoolSize': config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': config['MONGO_MIN_POOL_SIZE'],
+        'maxIdleTimeMS': config['MONGO_MAX_IDLE_TIME_MS'],
+        'connectTimeoutMS': config['MONGO_CONNECT_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'socketTimeoutMS': config['MONGO_SOCKET_TIMEOUT_MS'],
+        'waitQueueTimeoutMS': config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'connect': False,  # no sockets or monitor threads until first use, so a pre-fork master stays clean
+    }
+
+def reconnect(app):
+    # MongoClient is not fork-safe: a forked worker drops the client it
+    # inherited and makes its own (see gunicorn.conf.py post_fork)
+    disconnect_all()
+    app.extensions['mongoengine'][db]['conn'] = create_connections(app.config)
+
+def create_app(config=None, web=True):
+    """Build the app from ``config`` (an object or import path; default $APP_CONFIG or config.Config).
+
+    FLASK_-prefixed environment variables override single keys, e.g.
+    FLASK_PASSWORD_POOL_WORKERS=4. Scripts and job workers pass ``web=False``
+    to skip the blueprints, JWT and request instrumentation, which are most
+    of the start-up time.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config or os.environ.get('APP_CONFIG', 'config.Config'))
+    app.config.from_prefixed_env()
+    if not app.config.get('SECRET_KEY'):
+        if app.config.get('SECRET_KEY_REQUIRED'):
+            raise RuntimeError("SECRET_KEY must be set; every worker has to sign sessions and tokens with the same key")
+        logger.warning("SECRET_KEY is not set; using a random per-process key (sessions and tokens won't survive a restart or span workers)")
+        app.config['SECRET_KEY'] = os.urandom(24)
+    if not app.config.get('JWT_SECRET_KEY'):
+        app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
+    app.config.setdefault('MONGODB_SETTINGS', mongodb_settings(app.config))
+
+    # Imported here so ``import app`` (models only) doesn't pay for every service
+    from app.services import passwords, uploads, search, matching, profile_cache, credits, marketplace, scheduler, profiling, metrics, jobs
+
+    if web:
+        metrics.init_app(app)  # before MongoEngine, so the client gets the command listener
+    db.init_app(app)
+    passwords.init_app(app)
+    uploads.init_app(app)
+    search.init_app(app)
+    matching.init_app(app)
+    profile_cache.init_app(app)
+    credits.init_app(app)
+    marketplace.init_app(app)
+    scheduler.init_app(app)
+    profiling.init_app(app)
+    jobs.load_handlers()  # register every job kind, whichever routes get imported
+    if not web:
+        return app
+
+    from flask_jwt_extended import JWTManager
+    from app.services import http_cache, pagination, thumbnails
+    from app.routes.authRoutes import auth_bp
+    from app.routes.clientRoutes import client_bp
+    from app.routes.freelancerRoutes import freelancer_bp
+    from app.routes.apiRoutes import api_bp
+
+    JWTManager(app)
+    http_cache.init_app(app)
+    app.add_template_global(thumbnails.photo_url)
+    app.add_template_global(pagination.next_page_url)
+
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(client_bp, url_prefix='/api/clients')
+    app.register_blueprint(freelancer_bp, url_prefix='/api/freelancers')
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+    return app
+
+def __getattr__(name):
+    # ``from app import app`` builds the web app on first use; importing the
+    # package for its models and services stays cheap
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,6 @@
 # app/models/agreement.py
 
-from mongoengine import Document, StringField, ReferenceField, DateTimeField, EnumField
+from mongoengine import Document, StringField, ReferenceField, DateTimeField, EnumField, IntField, BooleanField
 from datetime import datetime
 from enum import Enum
 
@@ -17,8 +17,24 @@ class Agreement(Document):
     client = ReferenceField('Client', required=True)  # Client involved in the agreement
     freelancer = ReferenceField('Freelancer', required=True)  # Freelancer involved in the agreement
     project = ReferenceField('Project', required=True)  # Project associated with the agreement
-    status = EnumField(AgreementStatus)  # Use the defined Enum
+    status = EnumField(AgreementStatus)  # Use the defined Enum; changed only through services/workflow.py
+    version = IntField(default=0)  # Bumped by every status change
+    expired_at = DateTimeField()  # Set when the scheduler terminated it unsigned
+    expiry_pending = BooleanField()  # Set until that expiry is logged
     created_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the agreement was created
     updated_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the agreement was updated
 
-    meta = {'collection': 'agreements'}
\ No newline at end of file
+    meta = {
+        'collection': 'agreements',
+        'indexes': [
+            # Paged newest first by _id
+            ('client', '-id'),
+            ('freelancer', '-id'),
+            'project',
+            # Scheduler (services/scheduler.py): agreements left Pending, and unlogged expiries
+            {'fields': ['created_at'], 'name': 'pending_by_age',
+             'partialFilterExpression': {'status': 'Pending'}},
+            {'fields': ['expired_at'], 'name': 'expiry_pending',
+             'partialFilterExpression': {'expiry_pending': True}},
+        ]
+    }
\ No newline at end of file
@@ -0,0 +1,18 @@
+# app/models/application.py
+
+from mongoengine import Document, ReferenceField, DateTimeField
+from datetime import datetime
+
+# A freelancer applying to a project; replaces Freelancer.applied_projects
+class Application(Document):
+    freelancer = ReferenceField('Freelancer', required=True)
+    project = ReferenceField('Project', required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'applications',
+        'indexes': [
+            {'fields': ['project', 'freelancer'], 'unique': True},
+            ('freelancer', '-id'),  # paged newest first
+        ]
+    }
@@ -1,6 +1,7 @@
 # app/models/client.py
 
-from mongoengine import Document, StringField, ListField, ReferenceField, IntField, EmbeddedDocumentField, EmbeddedDocument
+from mongoengine import Document, StringField, IntField, EmbeddedDocumentField, EmbeddedDocument, DictField, DateTimeField, ListField
+from datetime import datetime
 
 class Location(EmbeddedDocument):
     city = StringField()
@@ -14,18 +15,26 @@ class Client(Document):
     username = StringField(required=True, unique=True)
     company_name = StringField()
     profile_photo = StringField()  # Image URL
+    photo_variants = DictField()  # Resized copies of profile_photo, filled in by the thumbnail worker
     email = StringField(required=True, unique=True)
     password = StringField(required=True)
     location = EmbeddedDocumentField(Location)
     category = StringField()  # Industry category
     description = StringField()
-    credits = IntField(default=0)  # Platform credits
-    projects = ListField(ReferenceField('Project'))
-    reviews = ListField(ReferenceField('Review'))
+    credits = IntField(default=0)  # Platform credits; only changed through app/services/credits.py
+    pending_credits = ListField(DictField())  # In-flight ledger entries, normally empty
     phone_number = StringField()
     instagram_link = StringField()
     linkedin_link = StringField()
-    transaction_history = ListField(ReferenceField('Transaction'))
-    agreements = ListField(ReferenceField('Agreement'))
+    updated_at = DateTimeField(default=datetime.utcnow)  # Bumped on every profile change
+    # Projects, reviews written, transactions and agreements live in their own
+    # collections, keyed back to the client (see app/services/relations.py)
 
-    meta = {'collection': 'clients'}
\ No newline at end of file
+    meta = {
+        'collection': 'clients',
+        'strict': False,  # tolerate the old reference arrays until migrate_relations.py has run
+    }
+
+# Fields shown on listing cards; never includes reference lists or the password hash
+CLIENT_LISTING_FIELDS = ('id', 'first_name', 'last_name', 'username', 'company_name',
+                         'profile_photo', 'photo_variants', 'location', 'category', 'updated_at')
\ No newline at end of file
@@ -0,0 +1,19 @@
+# app/models/counters.py
+
+from mongoengine import Document, StringField, IntField, ObjectIdField
+
+# Per-account project counters for dashboards, one document per client or
+# freelancer (_id is the profile id). Maintained with $inc by
+# app/services/workflow.py; rebuilt from the projects by rebuild_counters.py.
+class ActivityCounters(Document):
+    id = ObjectIdField(primary_key=True)
+    role = StringField(choices=["client", "freelancer"])
+    open = IntField(default=0)
+    in_progress = IntField(default=0)
+    completed = IntField(default=0)
+    cancelled = IntField(default=0)
+    earnings = IntField(default=0)  # Freelancers: budgets of completed projects
+
+    meta = {
+        'collection': 'activity_counters',
+    }
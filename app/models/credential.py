@@ -0,0 +1,19 @@
+# app/models/credential.py
+
+from mongoengine import Document, StringField, ObjectIdField
+
+# One document per login email, kept in sync by the auth and profile routes so
+# login resolves an email with a single indexed query instead of loading both
+# the Client and Freelancer profiles.
+class Credential(Document):
+    email = StringField(required=True, unique=True)
+    role = StringField(required=True, choices=["client", "freelancer"])
+    user_id = ObjectIdField(required=True)
+    password = StringField(required=True)  # bcrypt hash, mirrors the profile's password
+
+    meta = {
+        'collection': 'credentials',
+        'indexes': [
+            'user_id',
+        ]
+    }
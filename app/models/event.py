@@ -0,0 +1,23 @@
+# app/models/event.py
+
+from mongoengine import Document, StringField, ObjectIdField
+
+# One status change of a project or agreement, appended by
+# app/services/workflow.py. Short stored names keep the log compact; the
+# time is the _id's timestamp.
+class StatusEvent(Document):
+    entity = ObjectIdField(required=True, db_field='e')  # Project or Agreement id
+    kind = StringField(required=True, choices=["project", "agreement"], db_field='k')
+    from_status = StringField(db_field='f')  # None when the entity was created
+    to_status = StringField(db_field='t')  # None when the entity was deleted
+    actor = ObjectIdField(db_field='a')  # Who made the change, when known
+    key = StringField(db_field='u')  # Set by replayable writers (the scheduler); logged at most once
+
+    meta = {
+        'collection': 'status_events',
+        'indexes': [
+            ('entity', '-id'),  # history of one project / agreement, newest first
+            {'fields': ['key'], 'unique': True, 'name': 'event_key',
+             'partialFilterExpression': {'u': {'$type': 'string'}}},
+        ]
+    }
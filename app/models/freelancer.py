@@ -1,8 +1,20 @@
 # app/models/freelancer.py
 
-from mongoengine import Document, StringField, ListField, ReferenceField, IntField, EmbeddedDocumentField
+from mongoengine import Document, EmbeddedDocument, StringField, ListField, IntField, EmbeddedDocumentField, DictField, DateTimeField
+from datetime import datetime
 from app.models.client import Location  # Ensure you import Location if it's defined in client.py
 
+class RatingSummary(EmbeddedDocument):
+    # Maintained by app/services/ratings.py; never computed from the reviews list
+    count = IntField(default=0)
+    total = IntField(default=0)  # Sum of all star ratings
+    histogram = DictField(default=lambda: {str(star): 0 for star in range(1, 6)})  # "1".."5" -> count
+    last_review_at = DateTimeField()
+
+    @property
+    def mean(self):
+        return round(self.total / self.count, 2) if self.count else None
+
 class Freelancer(Document):
     first_name = StringField(required=True)
     last_name = StringField(required=True)
@@ -10,18 +22,32 @@ class Freelancer(Document):
     email = StringField(required=True, unique=True)
     password = StringField(required=True)
     profile_photo = StringField()  # Image URL
+    photo_variants = DictField()  # Resized copies of profile_photo, filled in by the thumbnail worker
     location = EmbeddedDocumentField(Location)  # Ensure Location is defined and imported
     experience = StringField()  # Years of experience
-    reviews = ListField(ReferenceField('Review'))
+    rating = EmbeddedDocumentField(RatingSummary, default=RatingSummary)
     description = StringField()
-    credits = IntField(default=0)  # Platform credits
-    projects = ListField(ReferenceField('Project'))
+    credits = IntField(default=0)  # Platform credits; only changed through app/services/credits.py
+    pending_credits = ListField(DictField())  # In-flight ledger entries, normally empty
     phone_number = StringField()
     instagram_link = StringField()
     linkedin_link = StringField()
     skills = ListField(StringField())  # List of skills
-    applied_projects = ListField(ReferenceField('Project'))
     earnings = IntField(default=0)
-    transaction_history = ListField(ReferenceField('Transaction'))
+    updated_at = DateTimeField(default=datetime.utcnow)  # Bumped on every profile change
+
+    # Reviews, projects, applications and transactions live in their own
+    # collections, keyed back to the freelancer (see app/services/relations.py)
+
+    meta = {
+        'collection': 'freelancers',
+        'strict': False,  # tolerate the old reference arrays until migrate_relations.py has run
+        'indexes': [
+            'skills',  # multikey
+            'updated_at',
+        ]
+    }
 
-    meta = {'collection': 'freelancers'}
\ No newline at end of file
+# Fields shown on listing cards; never includes reference lists or the password hash
+FREELANCER_LISTING_FIELDS = ('id', 'first_name', 'last_name', 'username', 'profile_photo',
+                             'photo_variants', 'location', 'experience', 'skills', 'rating', 'updated_at')
\ No newline at end of file
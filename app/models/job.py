@@ -0,0 +1,31 @@
+# app/models/job.py
+
+from mongoengine import Document, StringField, DictField, IntField, DateTimeField
+from datetime import datetime
+
+# A unit of background work picked up by worker.py
+class Job(Document):
+    kind = StringField(required=True)  # Name of the registered handler
+    payload = DictField()
+    status = StringField(choices=["queued", "running", "done", "failed"], default="queued")
+    attempts = IntField(default=0)
+    error = StringField()  # Last failure message
+    run_after = DateTimeField(default=datetime.utcnow)  # Not picked up before this time
+    locked_until = DateTimeField()  # Lease held by the worker running the job
+    lease_owner = StringField()  # Token of the claim holding the lease
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'jobs',
+        'indexes': [
+            ('status', 'run_after'),
+            ('status', 'locked_until'),
+            # Finished jobs are only kept around for a week
+            {'fields': ['updated_at'], 'name': 'done_ttl', 'expireAfterSeconds': 7 * 24 * 3600,
+             'partialFilterExpression': {'status': 'done'}},
+            # and failed ones for a month, long enough to look into them
+            {'fields': ['updated_at'], 'name': 'failed_ttl', 'expireAfterSeconds': 30 * 24 * 3600,
+             'partialFilterExpression': {'status': 'failed'}},
+        ]
+    }
@@ -0,0 +1,16 @@
+# app/models/lease.py
+
+from mongoengine import Document, StringField, DateTimeField
+
+# A named lease held by one process at a time, e.g. the scheduler. Taken and
+# renewed with a conditional update in app/services/scheduler.py; a holder
+# that stops renewing loses it once expires_at passes.
+class Lease(Document):
+    id = StringField(primary_key=True)  # Lease name
+    owner = StringField()  # host:pid:random of the holder
+    expires_at = DateTimeField()
+    renewed_at = DateTimeField()
+
+    meta = {
+        'collection': 'leases',
+    }
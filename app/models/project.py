@@ -1,6 +1,6 @@
 # app/models/project.py
 
-from mongoengine import Document, StringField, ListField, ReferenceField, IntField, DateTimeField
+from mongoengine import Document, StringField, ListField, ReferenceField, IntField, DateTimeField, BooleanField
 from datetime import datetime
 
 class Project(Document):
@@ -14,7 +14,39 @@ class Project(Document):
     assigned_freelancer = ReferenceField('Freelancer')
     reviews = ListField(ReferenceField('Review'))
     agreement = ReferenceField('Agreement')
+    agreement_pending = BooleanField()  # Set until the assignment's Agreement is written
+    expired_at = DateTimeField()  # Set when the scheduler cancelled it past its deadline
+    expiry_pending = BooleanField()  # Set until that expiry is logged and counted
+    version = IntField(default=0)  # Bumped by every status change; compare-and-set guard (services/assignments.py)
     created_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the project was created
     updated_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the project was updated
 
-    meta = {'collection': 'projects'}
\ No newline at end of file
+    meta = {
+        'collection': 'projects',
+        'indexes': [
+            # Child lists of a profile, paged newest first by _id
+            ('client', '-id'),
+            ('assigned_freelancer', '-id'),
+            ('status', '-created_at'),
+            # Assignments whose agreement write may not have happened; see assignments.repair()
+            {'fields': ['updated_at'], 'name': 'agreement_pending',
+             'partialFilterExpression': {'agreement_pending': True}},
+            # Scheduler (services/scheduler.py): due, unlogged and archivable expiries
+            {'fields': ['deadline'], 'name': 'open_by_deadline',
+             'partialFilterExpression': {'status': 'Open'}},
+            {'fields': ['expired_at'], 'name': 'expiry_pending',
+             'partialFilterExpression': {'expiry_pending': True}},
+            {'fields': ['expired_at'], 'name': 'expired',
+             'partialFilterExpression': {'expired_at': {'$exists': True}}},
+            # Marketplace feed (services/marketplace.py): one per sort, keyset on (key, _id).
+            # Open projects are the hot subset; the partial filter keeps these small
+            {'fields': ['-id'], 'name': 'open_feed_recent',
+             'partialFilterExpression': {'status': 'Open'}},
+            {'fields': ['categories', '-id'], 'name': 'open_feed_category_recent',
+             'partialFilterExpression': {'status': 'Open'}},
+            {'fields': ['-budget', '-id'], 'name': 'open_feed_budget',
+             'partialFilterExpression': {'status': 'Open'}},
+            {'fields': ['categories', '-budget', '-id'], 'name': 'open_feed_category_budget',
+             'partialFilterExpression': {'status': 'Open'}},
+        ]
+    }
\ No newline at end of file
@@ -18,4 +18,11 @@ class Review(Document):
     created_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the review was created
     updated_at = DateTimeField(default=datetime.utcnow)  # Timestamp for when the review was updated
 
-    meta = {'collection': 'reviews'}
\ No newline at end of file
+    meta = {
+        'collection': 'reviews',
+        'indexes': [
+            # Paged newest first by _id
+            ('freelancer', '-id'),
+            ('reviewer', '-id'),
+        ]
+    }
\ No newline at end of file
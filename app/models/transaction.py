@@ -0,0 +1,42 @@
+# app/models/transaction.py
+
+from mongoengine import Document, StringField, IntField, ObjectIdField, DateTimeField
+from datetime import datetime
+
+# One credit movement on a client or freelancer account. Written once by
+# app/services/credits.py and never updated; the running balance lives on
+# the profile's ``credits`` field.
+class Transaction(Document):
+    user = ObjectIdField(required=True)  # Client or Freelancer id
+    user_role = StringField(choices=["client", "freelancer"])
+    amount = IntField(required=True)  # Signed: positive credits, negative debits
+    kind = StringField(required=True)  # "referral", "project_post", "opening", ...
+    balance_after = IntField()  # Account balance right after this entry
+    idempotency_key = StringField()  # Client-supplied; a retried request replays the first result
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'transactions',
+        'indexes': [
+            ('user', '-id'),  # history, newest first
+            {'fields': ['user', 'idempotency_key'], 'unique': True, 'name': 'user_idempotency_key',
+             'partialFilterExpression': {'idempotency_key': {'$type': 'string'}}},
+        ]
+    }
+
+# Balance of an account as of ``through`` (the newest ledger _id included), so
+# a balance is the latest snapshot plus the entries after it
+class CreditSnapshot(Document):
+    user = ObjectIdField(required=True)
+    user_role = StringField(choices=["client", "freelancer"])
+    balance = IntField(required=True)
+    through = ObjectIdField(required=True)
+    taken_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'credit_snapshots',
+        'indexes': [
+            ('user', '-through'),
+            '-through',
+        ]
+    }
@@ -0,0 +1,138 @@
+# app/routes/apiRoutes.py
+#
+# Read-only JSON API, versioned under /api/v1. Records come from the read layer
+# (app/services/reads.py) and are encoded with msgspec (serialization.py);
+# lists are keyset-paginated like the HTML pages: {"items": [...], "next_cursor": ...}.
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import Blueprint, current_app, request
+from mongoengine import ValidationError
+from app.models.agreement import Agreement
+from app.models.client import Client, CLIENT_LISTING_FIELDS
+from app.models.freelancer import Freelancer, FREELANCER_LISTING_FIELDS
+from app.models.project import Project
+from app.models.review import Review
+from app.models.transaction import Transaction
+from app.services import marketplace, reads, serialization, workflow
+from app.services.pagination import InvalidCursor
+
+api_bp = Blueprint('api_v1', __name__)
+
+def _error(message, status):
+    return serialization.json_response({"error": message}, status)
+
+def _page(queryset, fields=None, newest_first=False):
+    items, next_cursor = reads.page(
+        queryset,
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit"),
+        fields=fields,
+        newest_first=newest_first
+    )
+    return serialization.json_response({"items": items, "next_cursor": next_cursor})
+
+def _one(model, object_id):
+    record = reads.first(model.objects(id=object_id))
+    if record is None:
+        return _error(f"{model.__name__} not found", 404)
+    return serialization.json_response(record)
+
+def _dashboard(model, object_id):
+    if reads.first(model.objects(id=object_id), fields=("id",)) is None:
+        return _error(f"{model.__name__} not found", 404)
+    return serialization.json_response(serialization.convert(workflow.counters(object_id), serialization.ActivityCounters))
+
+@api_bp.errorhandler(InvalidCursor)
+def _invalid_cursor(error):
+    return _error("Invalid page cursor", 400)
+
+@api_bp.errorhandler(ValidationError)
+@api_bp.errorhandler(InvalidId)
+def _invalid_id(error):
+    return _error("Invalid ID", 400)
+
+# GET: Clients, listing fields only
+@api_bp.route("/clients", methods=["GET"])
+def list_clients():
+    return _page(Client.objects, fields=CLIENT_LISTING_FIELDS)
+
+@api_bp.route("/clients/<client_id>", methods=["GET"])
+def get_client(client_id):
+    return _one(Client, client_id)
+
+# Project counts by status, from the activity counters
+@api_bp.route("/clients/<client_id>/dashboard", methods=["GET"])
+def client_dashboard(client_id):
+    return _dashboard(Client, client_id)
+
+@api_bp.route("/clients/<client_id>/projects", methods=["GET"])
+def client_projects(client_id):
+    return _page(Project.objects(client=client_id), newest_first=True)
+
+# Reviews written by the client
+@api_bp.route("/clients/<client_id>/reviews", methods=["GET"])
+def client_reviews(client_id):
+    return _page(Review.objects(reviewer=client_id), newest_first=True)
+
+@api_bp.route("/clients/<client_id>/agreements", methods=["GET"])
+def client_agreements(client_id):
+    return _page(Agreement.objects(client=client_id), newest_first=True)
+
+# Credit ledger, newest first
+@api_bp.route("/clients/<client_id>/transactions", methods=["GET"])
+def client_transactions(client_id):
+    return _page(Transaction.objects(user=client_id), newest_first=True)
+
+# GET: Freelancers, listing fields only
+@api_bp.route("/freelancers", methods=["GET"])
+def list_freelancers():
+    return _page(Freelancer.objects, fields=FREELANCER_LISTING_FIELDS)
+
+@api_bp.route("/freelancers/<freelancer_id>", methods=["GET"])
+def get_freelancer(freelancer_id):
+    return _one(Freelancer, freelancer_id)
+
+# Project counts by status and earnings from completed projects
+@api_bp.route("/freelancers/<freelancer_id>/dashboard", methods=["GET"])
+def freelancer_dashboard(freelancer_id):
+    return _dashboard(Freelancer, freelancer_id)
+
+@api_bp.route("/freelancers/<freelancer_id>/projects", methods=["GET"])
+def freelancer_projects(freelancer_id):
+    return _page(Project.objects(assigned_freelancer=freelancer_id), newest_first=True)
+
+@api_bp.route("/freelancers/<freelancer_id>/reviews", methods=["GET"])
+def freelancer_reviews(freelancer_id):
+    return _page(Review.objects(freelancer=freelancer_id), newest_first=True)
+
+@api_bp.route("/freelancers/<freelancer_id>/agreements", methods=["GET"])
+def freelancer_agreements(freelancer_id):
+    return _page(Agreement.objects(freelancer=freelancer_id), newest_first=True)
+
+@api_bp.route("/freelancers/<freelancer_id>/transactions", methods=["GET"])
+def freelancer_transactions(freelancer_id):
+    return _page(Transaction.objects(user=freelancer_id), newest_first=True)
+
+# Marketplace feed of open projects, card fields only; see services/marketplace.py
+@api_bp.route("/marketplace/projects", methods=["GET"])
+def marketplace_feed():
+    try:
+        filters = marketplace.parse_filters(request.args)
+    except marketplace.InvalidFilter as error:
+        return _error(str(error), 400)
+    body = marketplace.feed(filters, cursor=request.args.get("cursor"), limit=request.args.get("limit"))
+    return current_app.response_class(body, mimetype="application/json")
+
+@api_bp.route("/projects/<project_id>", methods=["GET"])
+def get_project(project_id):
+    return _one(Project, project_id)
+
+# Status changes, newest first
+@api_bp.route("/projects/<project_id>/history", methods=["GET"])
+def project_history(project_id):
+    return serialization.json_response({"items": workflow.history(workflow.PROJECT, ObjectId(project_id))})
+
+@api_bp.route("/agreements/<agreement_id>", methods=["GET"])
+def get_agreement(agreement_id):
+    return _one(Agreement, agreement_id)
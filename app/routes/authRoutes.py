@@ -1,24 +1,11 @@
-from flask import Blueprint, request, jsonify, render_template, redirect, flash, session, get_flashed_messages
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token
+from flask import Blueprint, request, jsonify, render_template, redirect, flash, session, get_flashed_messages, current_app
+from flask_jwt_extended import create_access_token
 from app.models.client import Client
 from app.models.freelancer import Freelancer
-import os
-from werkzeug.utils import secure_filename
+from app.services import credentials, passwords, thumbnails
+from app.services.uploads import allowed_file, store_upload
 
 auth_bp = Blueprint('auth', __name__)
-bcrypt = Bcrypt()
-jwt = JWTManager()
-
-# Set up upload folder
-UPLOAD_FOLDER = 'public/uploads/'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-
-# Ensure the upload folder exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # GET: Client Registration Page
 @auth_bp.route('/register/client', methods=['GET'])
@@ -35,10 +22,7 @@ def register_client():
 
     file = request.files['profilePhoto']
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-        profile_photo_url = f"/uploads/{filename}"
+        profile_photo_url = store_upload(file)
     else:
         profile_photo_url = ""
 
@@ -46,12 +30,11 @@ def register_client():
     email = data.get('email')
     password = data.get('password')
 
-    existing_client = Client.objects(email=email).first()
-    if existing_client:
+    if credentials.email_taken(email):
         flash("Email is already registered!", "error")
         return redirect("/auth/register/client")
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = passwords.hash_password(password)
 
     client = Client(
         email=email,
@@ -60,6 +43,14 @@ def register_client():
         **data
     )
     client.save()
+    try:
+        credentials.register("client", client)
+    except credentials.EmailTaken:
+        client.delete()
+        flash("Email is already registered!", "error")
+        return redirect("/auth/register/client")
+    if profile_photo_url:
+        thumbnails.enqueue_for("client", client.id)
 
     flash("Client registered successfully!", "success")
     return redirect("/auth/login")
@@ -79,10 +70,7 @@ def register_freelancer():
 
     file = request.files['profilePhoto']
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-        profile_photo_url = f"/uploads/{filename}"
+        profile_photo_url = store_upload(file)
     else:
         profile_photo_url = ""
 
@@ -90,12 +78,11 @@ def register_freelancer():
     email = data.get('email')
     password = data.get('password')
 
-    existing_freelancer = Freelancer.objects(email=email).first()
-    if existing_freelancer:
+    if credentials.email_taken(email):
         flash("Email is already registered!", "error")
         return redirect("/auth/register/freelancer")
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = passwords.hash_password(password)
 
     freelancer = Freelancer(
         email=email,
@@ -104,6 +91,14 @@ def register_freelancer():
         **data
     )
     freelancer.save()
+    try:
+        credentials.register("freelancer", freelancer)
+    except credentials.EmailTaken:
+        freelancer.delete()
+        flash("Email is already registered!", "error")
+        return redirect("/auth/register/freelancer")
+    if profile_photo_url:
+        thumbnails.enqueue_for("freelancer", freelancer.id)
 
     flash("Freelancer registered successfully!", "success")
     return redirect("/auth/login")
@@ -121,15 +116,21 @@ def login():
     email = data.get('email')
     password = data.get('password')
 
-    client = Client.objects(email=email).first()
-    freelancer = Freelancer.objects(email=email).first()
-
-    user = client if client else freelancer
-
-    if user and bcrypt.check_password_hash(user.password, password):
-        access_token = create_access_token(identity={'email': user.email, 'user_type': 'client' if client else 'freelancer'})
-        session['user_id'] = str(user.id)
-        session['role'] = 'client' if client else 'freelancer'
+    # One indexed, projected lookup; accounts not yet backfilled fall back to the profiles
+    account = credentials.lookup(email)
+    if account is None and current_app.config.get('CREDENTIAL_LEGACY_FALLBACK', True):
+        account = credentials.legacy_lookup(email)
+
+    if account and passwords.check_password(account[2], password):
+        role, user_id, password_hash = account
+        # Upgrade hashes made with a lower cost factor while we have the plain password
+        if passwords.needs_rehash(password_hash):
+            new_hash = passwords.hash_password(password)
+            credentials.PROFILE_MODELS[role].objects(id=user_id).update_one(set__password=new_hash)
+            credentials.sync(user_id, password=new_hash)
+        access_token = create_access_token(identity={'email': email, 'user_type': role})
+        session['user_id'] = str(user_id)
+        session['role'] = role
         flash("Login successful!", "success")
         return redirect("/")
 
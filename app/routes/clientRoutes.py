@@ -1,27 +1,83 @@
-from flask import Blueprint, render_template, request, jsonify
-from app.models.client import Client
+from flask import Blueprint, render_template, request, jsonify, current_app
+from app.models.client import Client, CLIENT_LISTING_FIELDS
 from app.models.project import Project
 from app.models.freelancer import Freelancer
-from mongoengine import DoesNotExist, Q  # Import Q for querying
+from app.models.review import Review
+from mongoengine import DoesNotExist
+from datetime import datetime
 from mongoengine import ValidationError
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.services.pagination import paginate, InvalidCursor
+from app.services import assignments, credentials, credits, passwords, search, matching, profile_cache, http_cache, serialization, reads, thumbnails, workflow
 
 client_bp = Blueprint('client', __name__)
 
+RECENT_ITEMS = 5  # child items shown inline on a profile page
+
+# ETag stamps: updated_at / id pairs for what each page shows, read with
+# projections, or from the profile cache when the page will render from it
+def _versions(cached, query):
+    docs = cached if cached is not None else query.only("id", "updated_at").as_pymongo()
+    return [(doc["_id"], doc.get("updated_at")) for doc in docs]
+
+def _listing_stamp():
+    clients, _ = paginate(Client.objects, cursor=request.args.get("cursor"),
+                          limit=request.args.get("limit"), fields=("id", "updated_at"), raw=True)
+    return [(client["_id"], client.get("updated_at")) for client in clients]
+
+def _edit_stamp(client_id):
+    profile = profile_cache.peek("client", client_id)
+    if profile is None:
+        profile = Client.objects(id=client_id).only("updated_at").as_pymongo().first()
+    return None if profile is None else [profile.get("updated_at")]
+
+def _profile_stamp(client_id):
+    stamp = _edit_stamp(client_id)
+    if stamp is None:
+        return None
+    return stamp + [
+        _versions(profile_cache.peek("client", client_id, "recent_projects"),
+                  Project.objects(client=client_id).order_by("-id").limit(RECENT_ITEMS)),
+        _versions(profile_cache.peek("client", client_id, "recent_reviews"),
+                  Review.objects(reviewer=client_id).order_by("-id").limit(RECENT_ITEMS)),
+    ]
+
 # GET: Show all clients
 @client_bp.route("/", methods=["GET"])
+@http_cache.conditional(_listing_stamp)
 def show_clients():
     try:
-        clients = Client.objects()
-        return render_template("clients/index.html", clients=clients, title="All Clients")
+        clients, next_cursor = reads.page(
+            Client.objects,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit"),
+            fields=CLIENT_LISTING_FIELDS
+        )
+        return render_template("clients/index.html", clients=clients, next_cursor=next_cursor, title="All Clients")
+    except InvalidCursor:
+        return render_template("clients/index.html", error="Invalid page cursor", title="All Clients")
     except Exception as e:
         return render_template("clients/index.html", error="Error fetching clients", title="All Clients")
 
 # GET: Show single client
 @client_bp.route("/<client_id>", methods=["GET"])
+@http_cache.conditional(_profile_stamp)
 def show_client(client_id):
     try:
-        client = Client.objects.get(id=client_id)
-        return render_template("clients/show.html", client=client, title=f"{client.first_name} {client.last_name}")
+        client = profile_cache.get_profile("client", client_id)
+        # Newest few of each; the full lists are paginated on their own pages
+        projects = serialization.convert_many(profile_cache.get_view_data(
+            "client", client_id, "recent_projects",
+            lambda: list(Project.objects(client=client_id).only("id", "title", "description", "updated_at")
+                         .order_by("-id").limit(RECENT_ITEMS).as_pymongo())
+        ), serialization.Project)
+        reviews = serialization.convert_many(profile_cache.get_view_data(
+            "client", client_id, "recent_reviews",
+            lambda: list(Review.objects(reviewer=client_id).only("id", "rating", "comment", "updated_at")
+                         .order_by("-id").limit(RECENT_ITEMS).as_pymongo())
+        ), serialization.Review)
+        return render_template("clients/show.html", client=client, projects=projects, reviews=reviews, title=f"{client.first_name} {client.last_name}")
     except DoesNotExist:
         return render_template("clients/show.html", error="Client not found", title="Client Not Found")
     except Exception as e:
@@ -29,9 +85,10 @@ def show_client(client_id):
 
 # GET: Client edit form
 @client_bp.route("/<client_id>/edit", methods=["GET"])
+@http_cache.conditional(_edit_stamp)
 def edit_client(client_id):
     try:
-        client = Client.objects.get(id=client_id)
+        client = profile_cache.get_profile("client", client_id)
         return render_template("clients/edit.html", client=client, title="Edit Client")
     except DoesNotExist:
         return render_template("clients/edit.html", error="Client not found", title="Edit Client")
@@ -41,10 +98,24 @@ def edit_client(client_id):
 # PUT: Update client details
 @client_bp.route("/<client_id>", methods=["PUT"])
 def update_client(client_id):
+    data = request.form.to_dict()
+    # Balances only move through the credit ledger
+    data.pop("credits", None)
+    data.pop("pending_credits", None)
+    data.pop("photo_variants", None)  # written by the thumbnails job only
+    if data.get("password"):
+        data["password"] = passwords.hash_password(data["password"])
+    data["updated_at"] = datetime.utcnow()
     try:
-        data = request.form
         updated_client = Client.objects.get(id=client_id)
+        photo_changed = "profile_photo" in data and data["profile_photo"] != updated_client.profile_photo
+        if photo_changed:
+            data["unset__photo_variants"] = True  # the old photo's; photo_url falls back to the upload
         updated_client.update(**data)  # Update client details
+        credentials.sync(updated_client.id, email=data.get("email"), password=data.get("password"))
+        if photo_changed and data["profile_photo"]:
+            thumbnails.enqueue_for("client", updated_client.id)
+        profile_cache.invalidate("client", client_id)
         return render_template("clients/show.html", client=updated_client, title=f"{updated_client.first_name} {updated_client.last_name}")
     except DoesNotExist:
         return render_template("clients/show.html", error="Client not found", title="Client Not Found")
@@ -59,6 +130,8 @@ def delete_client(client_id):
     try:
         client = Client.objects.get(id=client_id)
         client.delete()
+        credentials.remove(client.id)
+        profile_cache.invalidate("client", client_id)
         return render_template("clients/index.html", message="Client deleted successfully", title="All Clients")
     except DoesNotExist:
         return render_template("clients/index.html", error="Client not found", title="All Clients")
@@ -69,8 +142,16 @@ def delete_client(client_id):
 @client_bp.route("/<client_id>/projects", methods=["GET"])
 def client_projects(client_id):
     try:
-        client = Client.objects.get(id=client_id).populate("projects")
-        return render_template("clients/projects.html", client=client, projects=client.projects, title=f"{client.first_name}'s Projects")
+        client = reads.get(Client.objects(id=client_id), fields=("id", "first_name", "last_name"))
+        projects, next_cursor = reads.page(
+            Project.objects(client=client_id),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit"),
+            newest_first=True
+        )
+        return render_template("clients/projects.html", client=client, projects=projects, next_cursor=next_cursor, title=f"{client.first_name}'s Projects")
+    except InvalidCursor:
+        return render_template("clients/projects.html", error="Invalid page cursor", title="Client Projects")
     except DoesNotExist:
         return render_template("clients/projects.html", error="Client not found", title="Client Projects")
     except Exception as e:
@@ -91,11 +172,11 @@ def add_project(client_id):
         if not data.get('projectName'):  # Example validation
             return render_template("clients/new-project.html", error="Project name is required", title="New Project")
 
-        new_project = Project(**data, client=client_id)
+        # Every project starts Open; later changes go through the workflow
+        new_project = Project(**{**data.to_dict(), "status": "Open"}, client=client_id)
         new_project.save()  # Save the new project
-
-        # Update the client's projects list
-        Client.objects.get(id =client_id).update(push__projects=new_project.id)
+        workflow.created(workflow.PROJECT, new_project.to_mongo(), actor=client_id)
+        profile_cache.invalidate("client", client_id)
 
         return render_template("clients/projects.html", message="Project added successfully", title=f"{new_project.client.first_name}'s Projects")
     except ValidationError as ve:
@@ -109,7 +190,7 @@ def add_project(client_id):
 @client_bp.route("/<client_id>/projects/<project_id>/edit", methods=["GET"])
 def edit_project_form(client_id, project_id):
     try:
-        project = Project.objects.get(id=project_id)
+        project = reads.get(Project.objects(id=project_id))
         return render_template("clients/edit-project.html", project=project, client_id=client_id)
     except DoesNotExist:
         return render_template("clients/edit-project.html", error="Project not found", title="Edit Project")
@@ -121,10 +202,21 @@ def edit_project_form(client_id, project_id):
 def update_project(client_id, project_id):
     try:
         data = request.form
-        Project.objects.get(id=project_id).update(**data)
+        status = data.get("status")
+        project = Project.objects.get(id=project_id, client=client_id)
+        if status and status != project.status:
+            if status not in workflow.EDITABLE_STATUSES["client"]:
+                raise workflow.InvalidTransition(f"A client can't set a project to {status}")
+            workflow.transition(workflow.PROJECT, project_id, status, actor=client_id,
+                                match={"client": ObjectId(client_id)})
+        fields = {field: data[field] for field in workflow.EDITABLE_PROJECT_FIELDS if field in data}
+        project.update(**fields, updated_at=datetime.utcnow())
+        profile_cache.invalidate("client", client_id)
         return render_template("clients/projects.html", message="Project updated successfully", title=f"{Client.objects.get(id=client_id).first_name}'s Projects")
-    except DoesNotExist:
+    except (DoesNotExist, workflow.NotFound):
         return render_template("clients/projects.html", error="Project not found", title="Client Projects")
+    except workflow.InvalidTransition as error:
+        return render_template("clients/projects.html", error=str(error), title="Client Projects")
     except Exception as e:
         return render_template("clients/projects.html", error="Error updating project", title="Client Projects")
 
@@ -132,7 +224,12 @@ def update_project(client_id, project_id):
 @client_bp.route("/<client_id>/projects/<project_id>", methods=["DELETE"])
 def delete_project(client_id, project_id):
     try:
-        Project.objects.get(id=project_id).delete()
+        project = Project.objects(id=project_id, client=client_id).modify(remove=True)
+        if project is None:
+            raise DoesNotExist
+        workflow.removed(workflow.PROJECT, project.to_mongo(), actor=client_id)
+        profile_cache.invalidate("client", client_id)
+        profile_cache.invalidate("freelancer", project.to_mongo().get("assigned_freelancer"))
         return render_template("clients/projects.html", message="Project deleted successfully", title=f"{Client.objects.get(id=client_id).first_name}'s Projects")
     except DoesNotExist:
         return render_template("clients/projects.html", error="Project not found", title="Client Projects")
@@ -143,46 +240,112 @@ def delete_project(client_id, project_id):
 @client_bp.route("/<client_id>/projects/<project_id>/assign-freelancer", methods=["POST"])
 def assign_freelancer(client_id, project_id):
     freelancer_id = request.form.get("freelancerId")
-    if not ObjectId.is_valid(project_id):
-        return jsonify({"error": "Invalid Project ID"}), 400
+    if not all(ObjectId.is_valid(value) for value in (client_id, project_id, freelancer_id)):
+        return jsonify({"error": "Invalid ID"}), 400
 
     try:
-        project = Project.objects.get(id=project_id)
-        project.update(assignedFreelancer=freelancer_id)
-        return jsonify({"message": "Freelancer assigned successfully", "project": project}), 200
-    except DoesNotExist:
-        return jsonify({"error": "Project not found"}), 404
+        project, agreement = assignments.assign(client_id, project_id, freelancer_id,
+                                                expected_version=request.form.get("version", type=int))
+        return serialization.json_response({
+            "message": "Freelancer assigned successfully",
+            "project": serialization.convert(project, serialization.Project),
+            "agreement": agreement and serialization.convert(agreement, serialization.Agreement)
+        })
+    except (assignments.ProjectNotFound, assignments.FreelancerNotFound) as error:
+        return jsonify({"error": str(error)}), 404
+    except assignments.AssignmentConflict as error:
+        return serialization.json_response({
+            "error": str(error),
+            "project": error.project and serialization.convert(error.project, serialization.Project)
+        }, 409)
     except Exception as e:
         return jsonify({"error": "Error assigning freelancer"}), 500
 
 # Route to search freelancers
 @client_bp.route("/freelancers/search", methods=["GET"])
 def search_freelancers():
-    query = request.args.get("q")
+    query = request.args.get("q", "")
+    page = max(request.args.get("page", 1, type=int), 1)
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 50)
     try:
-        freelancers = Freelancer.objects(
-            Q(firstName__icontains=query) | Q(lastName__icontains=query)
-        ).only("id", "firstName", "lastName")
-        return jsonify(freelancers), 200
+        results, total = search.search_freelancers(query, offset=(page - 1) * limit, limit=limit)
+        return jsonify({
+            "results": [{
+                "_id": doc["_id"],
+                "firstName": doc["first_name"],
+                "lastName": doc["last_name"],
+                "skills": doc["skills"] or [],
+                "profilePhoto": doc["profile_photo"],
+            } for doc in results],
+            "total": total,
+            "nextPage": page + 1 if page * limit < total else None
+        }), 200
     except Exception as e:
         return jsonify({"error": "Error fetching freelancers"}), 500
 
+# GET: Best-matching freelancers for a client's project
+@client_bp.route("/<client_id>/projects/<project_id>/matches", methods=["GET"])
+def project_matches(client_id, project_id):
+    k = min(max(request.args.get("k", 10, type=int), 1), 100)
+    try:
+        project = Project.objects(id=project_id, client=client_id).only("categories").as_pymongo().first()
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        client = Client.objects(id=client_id).only("location").as_pymongo().first() or {}
+
+        matches = matching.match_freelancers(project.get("categories"), k=k, location=client.get("location"))
+        return jsonify([{
+            "_id": record["_id"],
+            "firstName": record["first_name"],
+            "lastName": record["last_name"],
+            "skills": record["skills"] or [],
+            "profilePhoto": record["profile_photo"],
+            "score": round(score, 4),
+            "breakdown": breakdown
+        } for score, breakdown, record in matches]), 200
+    except ValidationError:
+        return jsonify({"error": "Invalid ID"}), 400
+    except Exception as e:
+        return jsonify({"error": "Error matching freelancers"}), 500
+
+# Ledger row as JSON; ``row`` is the original one when a retried request is replayed
+def _credit_response(message, row):
+    return serialization.json_response({
+        "message": message,
+        "transaction": serialization.convert(row, serialization.Transaction)
+    })
+
+# What a credit request can get wrong; anything else is ours and stays a 500
+CREDIT_ERRORS = (credits.AccountNotFound, credits.RequestInProgress, credits.InsufficientCredits, InvalidId, ValueError)
+
+def _credit_error(error):
+    if isinstance(error, credits.AccountNotFound):
+        return jsonify({"error": "Client not found"}), 404
+    if isinstance(error, credits.RequestInProgress):
+        return jsonify({"error": str(error)}), 409
+    if isinstance(error, InvalidId):
+        return jsonify({"error": "Invalid ID"}), 400
+    return jsonify({"error": str(error)}), 400  # InsufficientCredits, or a non-positive amount
+
 # Route to earn referral credits
 @client_bp.route("/<client_id>/earn-referral-credits", methods=["POST"])
 def earn_referral_credits(client_id):
     try:
-        CreditService.earnReferralCreditsForClient(client_id)
-        return jsonify({"message": "Referral credits earned successfully."}), 200
-    except Exception as error:
-        return jsonify({"error": str(error)}), 400
+        row = credits.credit("client", client_id, current_app.config["CREDITS_REFERRAL_BONUS"], "referral",
+                             idempotency_key=request.headers.get("Idempotency-Key"))
+        return _credit_response("Referral credits earned successfully.", row)
+    except CREDIT_ERRORS as error:
+        return _credit_error(error)
 
 # Route to post a project
 @client_bp.route("/<client_id>/post-project", methods=["POST"])
 def post_project(client_id):
-    project_cost = request.form.get("projectCost")
+    project_cost = request.form.get("projectCost", type=int)
+    if project_cost is None:
+        return jsonify({"error": "projectCost must be a whole number of credits"}), 400
     try:
-        CreditService.postProject(client_id, project_cost)
-        return jsonify({"message": "Project posted successfully."}), 200
-    except Exception as error:
-        return jsonify({"error": str(error)}), 400
-
+        row = credits.debit("client", client_id, project_cost, "project_post",
+                            idempotency_key=request.headers.get("Idempotency-Key"))
+        return _credit_response("Project posted successfully.", row)
+    except CREDIT_ERRORS as error:
+        return _credit_error(error)
@@ -1,29 +1,84 @@
 # app/routes/freelancerRoutes.py
 
 from flask import Blueprint, render_template, request, redirect, flash, jsonify
-from app.models.freelancer import Freelancer
+from app.models.freelancer import Freelancer, FREELANCER_LISTING_FIELDS
 from app.models.project import Project
 from app.models.review import Review
+from app.models.client import Client
 from mongoengine import DoesNotExist
+from datetime import datetime
+from bson import ObjectId
+from app.services.pagination import paginate, InvalidCursor
+from app.services import credentials, passwords, profile_index, ratings, profile_cache, http_cache, serialization, reads, thumbnails, workflow
 
 freelancer_bp = Blueprint('freelancer', __name__)
 
+RECENT_ITEMS = 5  # child items shown inline on a profile page
+
+# ETag stamps: updated_at / id pairs for what each page shows, read with
+# projections, or from the profile cache when the page will render from it
+def _versions(cached, query):
+    docs = cached if cached is not None else query.only("id", "updated_at").as_pymongo()
+    return [(doc["_id"], doc.get("updated_at")) for doc in docs]
+
+def _listing_stamp():
+    freelancers, _ = paginate(Freelancer.objects, cursor=request.args.get("cursor"),
+                              limit=request.args.get("limit"), fields=("id", "updated_at"), raw=True)
+    return [(freelancer["_id"], freelancer.get("updated_at")) for freelancer in freelancers]
+
+def _edit_stamp(freelancer_id):
+    profile = profile_cache.peek("freelancer", freelancer_id)
+    if profile is None:
+        profile = Freelancer.objects(id=freelancer_id).only("updated_at").as_pymongo().first()
+    return None if profile is None else [profile.get("updated_at")]
+
+def _profile_stamp(freelancer_id):
+    stamp = _edit_stamp(freelancer_id)
+    if stamp is None:
+        return None
+    return stamp + [_versions(profile_cache.peek("freelancer", freelancer_id, "recent_projects"),
+                              Project.objects(assigned_freelancer=freelancer_id).order_by("-id").limit(RECENT_ITEMS))]
+
+def _reviews_stamp(freelancer_id):
+    stamp = _edit_stamp(freelancer_id)
+    if stamp is None:
+        return None
+    reviews, _ = paginate(Review.objects(freelancer=freelancer_id), cursor=request.args.get("cursor"),
+                          limit=request.args.get("limit"), fields=("id", "updated_at"), newest_first=True, raw=True)
+    return stamp + [[(review["_id"], review.get("updated_at")) for review in reviews]]
+
 # GET: Show all freelancers
 @freelancer_bp.route("/", methods=["GET"])
+@http_cache.conditional(_listing_stamp)
 def show_freelancers():
     try:
-        freelancers = Freelancer.objects()
-        return render_template("freelancers/index.html", freelancers=freelancers, title="All Freelancers")
+        freelancers, next_cursor = reads.page(
+            Freelancer.objects,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit"),
+            fields=FREELANCER_LISTING_FIELDS
+        )
+        return render_template("freelancers/index.html", freelancers=freelancers, next_cursor=next_cursor, title="All Freelancers")
+    except InvalidCursor:
+        flash("Invalid page cursor", "error")
+        return redirect("/api/freelancers")
     except Exception as e:
         flash("Error fetching freelancers", "error")
         return redirect("/")
 
 # GET: Show single freelancer
 @freelancer_bp.route("/<freelancer_id>", methods=["GET"])
+@http_cache.conditional(_profile_stamp)
 def show_freelancer(freelancer_id):
     try:
-        freelancer = Freelancer.objects.get(id=freelancer_id).populate("projects")
-        return render_template("freelancers/show.html", freelancer=freelancer, title=f"{freelancer.first_name} {freelancer.last_name}")
+        freelancer = profile_cache.get_profile("freelancer", freelancer_id)
+        # Newest few; the full list is paginated on the projects page
+        projects = serialization.convert_many(profile_cache.get_view_data(
+            "freelancer", freelancer_id, "recent_projects",
+            lambda: list(Project.objects(assigned_freelancer=freelancer_id).only("id", "title", "description", "updated_at")
+                         .order_by("-id").limit(RECENT_ITEMS).as_pymongo())
+        ), serialization.Project)
+        return render_template("freelancers/show.html", freelancer=freelancer, projects=projects, title=f"{freelancer.first_name} {freelancer.last_name}")
     except DoesNotExist:
         flash("Freelancer not found", "error")
         return redirect("/api/freelancers")
@@ -33,9 +88,10 @@ def show_freelancer(freelancer_id):
 
 # GET: Freelancer edit form
 @freelancer_bp.route("/<freelancer_id>/edit", methods=["GET"])
+@http_cache.conditional(_edit_stamp)
 def edit_freelancer(freelancer_id):
     try:
-        freelancer = Freelancer.objects.get(id=freelancer_id)
+        freelancer = profile_cache.get_profile("freelancer", freelancer_id)
         return render_template("freelancers/edit.html", freelancer=freelancer, title="Edit Freelancer")
     except DoesNotExist:
         flash("Freelancer not found", "error")
@@ -59,8 +115,9 @@ def update_freelancer(freelancer_id):
             "description": data.get("description"),
             "phone_number": data.get("phoneNumber"),
             "instagram_link": data.get("instagramLink"),
-            "linkedIn_link": data.get("linkedInLink"),
+            "linkedin_link": data.get("linkedInLink"),
             "skills": data.get("skills"),
+            "updated_at": datetime.utcnow(),
             "location": {
                 "city": data.get("city"),
                 "state": data.get("state"),
@@ -71,17 +128,27 @@ def update_freelancer(freelancer_id):
 
         # Only update the password if it is provided
         if data.get("password"):
-            update_data["password"] = data.get("password")  # Ensure to hash the password if needed
+            update_data["password"] = passwords.hash_password(data.get("password"))
 
         # Updating the freelancer details
         freelancer = Freelancer.objects.get(id=freelancer_id)
+        photo_changed = update_data["profile_photo"] != freelancer.profile_photo
+        if photo_changed:
+            update_data["unset__photo_variants"] = True  # the old photo's; photo_url falls back to the upload
         freelancer.update(**update_data)
+        credentials.sync(freelancer.id, email=update_data["email"], password=update_data.get("password"))
+        if photo_changed and update_data["profile_photo"]:
+            thumbnails.enqueue_for("freelancer", freelancer.id)
+        profile_index.reindex(freelancer.id)
+        profile_cache.invalidate("freelancer", freelancer_id)
 
         flash("Freelancer updated successfully", "success")
         return redirect(f"/api/freelancers/{freelancer_id}")
     except DoesNotExist:
         flash("Freelancer not found", "error")
         return redirect("/api/freelancers")
+    except passwords.PasswordServiceBusy:
+        raise
     except Exception as e:
         flash("Error updating freelancer details", "error")
         return redirect("/api/freelancers")
@@ -92,6 +159,8 @@ def delete_freelancer(freelancer_id):
     try:
         freelancer = Freelancer.objects.get(id=freelancer_id)
         freelancer.delete()
+        credentials.remove(freelancer.id)
+        profile_cache.invalidate("freelancer", freelancer_id)
         flash("Freelancer deleted successfully", "success")
         return redirect("/api/freelancers")
     except DoesNotExist:
@@ -105,8 +174,17 @@ def delete_freelancer(freelancer_id):
 @freelancer_bp.route("/<freelancer_id>/projects", methods=["GET"])
 def freelancer_projects(freelancer_id):
     try:
-        freelancer = Freelancer.objects.get(id=freelancer_id).populate("projects")
-        return render_template("freelancers/projects.html", freelancer=freelancer, projects=freelancer.projects, title=f"{freelancer.first_name}'s Projects")
+        freelancer = reads.get(Freelancer.objects(id=freelancer_id), fields=("id", "first_name", "last_name"))
+        projects, next_cursor = reads.page(
+            Project.objects(assigned_freelancer=freelancer_id),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit"),
+            newest_first=True
+        )
+        return render_template("freelancers/projects.html", freelancer=freelancer, projects=projects, next_cursor=next_cursor, title=f"{freelancer.first_name}'s Projects")
+    except InvalidCursor:
+        flash("Invalid page cursor", "error")
+        return redirect(f"/api/freelancers/{freelancer_id}/projects")
     except DoesNotExist:
         flash("Freelancer not found", "error")
         return redirect("/api/freelancers")
@@ -129,13 +207,12 @@ def add_project(freelancer_id):
             description=data.get("description"),
             budget=data.get("budget"),
             deadline=data.get("deadline"),  # Ensure this is a valid date
-            status=data.get("status"),
-            freelancer=freelancer_id
+            status="Open",  # later changes go through the workflow
+            assigned_freelancer=freelancer_id
         )
         new_project.save()
-
-        # Update the freelancer's projects array
-        Freelancer.objects.get(id=freelancer_id).update(push__projects=new_project.id)
+        workflow.created(workflow.PROJECT, new_project.to_mongo(), actor=freelancer_id)
+        profile_cache.invalidate("freelancer", freelancer_id)
 
         return redirect(f"/api/freelancers/{freelancer_id}/projects")
     except Exception as e:
@@ -146,7 +223,7 @@ def add_project(freelancer_id):
 @freelancer_bp.route("/<freelancer_id>/projects/<project_id>/edit", methods=["GET"])
 def edit_project_form(freelancer_id, project_id):
     try:
-        project = Project.objects.get(id=project_id)
+        project = reads.get(Project.objects(id=project_id))
         return render_template("freelancers/edit-project.html", project=project, freelancer_id=freelancer_id)
     except DoesNotExist:
         flash("Project not found", "error")
@@ -160,17 +237,23 @@ def edit_project_form(freelancer_id, project_id):
 def update_project(freelancer_id, project_id):
     try:
         data = request.form
-        Project.objects.get(id=project_id).update(
-            title=data.get("title"),
-            description=data.get("description"),
-            budget=data.get("budget"),
-            deadline=data.get("deadline"),
-            status=data.get("status")
-        )
+        project = Project.objects.get(id=project_id, assigned_freelancer=freelancer_id)
+        status = data.get("status")
+        if status and status != project.status:
+            if status not in workflow.EDITABLE_STATUSES["freelancer"]:
+                raise workflow.InvalidTransition(f"A freelancer can't set a project to {status}")
+            workflow.transition(workflow.PROJECT, project_id, status, actor=freelancer_id,
+                                match={"assigned_freelancer": ObjectId(freelancer_id)})
+        fields = {field: data[field] for field in workflow.EDITABLE_PROJECT_FIELDS if field in data}
+        project.update(**fields, updated_at=datetime.utcnow())
+        profile_cache.invalidate("freelancer", freelancer_id)
         return redirect(f"/api/freelancers/{freelancer_id}/projects")
-    except DoesNotExist:
+    except (DoesNotExist, workflow.NotFound):
         flash("Project not found", "error")
         return redirect(f"/api/freelancers/{freelancer_id}/projects/{project_id}/edit")
+    except workflow.InvalidTransition as error:
+        flash(str(error), "error")
+        return redirect(f"/api/freelancers/{freelancer_id}/projects/{project_id}/edit")
     except Exception as e:
         flash("Error updating project", "error")
         return redirect(f"/api/freelancers/{freelancer_id}/projects/{project_id}/edit")
@@ -179,7 +262,12 @@ def update_project(freelancer_id, project_id):
 @freelancer_bp.route("/<freelancer_id>/projects/<project_id>", methods=["DELETE"])
 def delete_project(freelancer_id, project_id):
     try:
-        Project.objects.get(id=project_id).delete()
+        project = Project.objects(id=project_id, assigned_freelancer=freelancer_id).modify(remove=True)
+        if project is None:
+            raise DoesNotExist
+        workflow.removed(workflow.PROJECT, project.to_mongo(), actor=freelancer_id)
+        profile_cache.invalidate("freelancer", freelancer_id)
+        profile_cache.invalidate("client", project.to_mongo().get("client"))
         return redirect(f"/api/freelancers/{freelancer_id}/projects")
     except DoesNotExist:
         flash("Project not found", "error")
@@ -190,16 +278,21 @@ def delete_project(freelancer_id, project_id):
 
 # GET: Reviews for a specific freelancer
 @freelancer_bp.route("/<freelancer_id>/reviews", methods=["GET"])
+@http_cache.conditional(_reviews_stamp)
 def freelancer_reviews(freelancer_id):
     try:
-        freelancer = Freelancer.objects.get(id=freelancer_id).populate({
-            'path': 'reviews',
-            'populate': {
-                'path': 'reviewer',
-                'model': 'Client'
-            }
-        })
-        return render_template("freelancers/reviews.html", freelancer=freelancer, reviews=freelancer.reviews)
+        freelancer = reads.get(Freelancer.objects(id=freelancer_id), fields=("id", "first_name", "last_name", "rating"))
+        reviews, next_cursor = reads.page(
+            Review.objects(freelancer=freelancer_id),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit"),
+            newest_first=True
+        )
+        reads.attach(reviews, "reviewer", Client, fields=("id", "first_name", "last_name", "company_name", "profile_photo"))
+        return render_template("freelancers/reviews.html", freelancer=freelancer, reviews=reviews, next_cursor=next_cursor)
+    except InvalidCursor:
+        flash("Invalid page cursor", "error")
+        return redirect(f"/api/freelancers/{freelancer_id}/reviews")
     except DoesNotExist:
         flash("Freelancer not found", "error")
         return redirect("/api/freelancers")
@@ -213,18 +306,24 @@ def create_review(freelancer_id):
     try:
         data = request.form
         new_review = Review(
-            rating=data.get("rating"),
+            rating=ratings.parse_rating(data.get("rating")),
             comment=data.get("comment"),
             reviewer=request.user.id,  # Assuming user is logged in
             freelancer=freelancer_id
         )
         new_review.save()
 
-        # Update the freelancer's reviews array
-        Freelancer.objects.get(id=freelancer_id).update(push__reviews=new_review.id)
+        # Reviews are found through Review.freelancer; only the summary lives on the profile
+        ratings.apply(freelancer_id, added=new_review.rating, reviewed_at=new_review.created_at)
+        profile_index.reindex(freelancer_id)
+        profile_cache.invalidate("freelancer", freelancer_id)
+        profile_cache.invalidate("client", request.user.id)
 
         flash("Review submitted successfully", "success")
         return redirect(f"/api/freelancers/{freelancer_id}")
+    except ratings.InvalidRating as error:
+        flash(str(error), "error")
+        return redirect(f"/api/freelancers/{freelancer_id}")
     except Exception as e:
         flash("Error creating review", "error")
         return redirect(f"/api/freelancers/{freelancer_id}")
@@ -233,7 +332,7 @@ def create_review(freelancer_id):
 @freelancer_bp.route("/<freelancer_id>/reviews/<review_id>/edit", methods=["GET"])
 def edit_review_form(freelancer_id, review_id):
     try:
-        review = Review.objects.get(id=review_id)
+        review = reads.get(Review.objects(id=review_id))
         return render_template("freelancers/edit-review.html", review=review, freelancer_id=freelancer_id)
     except DoesNotExist:
         flash("Review not found", "error")
@@ -247,15 +346,27 @@ def edit_review_form(freelancer_id, review_id):
 def update_review(freelancer_id, review_id):
     try:
         data = request.form
-        Review.objects.get(id=review_id).update(
-            rating=data.get("rating"),
-            comment=data.get("comment")
+        rating = ratings.parse_rating(data.get("rating"))
+        # modify() hands back the review as it was, so the old rating comes off the summary
+        previous = Review.objects(id=review_id, freelancer=freelancer_id).modify(
+            set__rating=rating,
+            set__comment=data.get("comment"),
+            set__updated_at=datetime.utcnow()
         )
+        if previous is None:
+            raise DoesNotExist
+        ratings.apply(freelancer_id, added=rating, removed=previous.rating)
+        profile_index.reindex(freelancer_id)
+        profile_cache.invalidate("freelancer", freelancer_id)
+        profile_cache.invalidate("client", previous.to_mongo().get("reviewer"))  # raw id, no dereference
         flash("Review updated successfully", "success")
         return redirect(f"/api/freelancers/{freelancer_id}/reviews")
     except DoesNotExist:
         flash("Review not found", "error")
         return redirect(f"/api/freelancers/{freelancer_id}/reviews/{review_id}/edit")
+    except ratings.InvalidRating as error:
+        flash(str(error), "error")
+        return redirect(f"/api/freelancers/{freelancer_id}/reviews/{review_id}/edit")
     except Exception as e:
         flash("Error updating review", "error")
         return redirect(f"/api/freelancers/{freelancer_id}/reviews/{review_id}/edit")
@@ -264,8 +375,13 @@ def update_review(freelancer_id, review_id):
 @freelancer_bp.route("/<freelancer_id>/reviews/<review_id>", methods=["DELETE"])
 def delete_review(freelancer_id, review_id):
     try:
-        Review.objects.get(id=review_id).delete()
-        Freelancer.objects.get(id=freelancer_id).update(pull__reviews=review_id)
+        removed = Review.objects(id=review_id, freelancer=freelancer_id).modify(remove=True)
+        if removed is None:
+            raise DoesNotExist
+        ratings.apply(freelancer_id, removed=removed.rating)
+        profile_index.reindex(freelancer_id)
+        profile_cache.invalidate("freelancer", freelancer_id)
+        profile_cache.invalidate("client", removed.to_mongo().get("reviewer"))
         flash("Review deleted successfully", "success")
         return redirect(f"/api/freelancers/{freelancer_id}/reviews")
     except DoesNotExist:
@@ -0,0 +1,150 @@
+# app/services/assignments.py
+#
+# Assigning a freelancer to an open project.
+#
+# The project moves Open -> In Progress through the workflow state machine's
+# compare-and-set: the filter requires status "Open", no assignee and (when
+# the caller sends one) the version it last saw; the update sets the
+# assignee, the id of the agreement about to be written and
+# agreement_pending, and bumps ``version``. Of any number of racing requests
+# exactly one matches; the rest get a conflict. The Agreement is inserted
+# next, agreement_pending cleared, and only then is the change logged and
+# counted (workflow.commit).
+#
+# No multi-document transaction is needed: if the Agreement insert fails the
+# project is put back (compensation, guarded on the agreement id so a later
+# assignment is never undone), and if the process dies in between, repair()
+# writes the missing Agreement from the project. The scheduler runs it every
+# tick; the "assignments.repair" job does the same on demand.
+
+import logging
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.models.agreement import Agreement, AgreementStatus
+from app.models.freelancer import Freelancer
+from app.models.project import Project
+from app.services import jobs, profile_cache, workflow
+
+logger = logging.getLogger(__name__)
+
+# Pending assignments older than this belong to a dead request
+PENDING_GRACE = timedelta(minutes=1)
+
+class ProjectNotFound(Exception):
+    pass
+
+class FreelancerNotFound(Exception):
+    pass
+
+class AssignmentConflict(Exception):
+    """The project is no longer open, or changed since ``expected_version``."""
+
+    def __init__(self, message, project=None):
+        super().__init__(message)
+        self.project = project
+
+def _agreement(project, agreement_id, now):
+    return {
+        "_id": agreement_id,
+        "title": project.get("title") or "Project agreement",
+        "description": project.get("description"),
+        "client": project["client"],
+        "freelancer": project["assigned_freelancer"],
+        "project": project["_id"],
+        "status": AgreementStatus.ACTIVE.value,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def _touch(project):
+    profile_cache.invalidate("client", project.get("client"))
+    profile_cache.invalidate("freelancer", project.get("assigned_freelancer"))
+
+def assign(client_id, project_id, freelancer_id, expected_version=None):
+    """Assign ``freelancer_id`` to the client's open project.
+
+    Returns ``(project, agreement)`` as raw documents. Repeating a successful
+    assignment of the same freelancer returns the existing pair, so retries
+    are safe. ``expected_version`` (the ``version`` the caller last read)
+    turns a change since then into a conflict. Raises ProjectNotFound,
+    FreelancerNotFound or AssignmentConflict.
+    """
+    client_id, project_id, freelancer_id = ObjectId(client_id), ObjectId(project_id), ObjectId(freelancer_id)
+    if Freelancer.objects(id=freelancer_id).only("id").as_pymongo().first() is None:
+        raise FreelancerNotFound(f"No freelancer {freelancer_id}")
+
+    projects = Project._get_collection()
+    agreements = Agreement._get_collection()
+    agreement_id = ObjectId()
+    changed = workflow.begin(
+        workflow.PROJECT, project_id, "In Progress",
+        match={"client": client_id, "assigned_freelancer": None},
+        set_fields={"assigned_freelancer": freelancer_id, "agreement": agreement_id, "agreement_pending": True},
+        expected_version=expected_version,
+    )
+    if changed is None:
+        current = projects.find_one({"_id": project_id, "client": client_id})
+        if current is None:
+            raise ProjectNotFound(f"No project {project_id} for client {client_id}")
+        if current.get("assigned_freelancer") == freelancer_id and current.get("agreement"):
+            # A retry of an assignment that already went through; the agreement
+            # is None while the first request is still writing it
+            return current, agreements.find_one({"_id": current["agreement"]})
+        if current.get("status") != "Open" or current.get("assigned_freelancer") is not None:
+            raise AssignmentConflict(f"Project is {current.get('status')}, not Open", current)
+        raise AssignmentConflict("Project changed since it was read; reload and retry", current)
+    before, project = changed
+
+    agreement = _agreement(project, agreement_id, project["updated_at"])
+    try:
+        agreements.insert_one(agreement)
+    except DuplicateKeyError:
+        return project, agreements.find_one({"_id": agreement_id})  # repair() got there first
+    except Exception:
+        # Put the project back, unless something else has moved it on since.
+        # Nothing was logged or counted yet, so there is nothing else to undo.
+        projects.update_one(
+            {"_id": project_id, "agreement": agreement_id},
+            {"$set": {"status": "Open", "assigned_freelancer": None, "agreement": None, "updated_at": datetime.utcnow()},
+             "$unset": {"agreement_pending": ""}, "$inc": {"version": 1}},
+        )
+        _touch(project)
+        raise
+    projects.update_one({"_id": project_id, "agreement": agreement_id}, {"$unset": {"agreement_pending": ""}})
+    project.pop("agreement_pending", None)
+    _record(before, project, agreement, actor=client_id)
+    return project, agreement
+
+def _record(before, project, agreement, actor=None):
+    workflow.commit(workflow.PROJECT, before, project, actor=actor)
+    workflow.created(workflow.AGREEMENT, agreement, actor=actor)
+    _touch(project)
+
+def _repair_one(project):
+    agreement = _agreement(project, project["agreement"], project.get("updated_at") or datetime.utcnow())
+    try:
+        Agreement._get_collection().insert_one(agreement)
+    except DuplicateKeyError:
+        return  # the request finished after all, and recorded itself
+    Project._get_collection().update_one({"_id": project["_id"], "agreement": project["agreement"]},
+                                         {"$unset": {"agreement_pending": ""}})
+    before = {**project, "status": "Open", "assigned_freelancer": None, "agreement": None}
+    _record(before, {k: v for k, v in project.items() if k != "agreement_pending"}, agreement)
+
+def repair(older_than=PENDING_GRACE):
+    """Write the Agreement for assignments whose request died before it; returns how many."""
+    cutoff = datetime.utcnow() - older_than
+    repaired = 0
+    for project in Project._get_collection().find({"agreement_pending": True, "updated_at": {"$lt": cutoff}}):
+        if project.get("agreement") and project.get("assigned_freelancer"):
+            _repair_one(project)
+            repaired += 1
+    return repaired
+
+@jobs.handler("assignments.repair")
+def repair_job():
+    repaired = repair()
+    if repaired:
+        logger.warning("Wrote %d missing agreements for interrupted assignments", repaired)
@@ -0,0 +1,89 @@
+# app/services/credentials.py
+
+from flask import current_app
+from mongoengine import NotUniqueError
+from pymongo.errors import BulkWriteError
+from app.models.credential import Credential
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+
+PROFILE_MODELS = {"client": Client, "freelancer": Freelancer}
+
+class EmailTaken(Exception):
+    pass
+
+def lookup(email):
+    """Resolve an email to ``(role, user_id, password_hash)`` in one query, or None."""
+    if not email:
+        return None
+    doc = Credential.objects(email=email).only("role", "user_id", "password").as_pymongo().first()
+    if doc is None:
+        return None
+    return doc["role"], doc["user_id"], doc["password"]
+
+def legacy_lookup(email):
+    # Pre-credential path: projected profile lookups, client first as login always did.
+    # A hit is written back so the account takes the single-query path next time.
+    for role, model in PROFILE_MODELS.items():
+        doc = model.objects(email=email).only("id", "password").as_pymongo().first()
+        if doc is not None:
+            try:
+                Credential(email=email, role=role, user_id=doc["_id"], password=doc["password"]).save()
+            except NotUniqueError:
+                pass
+            return role, doc["_id"], doc["password"]
+    return None
+
+def email_taken(email):
+    if Credential.objects(email=email).only("id").as_pymongo().first() is not None:
+        return True
+    # Until backfill() has run an account may exist only as a profile; login
+    # still finds it there, so registration must too (and writes it back)
+    return current_app.config.get('CREDENTIAL_LEGACY_FALLBACK', True) and legacy_lookup(email) is not None
+
+def register(role, user):
+    try:
+        Credential(email=user.email, role=role, user_id=user.id, password=user.password).save()
+    except NotUniqueError:
+        raise EmailTaken(user.email)
+
+def sync(user_id, email=None, password=None):
+    # Mirror email / password changes made through the profile update routes
+    changes = {}
+    if email:
+        changes["set__email"] = email
+    if password:
+        changes["set__password"] = password
+    if changes:
+        Credential.objects(user_id=user_id).update_one(**changes)
+
+def remove(user_id):
+    Credential.objects(user_id=user_id).delete()
+
+def backfill(batch_size=1000):
+    """Create credentials for every profile that predates the collection.
+
+    Clients are processed first so a (legacy) email shared by both roles keeps
+    resolving to the client, as login always did. Returns the number created.
+    """
+    collection = Credential._get_collection()
+    created = 0
+    for role, model in PROFILE_MODELS.items():
+        batch = []
+        for doc in model.objects.only("id", "email", "password").as_pymongo():
+            if not doc.get("email") or not doc.get("password"):
+                continue
+            batch.append({"email": doc["email"], "role": role, "user_id": doc["_id"], "password": doc["password"]})
+            if len(batch) >= batch_size:
+                created += _insert_new(collection, batch)
+                batch = []
+        if batch:
+            created += _insert_new(collection, batch)
+    return created
+
+def _insert_new(collection, batch):
+    # Unordered so emails that already have a credential are skipped, not fatal
+    try:
+        return len(collection.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as error:
+        return error.details["nInserted"]
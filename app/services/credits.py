@@ -0,0 +1,250 @@
+# app/services/credits.py
+#
+# Credit ledger. The balance lives on the profile (``credits``) and every
+# movement is appended to the transactions collection.
+#
+# A debit is one conditional update: {credits: {$gte: cost}} with
+# $inc: {credits: -cost}. Concurrent debits are serialized by MongoDB on the
+# profile document, so a balance can never go negative or be spent twice,
+# and no read-modify-write lock is needed.
+#
+# The same update pushes the entry onto ``pending_credits``; the ledger row is
+# inserted next and the pending entry pulled. If a process dies in between,
+# recover() finds the pending entry and writes the missing row, so the ledger
+# always ends up agreeing with the balance.
+#
+# Retried requests pass an idempotency key: a key that already has a ledger
+# row (or a pending entry) for the account replays the first result instead
+# of moving credits again.
+#
+# snapshot() records each account's balance up to a point in the ledger, so
+# ledger_balance() only sums the entries after the latest snapshot.
+#
+# Config:
+#   CREDITS_REFERRAL_BONUS   credits earned per referral (default 10)
+
+import logging
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.models.transaction import Transaction, CreditSnapshot
+from app.services import jobs, profile_cache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODELS = {"client": Client, "freelancer": Freelancer}
+# Entries pending longer than this belong to a dead request
+PENDING_GRACE = timedelta(minutes=1)
+# Snapshots stop this far back, behind anything recover() may still write
+SNAPSHOT_SETTLE = timedelta(minutes=2)
+
+class InsufficientCredits(Exception):
+    pass
+
+class AccountNotFound(Exception):
+    pass
+
+class RequestInProgress(Exception):
+    pass
+
+def _accounts(role):
+    return PROFILE_MODELS[role]._get_collection()
+
+def _replay(user_id, idempotency_key):
+    if idempotency_key is None:
+        return None
+    return Transaction._get_collection().find_one({"user": user_id, "idempotency_key": idempotency_key})
+
+def _row(entry, user_id, role, balance_after):
+    return {
+        "_id": entry["_id"],
+        "user": user_id,
+        "user_role": role,
+        "amount": entry["amount"],
+        "kind": entry["kind"],
+        "balance_after": balance_after,
+        **({"idempotency_key": entry["key"]} if entry.get("key") is not None else {}),
+        "created_at": entry["_id"].generation_time.replace(tzinfo=None),
+    }
+
+def _post(role, user_id, amount, kind, idempotency_key=None):
+    user_id = ObjectId(user_id)
+    amount = int(amount)
+    replay = _replay(user_id, idempotency_key)
+    if replay is not None:
+        return replay
+
+    accounts = _accounts(role)
+    entry = {"_id": ObjectId(), "amount": amount, "kind": kind, "key": idempotency_key}
+    query = {"_id": user_id}
+    if amount < 0:
+        query["credits"] = {"$gte": -amount}
+    if idempotency_key is not None:
+        query["pending_credits.key"] = {"$ne": idempotency_key}  # same request still in flight
+    account = accounts.find_one_and_update(
+        query,
+        {"$inc": {"credits": amount}, "$push": {"pending_credits": entry},
+         "$set": {"updated_at": datetime.utcnow()}},
+        projection={"credits": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if account is None:
+        current = accounts.find_one({"_id": user_id}, {"credits": 1, "pending_credits.key": 1})
+        if current is None:
+            raise AccountNotFound(f"No {role} account {user_id}")
+        if idempotency_key is not None and any(p.get("key") == idempotency_key for p in current.get("pending_credits") or []):
+            replay = _replay(user_id, idempotency_key)
+            if replay is not None:
+                return replay
+            raise RequestInProgress("A request with this idempotency key is still being processed.")
+        raise InsufficientCredits(f"Balance {current.get('credits', 0)} is below the {-amount} credits required.")
+
+    row = _row(entry, user_id, role, account["credits"])
+    try:
+        Transaction._get_collection().insert_one(row)
+    except DuplicateKeyError:
+        # A retry with the same key finished between our check and our $inc: undo ours
+        accounts.update_one({"_id": user_id, "pending_credits._id": entry["_id"]},
+                            {"$inc": {"credits": -amount}, "$pull": {"pending_credits": {"_id": entry["_id"]}}})
+        profile_cache.invalidate(role, user_id)
+        return _replay(user_id, idempotency_key)
+    accounts.update_one({"_id": user_id}, {"$pull": {"pending_credits": {"_id": entry["_id"]}}})
+    profile_cache.invalidate(role, user_id)
+    return row
+
+def credit(role, user_id, amount, kind, idempotency_key=None):
+    """Add ``amount`` credits; returns the ledger row (the original one on a replay)."""
+    if int(amount) <= 0:
+        raise ValueError("Credit amount must be positive")
+    return _post(role, user_id, amount, kind, idempotency_key)
+
+def debit(role, user_id, cost, kind, idempotency_key=None):
+    """Take ``cost`` credits or raise InsufficientCredits; returns the ledger row."""
+    if int(cost) <= 0:
+        raise ValueError("Debit amount must be positive")
+    return _post(role, user_id, -int(cost), kind, idempotency_key)
+
+def history(user_id, limit=50):
+    return list(Transaction.objects(user=ObjectId(user_id)).order_by("-id").limit(limit).as_pymongo())
+
+def recover(role, older_than=PENDING_GRACE):
+    """Finish ledger entries left pending by requests that died; returns how many."""
+    cutoff = ObjectId.from_datetime(datetime.utcnow() - older_than)
+    accounts = _accounts(role)
+    ledger = Transaction._get_collection()
+    recovered = 0
+    for account in accounts.find({"pending_credits._id": {"$lt": cutoff}}, {"pending_credits": 1, "credits": 1}):
+        for entry in account["pending_credits"]:
+            if entry["_id"] >= cutoff:
+                continue
+            if ledger.find_one({"_id": entry["_id"]}, {"_id": 1}) is None:
+                try:
+                    # balance_after is unknown this late; None marks a recovered row
+                    ledger.insert_one(_row(entry, account["_id"], role, None))
+                    recovered += 1
+                except DuplicateKeyError:
+                    # Its key was replayed by a later request: this movement is the duplicate
+                    accounts.update_one({"_id": account["_id"], "pending_credits._id": entry["_id"]},
+                                        {"$inc": {"credits": -entry["amount"]},
+                                         "$pull": {"pending_credits": {"_id": entry["_id"]}}})
+            accounts.update_one({"_id": account["_id"]}, {"$pull": {"pending_credits": {"_id": entry["_id"]}}})
+            profile_cache.invalidate(role, account["_id"])
+    return recovered
+
+def open_balances(role):
+    """Write an "opening" row for the part of each balance that predates the ledger. Safe to rerun.
+
+    The row carries the fixed idempotency key "opening", so the unique
+    (user, idempotency_key) index decides per account whether it exists;
+    accounts that already have later ledger rows still get theirs.
+    """
+    ledger = Transaction._get_collection()
+    accounts = _accounts(role)
+    opened = 0
+    for account in accounts.find({"pending_credits.0": {"$exists": False}}, {"credits": 1}):
+        if _replay(account["_id"], "opening") is not None:
+            continue
+        credits = account.get("credits") or 0
+        amount = credits - ledger_balance(account["_id"])
+        if amount == 0:
+            continue
+        # Skip accounts that moved while we summed their ledger; the next run gets them
+        if accounts.find_one({"_id": account["_id"], "credits": account.get("credits"),
+                              "pending_credits.0": {"$exists": False}}, {"_id": 1}) is None:
+            continue
+        row = _row({"_id": ObjectId(), "amount": amount, "kind": "opening", "key": "opening"},
+                   account["_id"], role, amount)
+        key = {"user": row.pop("user"), "idempotency_key": row.pop("idempotency_key")}
+        try:
+            result = ledger.update_one(key, {"$setOnInsert": row}, upsert=True)
+        except DuplicateKeyError:
+            continue  # another run opened it first
+        opened += result.upserted_id is not None
+    return opened
+
+def snapshot(settle=SNAPSHOT_SETTLE):
+    """Snapshot every account that has ledger entries since its last snapshot.
+
+    Only entries older than ``settle`` are included, so rows still being
+    written by in-flight requests land in the next snapshot. Returns how many
+    snapshots were written.
+    """
+    through = ObjectId.from_datetime(datetime.utcnow() - settle)
+    snapshots = CreditSnapshot._get_collection()
+    previous = snapshots.find_one({}, {"through": 1}, sort=[("through", -1)])
+    match = {"_id": {"$lte": through}}
+    if previous is not None:
+        match["_id"]["$gt"] = previous["through"]
+    written = 0
+    taken_at = datetime.utcnow()
+    for row in Transaction._get_collection().aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$user", "user_role": {"$first": "$user_role"}, "delta": {"$sum": "$amount"}}},
+    ], allowDiskUse=True):
+        last = snapshots.find_one({"user": row["_id"]}, {"balance": 1}, sort=[("through", -1)])
+        snapshots.insert_one({
+            "user": row["_id"],
+            "user_role": row["user_role"],
+            "balance": (last["balance"] if last else 0) + row["delta"],
+            "through": through,
+            "taken_at": taken_at,
+        })
+        written += 1
+    return written
+
+def ledger_balance(user_id):
+    """Balance according to the ledger: latest snapshot plus the entries after it."""
+    user_id = ObjectId(user_id)
+    last = CreditSnapshot._get_collection().find_one({"user": user_id}, sort=[("through", -1)])
+    match = {"user": user_id}
+    if last is not None:
+        match["_id"] = {"$gt": last["through"]}
+    rows = list(Transaction._get_collection().aggregate([
+        {"$match": match}, {"$group": {"_id": None, "total": {"$sum": "$amount"}}},
+    ]))
+    return (last["balance"] if last else 0) + (rows[0]["total"] if rows else 0)
+
+def audit(role, user_ids):
+    """``{user_id: (profile credits, ledger balance)}`` for accounts that disagree."""
+    drift = {}
+    for account in _accounts(role).find({"_id": {"$in": [ObjectId(i) for i in user_ids]}},
+                                        {"credits": 1, "pending_credits": 1}):
+        if account.get("pending_credits"):
+            continue  # mid-write; check again later
+        balance = ledger_balance(account["_id"])
+        if balance != account.get("credits", 0):
+            drift[account["_id"]] = (account.get("credits", 0), balance)
+    return drift
+
+def init_app(app):
+    app.config.setdefault("CREDITS_REFERRAL_BONUS", 10)
+
+@jobs.handler("credits.snapshot")
+def snapshot_job():
+    for role in PROFILE_MODELS:
+        recover(role)
+    written = snapshot()
+    logger.info("Wrote %d credit snapshots", written)
@@ -0,0 +1,138 @@
+# app/services/http_cache.py
+#
+# Conditional GET for the HTML pages, plus a cache of rendered fragments.
+#
+# A view decorated with @conditional(stamp) gets a strong ETag computed from
+# ``stamp(**view_args)``: a cheap description of everything the page shows,
+# built from ``updated_at`` / id pairs fetched with projections (or from the
+# profile cache, when the page will be rendered from it). A request whose
+# If-None-Match matches is answered 304 before the view runs, so nothing is
+# rendered and no full document is read. The ETag also covers the page URL
+# and the templates on disk, so a deploy that changes markup changes every tag.
+#
+# cached_fragment() (a template global) caches rendered HTML per entity and
+# version, e.g. one listing card per (freelancer id, updated_at).
+#
+# Everything here is per process. Fragments are keyed on the version they
+# render, so they are never stale, only duplicated across workers. Stamps
+# read from the profile cache describe the page the worker is about to
+# render, and a write only invalidates that cache in its own worker: under
+# several gunicorn workers another worker can keep answering 304 (or render
+# the old page) until its entry expires, at most PROFILE_CACHE_TTL seconds
+# (see profile_cache.py). Workers holding different copies hand out
+# different ETags, so a client bounced between them gets full responses
+# instead of 304s.
+#
+# /internal/response-cache-stats is gated like /metrics (metrics.allowed()).
+#
+# Config:
+#   RESPONSE_FRAGMENT_CACHE        cache rendered fragments (default True)
+#   RESPONSE_FRAGMENT_CACHE_SIZE   max fragments kept per process (default 4096)
+
+import functools
+import hashlib
+import os
+import threading
+from flask import current_app, jsonify, make_response, request
+from markupsafe import Markup
+from app.services import metrics
+from app.services.profile_cache import LRUCache
+
+_counters = {"not_modified": 0, "rendered": 0, "unstamped": 0, "fragment_hits": 0, "fragment_misses": 0}
+_counter_lock = threading.Lock()
+
+def _count(name):
+    with _counter_lock:
+        _counters[name] += 1
+
+def _template_version(app):
+    # Same on every worker of a deploy: derived from the template files themselves
+    digest = hashlib.sha1()
+    root = os.path.join(app.root_path, app.template_folder)
+    for directory, _, files in sorted(os.walk(root)):
+        for name in sorted(files):
+            stat = os.stat(os.path.join(directory, name))
+            digest.update(f"{os.path.relpath(os.path.join(directory, name), root)}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()[:12]
+
+def make_etag(parts):
+    args = sorted(request.args.items(multi=True))
+    payload = repr((request.endpoint, request.path, args, current_app.config["RESPONSE_CACHE_VERSION"], parts))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def conditional(stamp):
+    """Answer If-None-Match with 304 when ``stamp(**view_args)`` is unchanged.
+
+    ``stamp`` returns any repr-stable value, or None when it cannot tell (for
+    example the document does not exist); the view then runs as usual.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+            try:
+                parts = stamp(*args, **kwargs)
+            except Exception:
+                parts = None  # bad id, bad cursor...: the view renders its own error
+            if parts is None:
+                _count("unstamped")
+                return view(*args, **kwargs)
+
+            etag = make_etag(parts)
+            if request.if_none_match.contains(etag):
+                _count("not_modified")
+                response = current_app.response_class(status=304)
+            else:
+                _count("rendered")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Always revalidate; the browser keeps the body and we only send 304s
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorate
+
+def _fragments():
+    app = current_app._get_current_object()
+    if not app.config["RESPONSE_FRAGMENT_CACHE"]:
+        return None
+    cache = app.extensions.get("fragment_cache")
+    if cache is None:
+        cache = app.extensions.setdefault(
+            "fragment_cache", LRUCache(threshold=app.config["RESPONSE_FRAGMENT_CACHE_SIZE"], default_timeout=0)
+        )
+    return cache
+
+def cached_fragment(name, key, version, render, *args):
+    """Render ``render(*args)`` once per (name, key, version) and reuse the HTML."""
+    cache = _fragments()
+    if cache is None or version is None:
+        return render(*args)
+    cache_key = f"{name}:{key}:{version.isoformat() if hasattr(version, 'isoformat') else version}"
+    html = cache.get(cache_key)
+    if html is None:
+        _count("fragment_misses")
+        html = str(render(*args))
+        cache.set(cache_key, html)
+    else:
+        _count("fragment_hits")
+    return Markup(html)
+
+def stats():
+    with _counter_lock:
+        return dict(_counters)
+
+def _stats_view():
+    if not metrics.allowed():
+        return "Not found", 404
+    return jsonify(stats())
+
+def init_app(app):
+    app.config.setdefault("RESPONSE_FRAGMENT_CACHE", True)
+    app.config.setdefault("RESPONSE_FRAGMENT_CACHE_SIZE", 4096)
+    app.config.setdefault("RESPONSE_CACHE_VERSION", _template_version(app))
+    app.add_template_global(cached_fragment)
+    app.add_url_rule("/internal/response-cache-stats", "response_cache_stats", _stats_view)
@@ -0,0 +1,126 @@
+# app/services/indexes.py
+#
+# Index reconciliation and query-plan checks used by sync_indexes.py.
+# The indexes themselves live in each model's ``meta['indexes']``.
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.models.project import Project
+from app.models.review import Review
+from app.models.agreement import Agreement
+from app.models.credential import Credential
+from app.models.application import Application
+from app.models.transaction import Transaction, CreditSnapshot
+from app.models.event import StatusEvent
+from app.models.counters import ActivityCounters
+from app.models.lease import Lease
+from app.models.job import Job
+
+MODELS = [Client, Freelancer, Project, Review, Agreement, Credential, Application, Transaction, CreditSnapshot,
+          StatusEvent, ActivityCounters, Lease, Job]
+
+# Query shapes the routes rely on being index-backed. Values are placeholders;
+# only the shape matters to the planner.
+QUERY_SHAPES = [
+    ("login by email", Credential, {'email': 'someone@example.com'}, None),
+    ("client by email", Client, {'email': 'someone@example.com'}, None),
+    ("freelancer by email", Freelancer, {'email': 'someone@example.com'}, None),
+    ("freelancers by skill", Freelancer, {'skills': 'python'}, None),
+    ("projects by client", Project, {'client': ObjectId()}, [('_id', -1)]),
+    ("projects by freelancer", Project, {'assigned_freelancer': ObjectId()}, [('_id', -1)]),
+    ("projects by status", Project, {'status': 'In Progress'}, [('created_at', -1)]),
+    ("feed, newest", Project, {'status': 'Open'}, [('_id', -1)]),
+    ("feed by category, newest", Project, {'status': 'Open', 'categories': {'$in': ['Design']}}, [('_id', -1)]),
+    ("feed by budget", Project, {'status': 'Open', 'budget': {'$gte': 100}}, [('budget', -1), ('_id', -1)]),
+    ("feed by category and budget", Project, {'status': 'Open', 'categories': {'$in': ['Design']}},
+     [('budget', -1), ('_id', -1)]),
+    ("overdue open projects", Project, {'status': 'Open', 'deadline': {'$lt': datetime(2000, 1, 1)}}, None),
+    ("unlogged project expiries", Project, {'expiry_pending': True}, [('expired_at', 1)]),
+    ("archivable projects", Project, {'expired_at': {'$lt': datetime(2000, 1, 1)}, 'status': 'Cancelled'}, None),
+    ("stale pending agreements", Agreement, {'status': 'Pending', 'created_at': {'$lt': datetime(2000, 1, 1)}}, None),
+    ("reviews by freelancer", Review, {'freelancer': ObjectId()}, [('_id', -1)]),
+    ("reviews by reviewer", Review, {'reviewer': ObjectId()}, [('_id', -1)]),
+    ("agreements by client", Agreement, {'client': ObjectId()}, [('_id', -1)]),
+    ("agreements by freelancer", Agreement, {'freelancer': ObjectId()}, [('_id', -1)]),
+    ("applications by freelancer", Application, {'freelancer': ObjectId()}, [('_id', -1)]),
+    ("transactions by user", Transaction, {'user': ObjectId()}, [('_id', -1)]),
+    ("replayed request", Transaction, {'user': ObjectId(), 'idempotency_key': 'key'}, None),
+    ("latest credit snapshot", CreditSnapshot, {'user': ObjectId()}, [('through', -1)]),
+    ("status history", StatusEvent, {'e': ObjectId(), 'k': 'project'}, [('_id', -1)]),
+    ("due jobs", Job, {'status': 'queued', 'run_after': {'$lte': datetime(2000, 1, 1)}}, [('run_after', 1)]),
+    ("abandoned jobs", Job, {'status': 'running', 'locked_until': {'$lt': datetime(2000, 1, 1)}}, None),
+]
+
+def sync_indexes(models=None, prune=False, log=print):
+    """Create any missing declared indexes; with ``prune`` also drop undeclared ones.
+
+    Safe to run repeatedly. An index whose options changed (for example a new
+    partial filter) conflicts with the existing one of the same name; with
+    ``prune`` it is dropped and rebuilt, otherwise the conflict is reported.
+    """
+    ok = True
+    for model in models or MODELS:
+        collection = model._get_collection()
+        name = collection.name
+        if prune:
+            for extra in model.compare_indexes()['extra']:
+                index_name = _index_name(collection, extra)
+                if index_name:
+                    log(f"{name}: dropping undeclared index {index_name}")
+                    collection.drop_index(index_name)
+
+        for spec in model._meta['index_specs']:
+            try:
+                collection.create_index(spec['fields'], **_index_options(spec))
+            except OperationFailure as error:
+                if not prune:
+                    log(f"{name}: index {spec['fields']} conflicts with an existing index ({error}); rerun with --prune")
+                    ok = False
+                    continue
+                index_name = _index_name(collection, spec['fields'])
+                log(f"{name}: rebuilding index {index_name}")
+                collection.drop_index(index_name)
+                collection.create_index(spec['fields'], **_index_options(spec))
+
+        log(f"{name}: {len(collection.index_information())} indexes")
+    return ok
+
+def _index_options(spec):
+    return {key: value for key, value in spec.items() if key not in ('fields', 'cls')}
+
+def _index_name(collection, fields):
+    for index_name, info in collection.index_information().items():
+        if [tuple(key) for key in info['key']] == [tuple(key) for key in fields]:
+            return index_name
+    return None
+
+def _plan_stages(plan):
+    # Flatten the winning plan tree into (stage, indexName) pairs
+    stages = [(plan.get('stage'), plan.get('indexName'))]
+    children = plan.get('inputStages') or ([plan['inputStage']] if 'inputStage' in plan else [])
+    for child in children:
+        stages.extend(_plan_stages(child))
+    return stages
+
+def explain_shapes(shapes=None, log=print):
+    """Print the winning plan for each registered query shape.
+
+    Returns the labels of shapes that fall back to a collection scan.
+    """
+    collscans = []
+    for label, model, query, sort in shapes or QUERY_SHAPES:
+        cursor = model._get_collection().find(query).limit(20)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        # Sharded / SBE explain output nests the classic plan one level down
+        plan = plan.get('queryPlan', plan)
+        stages = _plan_stages(plan)
+        summary = ' <- '.join(stage if not index else f"{stage}({index})" for stage, index in stages)
+        if any(stage == 'COLLSCAN' for stage, _ in stages):
+            collscans.append(label)
+        log(f"{label:<28} {summary}")
+    return collscans
@@ -0,0 +1,104 @@
+# app/services/jobs.py
+#
+# Minimal MongoDB-backed job queue. Jobs are claimed with a single
+# find_one_and_update, so any number of worker processes can poll the same
+# collection. A claimed job holds a lease; if its worker dies the lease
+# expires and another worker picks the job up again.
+
+import importlib
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+LEASE_SECONDS = 300
+
+HANDLERS = {}
+# Every module that registers a handler; load_handlers() imports them all
+HANDLER_MODULES = (
+    'app.services.assignments',
+    'app.services.credits',
+    'app.services.ratings',
+    'app.services.thumbnails',
+    'app.services.workflow',
+)
+
+def handler(kind):
+    # Register a function taking the job payload as keyword arguments
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def load_handlers():
+    # A worker must know every kind, not just the ones its app happened to import
+    for name in HANDLER_MODULES:
+        importlib.import_module(name)
+    return HANDLERS
+
+def enqueue(kind, delay_seconds=0, **payload):
+    now = datetime.utcnow()
+    return Job(kind=kind, payload=payload, run_after=now + timedelta(seconds=delay_seconds)).save()
+
+def claim(kinds=None, lease_seconds=LEASE_SECONDS):
+    now = datetime.utcnow()
+    query = {'$or': [
+        {'status': 'queued', 'run_after': {'$lte': now}},
+        {'status': 'running', 'locked_until': {'$lt': now}},  # abandoned by a dead worker
+    ]}
+    if kinds:
+        query['kind'] = {'$in': list(kinds)}
+    return Job._get_collection().find_one_and_update(
+        query,
+        {'$set': {'status': 'running', 'locked_until': now + timedelta(seconds=lease_seconds),
+                  'lease_owner': uuid.uuid4().hex, 'updated_at': now},
+         '$inc': {'attempts': 1}},
+        sort=[('run_after', 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+def _finish(job, **fields):
+    # Only the current lease holder may record the outcome: if this run
+    # overran its lease, the job was claimed again and the result is theirs
+    fields['updated_at'] = datetime.utcnow()
+    result = Job._get_collection().update_one({'_id': job['_id'], 'lease_owner': job['lease_owner']},
+                                              {'$set': fields, '$unset': {'locked_until': '', 'lease_owner': ''}})
+    if not result.matched_count:
+        logger.warning("Job %s (%s) lost its lease before finishing; result dropped", job['_id'], job['kind'])
+    return bool(result.matched_count)
+
+def run_one(job):
+    fn = HANDLERS.get(job['kind'])
+    try:
+        if fn is None:
+            raise LookupError(f"No handler registered for job kind {job['kind']!r}")
+        fn(**job.get('payload', {}))
+    except Exception as error:
+        logger.exception("Job %s (%s) failed", job['_id'], job['kind'])
+        if job['attempts'] >= MAX_ATTEMPTS or fn is None:
+            _finish(job, status='failed', error=str(error))
+        else:
+            # Exponential backoff: 30s, 60s, 120s, ...
+            retry_at = datetime.utcnow() + timedelta(seconds=30 * 2 ** (job['attempts'] - 1))
+            _finish(job, status='queued', error=str(error), run_after=retry_at)
+        return False
+    _finish(job, status='done', error=None)
+    return True
+
+def run_worker(kinds=None, poll_interval=1.0, burst=False):
+    """Process jobs until interrupted; with ``burst`` stop once the queue is empty."""
+    processed = 0
+    while True:
+        job = claim(kinds)
+        if job is None:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run_one(job)
+        processed += 1
@@ -0,0 +1,180 @@
+# app/services/marketplace.py
+#
+# The open-project feed freelancers browse: Open projects filtered by
+# category, budget range and deadline window, newest first or by budget.
+#
+# Paging is keyset on (sort key, _id), and every sort has a partial index on
+# status "Open" ending in the same keys (see the open_feed_* indexes on
+# Project), so any page costs one index range scan of ``limit + 1`` entries
+# whatever its depth. Only the card fields are loaded.
+#
+# First pages take most of the traffic and barely change, so they are cached
+# per filter combination, encoded and ready to send. The cache is per process
+# and nothing invalidates it: a new, edited or assigned project can be missing
+# from (or linger on) a first page for up to MARKETPLACE_CACHE_TTL seconds,
+# and workers may disagree for that long. Later pages are always read live.
+#
+# Config:
+#   MARKETPLACE_CACHE_TTL    seconds a first page is reused (default 10; 0 disables)
+#   MARKETPLACE_CACHE_SIZE   max filter combinations kept per process (default 1024)
+
+import base64
+import binascii
+import threading
+from datetime import datetime
+import bson
+from bson.errors import BSONError
+from flask import current_app
+from app.models.project import Project
+from app.services import serialization
+from app.services.pagination import InvalidCursor, clamp_page_size
+from app.services.profile_cache import LRUCache, ProfileCache
+
+# sort name -> (key field, direction); _id breaks ties in the same direction
+SORTS = {
+    "recent": ("_id", -1),
+    "budget_desc": ("budget", -1),
+    "budget_asc": ("budget", 1),
+}
+MAX_CATEGORIES = 10
+
+class InvalidFilter(ValueError):
+    pass
+
+def _int(value, name):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidFilter(f"{name} must be a whole number")
+
+def _date(value, name):
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise InvalidFilter(f"{name} must be an ISO date")
+
+def parse_filters(args):
+    """Normalized filters from request args; raises InvalidFilter.
+
+    category (repeatable), min_budget, max_budget, deadline_after,
+    deadline_before, sort (recent | budget_desc | budget_asc).
+    """
+    categories = sorted({category.strip() for category in args.getlist("category") if category.strip()})
+    if len(categories) > MAX_CATEGORIES:
+        raise InvalidFilter(f"At most {MAX_CATEGORIES} categories")
+    sort = args.get("sort") or "recent"
+    if sort not in SORTS:
+        raise InvalidFilter(f"sort must be one of {', '.join(SORTS)}")
+    return {
+        "categories": tuple(categories),
+        "min_budget": _int(args.get("min_budget"), "min_budget"),
+        "max_budget": _int(args.get("max_budget"), "max_budget"),
+        "deadline_after": _date(args.get("deadline_after"), "deadline_after"),
+        "deadline_before": _date(args.get("deadline_before"), "deadline_before"),
+        "sort": sort,
+    }
+
+def _query(filters):
+    query = {"status": "Open"}
+    if filters["categories"]:
+        query["categories"] = {"$in": list(filters["categories"])}
+    budget = {}
+    if filters["min_budget"] is not None:
+        budget["$gte"] = filters["min_budget"]
+    if filters["max_budget"] is not None:
+        budget["$lte"] = filters["max_budget"]
+    if budget:
+        query["budget"] = budget
+    deadline = {}
+    if filters["deadline_after"] is not None:
+        deadline["$gte"] = filters["deadline_after"]
+    if filters["deadline_before"] is not None:
+        deadline["$lt"] = filters["deadline_before"]
+    if deadline:
+        query["deadline"] = deadline
+    return query
+
+# Cursors carry the last card's sort key and _id, as urlsafe base64 BSON
+def _encode_cursor(sort, doc):
+    key, _ = SORTS[sort]
+    payload = bson.encode({"s": sort, "k": doc.get(key), "i": doc["_id"]})
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+def _decode_cursor(sort, cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = bson.decode(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload.get("s") != sort or not isinstance(payload.get("i"), bson.ObjectId):
+            raise InvalidCursor("Invalid page cursor")
+        return payload.get("k"), payload["i"]
+    except (binascii.Error, BSONError, TypeError, ValueError, UnicodeEncodeError):
+        raise InvalidCursor("Invalid page cursor")
+
+def _after(sort, cursor):
+    # Everything past the cursor in sort order. A null or missing key sorts
+    # below every number but never matches $lt / $gt, so projects without a
+    # budget need their own branch: first when ascending, last when descending.
+    key, direction = SORTS[sort]
+    value, last_id = _decode_cursor(sort, cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    if key == "_id":
+        return {"_id": {op: last_id}}
+    ties = {key: value, "_id": {op: last_id}}
+    if value is None:
+        return {"$or": [{key: {"$ne": None}}, ties]} if direction > 0 else ties
+    if direction < 0:
+        return {"$or": [{key: {op: value}}, ties, {key: None}]}
+    return {"$or": [{key: {op: value}}, ties]}
+
+def page(filters, cursor=None, limit=None):
+    """One page of cards: ``(raw docs, next_cursor)``."""
+    limit = clamp_page_size(limit)
+    query = _query(filters)
+    if cursor:
+        query = {"$and": [query, _after(filters["sort"], cursor)]}
+    key, direction = SORTS[filters["sort"]]
+    order = [(key, direction)] if key == "_id" else [(key, direction), ("_id", direction)]
+    docs = list(Project._get_collection().find(
+        query, projection=list(serialization.fields(serialization.ProjectCard)), sort=order, limit=limit + 1,
+    ))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = _encode_cursor(filters["sort"], docs[-1])
+    return docs, next_cursor
+
+def _encoded_page(filters, cursor, limit):
+    docs, next_cursor = page(filters, cursor, limit)
+    return serialization.encode({
+        "items": serialization.convert_many(docs, serialization.ProjectCard),
+        "next_cursor": next_cursor,
+    })
+
+_create_lock = threading.Lock()
+
+def get_cache():
+    app = current_app._get_current_object()
+    cache = app.extensions.get("marketplace_cache")
+    if cache is None:
+        with _create_lock:
+            cache = app.extensions.get("marketplace_cache")
+            if cache is None:
+                ttl = app.config["MARKETPLACE_CACHE_TTL"]
+                backend = LRUCache(threshold=app.config["MARKETPLACE_CACHE_SIZE"], default_timeout=ttl)
+                cache = app.extensions["marketplace_cache"] = ProfileCache(backend, timeout=ttl)
+    return cache
+
+def feed(filters, cursor=None, limit=None):
+    """JSON body ``{"items": [...], "next_cursor": ...}``; first pages come from the cache."""
+    if cursor or not current_app.config["MARKETPLACE_CACHE_TTL"]:
+        return _encoded_page(filters, cursor, limit)
+    cache_key = "feed:" + repr((sorted(filters.items()), clamp_page_size(limit)))
+    return get_cache().get_or_load(cache_key, lambda: _encoded_page(filters, None, limit))
+
+def init_app(app):
+    app.config.setdefault("MARKETPLACE_CACHE_TTL", 10)
+    app.config.setdefault("MARKETPLACE_CACHE_SIZE", 1024)
@@ -0,0 +1,164 @@
+# app/services/matching.py
+#
+# Ranks freelancers for a project by how well their skills cover the
+# project's categories, their review rating and how close they are to the
+# client.
+#
+# Skills and categories share one normalized vocabulary; each tag gets a bit,
+# each freelancer a bitmask of their skills, and each bit a set of holders. A
+# project is scored against only the freelancers holding at least one of its
+# tags; coverage is counted straight off those holder sets.
+
+import heapq
+import re
+import threading
+from collections import Counter
+from itertools import chain
+from app.services import profile_index
+
+WEIGHTS = {"skills": 0.6, "rating": 0.25, "location": 0.15}
+LOCATION_SCORES = (("city", 1.0), ("state", 0.6), ("country", 0.3))
+# Ratings are shrunk toward the prior so one 5-star review doesn't beat fifty 4.8s
+PRIOR_RATING = 3.5
+PRIOR_WEIGHT = 5
+PROFILE_FIELDS = ("first_name", "last_name", "profile_photo", "photo_variants", "skills", "location", "rating")
+_SEPARATORS = re.compile(r"[^\w+#]+")
+
+def normalize_tag(tag):
+    return _SEPARATORS.sub(" ", str(tag).lower()).strip()
+
+def _location_key(location):
+    location = location or {}
+    return tuple(normalize_tag(location.get(part) or "") for part, _ in LOCATION_SCORES)
+
+class SkillMatrix:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vocab = {}  # normalized tag -> bit position
+        self._masks = {}  # freelancer id -> skill bitmask
+        self._holders = {}  # bit position -> set of freelancer ids
+        self._places = {}  # (location part, normalized value) -> set of freelancer ids
+        self._profiles = {}  # freelancer id -> (display record, location key)
+        self._ratings = {}  # freelancer id -> weighted rating score
+
+    def __len__(self):
+        return len(self._masks)
+
+    def _bit(self, tag):
+        bit = self._vocab.get(tag)
+        if bit is None:
+            bit = self._vocab[tag] = len(self._vocab)
+        return bit
+
+    def upsert(self, doc):
+        freelancer_id = str(doc["_id"])
+        record = {field: doc.get(field) for field in PROFILE_FIELDS if field != "rating"}
+        record["_id"] = freelancer_id
+        location = _location_key(doc.get("location"))
+        summary = doc.get("rating") or {}
+        with self._lock:
+            self._unlink(freelancer_id)
+            self._set_rating(freelancer_id, summary.get("total", 0), summary.get("count", 0))
+            mask = 0
+            for skill in doc.get("skills") or []:
+                tag = normalize_tag(skill)
+                if tag:
+                    bit = self._bit(tag)
+                    mask |= 1 << bit
+                    self._holders.setdefault(bit, set()).add(freelancer_id)
+            for (part, _), value in zip(LOCATION_SCORES, location):
+                if value:
+                    self._places.setdefault((part, value), set()).add(freelancer_id)
+            self._masks[freelancer_id] = mask
+            self._profiles[freelancer_id] = (record, location)
+
+    def remove(self, freelancer_id):
+        with self._lock:
+            self._unlink(str(freelancer_id))
+
+    def _unlink(self, freelancer_id):
+        mask = self._masks.pop(freelancer_id, 0)
+        self._ratings.pop(freelancer_id, None)
+        _, location = self._profiles.pop(freelancer_id, (None, ()))
+        bit = 0
+        while mask:
+            if mask & 1:
+                self._holders[bit].discard(freelancer_id)
+            mask >>= 1
+            bit += 1
+        for (part, _), value in zip(LOCATION_SCORES, location):
+            if value:
+                self._places[(part, value)].discard(freelancer_id)
+
+    def _set_rating(self, freelancer_id, rating_sum, rating_count):
+        # Stored pre-weighted so top_k only adds it
+        rating = (rating_sum + PRIOR_RATING * PRIOR_WEIGHT) / (rating_count + PRIOR_WEIGHT) / 5.0
+        self._ratings[freelancer_id] = WEIGHTS["rating"] * rating
+
+    def top_k(self, categories, k=10, location=None):
+        """Return up to ``k`` ``(score, breakdown, record)`` tuples, best first."""
+        tags = {normalize_tag(category) for category in categories or []} - {""}
+        if not tags:
+            return []
+        default_rating = WEIGHTS["rating"] * PRIOR_RATING / 5.0
+        skill_weight = WEIGHTS["skills"] / len(tags)
+
+        with self._lock:
+            holders = [self._holders[self._vocab[tag]] for tag in tags if tag in self._vocab]
+            if not holders:
+                return []
+            ratings = self._ratings
+            location_boosts = [(self._places.get((part, value), set()), WEIGHTS["location"] * part_score)
+                               for (part, part_score), value in zip(LOCATION_SCORES, _location_key(location))
+                               if value]
+
+            def score_all(overlap):
+                scores = {freelancer_id: skill_weight * count + ratings.get(freelancer_id, default_rating)
+                          for freelancer_id, count in overlap.items()}
+                nearby = {}
+                # Widest area first so the closest match wins
+                for places, boost in reversed(location_boosts):
+                    for freelancer_id in places & scores.keys():
+                        nearby[freelancer_id] = boost
+                for freelancer_id, boost in nearby.items():
+                    scores[freelancer_id] += boost
+                return scores, nearby
+
+            # Work down from full coverage. Anyone holding at least m of the n tags
+            # is in one of any n-m+1 holder sets, so the m level only has to look
+            # at the smallest ones; stop once the k-th score beats the best a
+            # freelancer with fewer tags could reach.
+            holders.sort(key=len)
+            best_boost = max((boost for _, boost in location_boosts), default=0.0)
+            for level in range(len(holders), 0, -1):
+                if level == len(holders):
+                    overlap = dict.fromkeys(set.intersection(*holders), level)
+                elif level == 1:
+                    # Everyone; a C-level count over the holder sets
+                    overlap = Counter(chain.from_iterable(holders))
+                else:
+                    overlap = {}
+                    for freelancer_id in set().union(*holders[:len(holders) - level + 1]):
+                        count = sum(1 for held in holders if freelancer_id in held)
+                        if count >= level:
+                            overlap[freelancer_id] = count
+                scores, nearby = score_all(overlap)
+                best = heapq.nlargest(k, scores, key=scores.get)
+                ceiling = skill_weight * (level - 1) + WEIGHTS["rating"] + best_boost
+                if len(best) == k and scores[best[-1]] >= ceiling:
+                    break
+
+            return [
+                (scores[freelancer_id], {
+                    "skills": overlap[freelancer_id] / len(tags),
+                    "rating": ratings.get(freelancer_id, default_rating) / WEIGHTS["rating"],
+                    "location": nearby.get(freelancer_id, 0.0) / WEIGHTS["location"],
+                }, self._profiles[freelancer_id][0])
+                for freelancer_id in best
+            ]
+
+def match_freelancers(categories, k=10, location=None):
+    return profile_index.get_indexer("matching").current().top_k(categories, k=k, location=location)
+
+def init_app(app):
+    profile_index.register(app, "matching", SkillMatrix, PROFILE_FIELDS)
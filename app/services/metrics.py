@@ -0,0 +1,306 @@
+# app/services/metrics.py
+#
+# Request instrumentation, exposed in the Prometheus text format on /metrics.
+#
+# Per endpoint: a request duration histogram, a request counter by status,
+# and per-request histograms of MongoDB commands issued, time spent in
+# MongoDB, template rendering and bcrypt. MongoDB commands are also timed by
+# command name. Commands are seen through a pymongo command listener,
+# registered globally so every MongoClient created afterwards reports (it is
+# installed before the app connects; see app/__init__.py); templates through
+# Flask's render signals; bcrypt by the password service.
+#
+# Requests slower than METRICS_SLOW_REQUEST_SECONDS are logged to the
+# "app.slow_requests" logger with their MongoDB query shapes (command,
+# collection and filter keys with the values blanked), heaviest first.
+#
+# Everything is kept in process with one lock per metric; an observation is a
+# bisect and two additions. Each worker process exposes its own numbers: under
+# gunicorn with several workers a scrape is answered by whichever worker
+# accepts it, so it returns that one worker's counters and successive scrapes
+# jump between workers. Treat such numbers as a sample, or give each worker
+# its own scrape target (one worker per container).
+#
+# /metrics, and the internal cache stats pages through allowed(), answer 404
+# unless the request carries "Authorization: Bearer <METRICS_TOKEN>". Without
+# a token only direct local clients get in; a request that came through a
+# reverse proxy (X-Forwarded-For / Forwarded) is refused, since the proxy
+# connects from localhost too.
+#
+# Config:
+#   METRICS_ENABLED                 record anything at all (default True)
+#   METRICS_SLOW_REQUEST_SECONDS    slow-request log threshold (default 0.5; 0 disables)
+#   METRICS_TOKEN                   bearer token for /metrics (default None: local clients only)
+#   METRICS_ALLOWED_ADDRS           local clients allowed without a token (default localhost)
+
+import bisect
+import contextvars
+import hmac
+import logging
+import threading
+import time
+from flask import before_render_template, current_app, g, request, template_rendered
+from pymongo import monitoring
+
+slow_log = logging.getLogger("app.slow_requests")
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+MAX_SHAPES_PER_REQUEST = 200  # commands kept for the slow-request log
+LOCAL_ADDRS = ("127.0.0.1", "::1")
+
+_enabled = True
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.label_names = name, help, labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.label_names, labels)} {value}" for labels, value in values)
+        return lines
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=SECONDS_BUCKETS):
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {values[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+REQUESTS = Counter("http_requests_total", "Requests handled.", ("endpoint", "method", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request duration.", ("endpoint", "method"))
+REQUEST_MONGO_COMMANDS = Histogram("http_request_mongo_commands", "MongoDB commands issued per request.",
+                                   ("endpoint",), COUNT_BUCKETS)
+REQUEST_MONGO_SECONDS = Histogram("http_request_mongo_seconds", "Time per request spent in MongoDB commands.", ("endpoint",))
+REQUEST_TEMPLATE_SECONDS = Histogram("http_request_template_seconds", "Time spent rendering templates, per request that renders one.", ("endpoint",))
+REQUEST_BCRYPT_SECONDS = Histogram("http_request_bcrypt_seconds", "Time spent waiting on bcrypt, per request that hashes.", ("endpoint",))
+MONGO_COMMAND_SECONDS = Histogram("mongo_command_duration_seconds", "MongoDB command duration.", ("command",))
+MONGO_COMMAND_FAILURES = Counter("mongo_command_failures_total", "MongoDB commands that failed.", ("command",))
+TEMPLATE_SECONDS = Histogram("template_render_seconds", "Template render duration.", ("template",))
+BCRYPT_SECONDS = Histogram("bcrypt_seconds", "bcrypt call duration, queueing included.", ("op",))
+SLOW_REQUESTS = Counter("http_slow_requests_total", "Requests over the slow-request threshold.", ("endpoint",))
+
+METRICS = (REQUESTS, REQUEST_SECONDS, REQUEST_MONGO_COMMANDS, REQUEST_MONGO_SECONDS, REQUEST_TEMPLATE_SECONDS,
+           REQUEST_BCRYPT_SECONDS, MONGO_COMMAND_SECONDS, MONGO_COMMAND_FAILURES, TEMPLATE_SECONDS, BCRYPT_SECONDS,
+           SLOW_REQUESTS)
+
+class _RequestStats:
+    __slots__ = ("started", "mongo_commands", "mongo_seconds", "template_seconds", "bcrypt_seconds",
+                 "template_starts", "commands", "recorded")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.template_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+        self.template_starts = []
+        self.commands = []  # (command document, seconds) for the slow-request log
+        self.recorded = False
+
+# The stats of the request running in this thread (None outside requests)
+_current = contextvars.ContextVar("request_stats", default=None)
+
+def shape(value):
+    """A query with its values blanked: ``{"status": "?", "budget": {"$gte": "?"}}``."""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [shape(item) for item in value[:3]] if any(isinstance(item, dict) for item in value) else "?"
+    return "?"
+
+_SHAPE_FIELDS = ("filter", "query", "sort", "pipeline", "updates", "deletes", "q", "projection")
+
+def command_shape(command):
+    name = next(iter(command), "?")
+    parts = {field: shape(command[field]) for field in _SHAPE_FIELDS if field in command}
+    return f"{name} {command.get(name)} {parts}" if parts else f"{name} {command.get(name)}"
+
+class _CommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}  # request_id -> command, only while a request is being traced
+
+    def started(self, event):
+        stats = _current.get()
+        if stats is not None and len(stats.commands) < MAX_SHAPES_PER_REQUEST:
+            self._pending[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        if _enabled:
+            MONGO_COMMAND_FAILURES.inc(event.command_name)
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._pending.pop((event.connection_id, event.request_id), None)
+        if not _enabled:
+            return
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, event.command_name)
+        stats = _current.get()
+        if stats is not None:
+            stats.mongo_commands += 1
+            stats.mongo_seconds += seconds
+            if command is not None:
+                stats.commands.append((command, seconds))
+
+command_listener = _CommandListener()
+_registered = False
+
+def record_bcrypt(op, seconds):
+    # Called by the password service with the time the caller waited
+    if not _enabled:
+        return
+    BCRYPT_SECONDS.observe(seconds, op)
+    stats = _current.get()
+    if stats is not None:
+        stats.bcrypt_seconds += seconds
+
+def _template_started(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None:
+        stats.template_starts.append(time.perf_counter())
+
+def _template_finished(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None and stats.template_starts:
+        seconds = time.perf_counter() - stats.template_starts.pop()
+        if not stats.template_starts:
+            stats.template_seconds += seconds  # nested renders are already inside the outer one
+        TEMPLATE_SECONDS.observe(seconds, template.name or "<string>")
+
+def _start_request():
+    if _enabled:
+        g._metrics_token = _current.set(_RequestStats())
+
+def _record(stats, status):
+    stats.recorded = True
+    seconds = time.perf_counter() - stats.started
+    endpoint = request.endpoint or "unmatched"  # unknown paths share one series
+    REQUESTS.inc(endpoint, request.method, str(status))
+    REQUEST_SECONDS.observe(seconds, endpoint, request.method)
+    REQUEST_MONGO_COMMANDS.observe(stats.mongo_commands, endpoint)
+    REQUEST_MONGO_SECONDS.observe(stats.mongo_seconds, endpoint)
+    if stats.template_seconds:
+        REQUEST_TEMPLATE_SECONDS.observe(stats.template_seconds, endpoint)
+    if stats.bcrypt_seconds:
+        REQUEST_BCRYPT_SECONDS.observe(stats.bcrypt_seconds, endpoint)
+    threshold = current_app.config["METRICS_SLOW_REQUEST_SECONDS"]
+    if threshold and seconds >= threshold:
+        SLOW_REQUESTS.inc(endpoint)
+        _log_slow(endpoint, seconds, status, stats)
+
+def _log_slow(endpoint, seconds, status, stats):
+    shapes = {}
+    for command, command_seconds in stats.commands:
+        key = command_shape(command)
+        count, total = shapes.get(key, (0, 0.0))
+        shapes[key] = (count + 1, total + command_seconds)
+    heaviest = sorted(shapes.items(), key=lambda item: -item[1][1])[:10]
+    slow_log.warning(
+        "%s %s (%s) %s took %.0f ms: mongo %d commands / %.0f ms, templates %.0f ms, bcrypt %.0f ms%s",
+        request.method, request.path, endpoint, status, seconds * 1000, stats.mongo_commands,
+        stats.mongo_seconds * 1000, stats.template_seconds * 1000, stats.bcrypt_seconds * 1000,
+        "".join(f"\n    {count}x {total * 1000:.1f} ms  {key}" for key, (count, total) in heaviest),
+    )
+
+def _finish_request(response):
+    stats = _current.get()
+    if stats is not None and not stats.recorded:
+        _record(stats, response.status_code)
+    return response
+
+def _teardown_request(error):
+    stats = _current.get()
+    if stats is not None:
+        if not stats.recorded:
+            _record(stats, 500)  # the view raised
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            _current.reset(token)
+
+def expose():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+def allowed():
+    # Whether this request may read /metrics or an internal stats page
+    config = current_app.config
+    token = config.get("METRICS_TOKEN")
+    if token:
+        header = request.headers.get("Authorization", "")
+        return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+    if "X-Forwarded-For" in request.headers or "Forwarded" in request.headers:
+        return False
+    return request.remote_addr in config.get("METRICS_ALLOWED_ADDRS", LOCAL_ADDRS)
+
+def _metrics_view():
+    if not allowed():
+        return "Not found", 404
+    return current_app.response_class(expose(), mimetype="text/plain; version=0.0.4")
+
+def init_app(app):
+    """Call before the app connects to MongoDB, so its client gets the command listener."""
+    app.config.setdefault("METRICS_ENABLED", True)
+    app.config.setdefault("METRICS_SLOW_REQUEST_SECONDS", 0.5)
+    app.config.setdefault("METRICS_TOKEN", None)
+    app.config.setdefault("METRICS_ALLOWED_ADDRS", LOCAL_ADDRS)
+    enable(app.config["METRICS_ENABLED"])
+    global _registered
+    if not _registered:
+        monitoring.register(command_listener)
+        _registered = True
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+    app.add_url_rule("/metrics", "metrics", _metrics_view)
@@ -0,0 +1,65 @@
+# app/services/pagination.py
+
+import base64
+import binascii
+from urllib.parse import urlencode
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import request
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+class InvalidCursor(ValueError):
+    pass
+
+# Cursors are the urlsafe base64 of the last _id on the previous page, so
+# callers never see (or depend on) the raw ObjectId ordering key.
+def encode_cursor(object_id):
+    return base64.urlsafe_b64encode(ObjectId(object_id).binary).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return ObjectId(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, InvalidId, TypeError, ValueError, UnicodeEncodeError):
+        raise InvalidCursor("Invalid page cursor")
+
+def next_page_url(cursor):
+    # Template global: this page's URL at ``cursor``, keeping limit and any other args
+    args = request.args.to_dict(flat=False)
+    args['cursor'] = [cursor]
+    return '?' + urlencode(args, doseq=True)
+
+def clamp_page_size(limit):
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def paginate(queryset, cursor=None, limit=None, fields=None, newest_first=False, raw=False):
+    """Return one keyset page of ``queryset`` ordered by ``_id``.
+
+    Returns ``(items, next_cursor)``; ``next_cursor`` is None on the last page.
+    One extra document is fetched to detect whether another page exists.
+    ``newest_first`` walks ``_id`` descending, i.e. by creation time.
+    ``raw`` returns the documents as pymongo dicts instead of model instances.
+    """
+    limit = clamp_page_size(limit)
+    if cursor:
+        if newest_first:
+            queryset = queryset.filter(id__lt=decode_cursor(cursor))
+        else:
+            queryset = queryset.filter(id__gt=decode_cursor(cursor))
+    if fields:
+        queryset = queryset.only(*fields)
+
+    order = '-id' if newest_first else '+id'
+    queryset = queryset.no_dereference().order_by(order).limit(limit + 1)
+    items = list(queryset.as_pymongo() if raw else queryset)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1]['_id'] if raw else items[-1].id)
+    return items, next_cursor
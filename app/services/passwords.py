@@ -0,0 +1,158 @@
+# app/services/passwords.py
+#
+# bcrypt hashing off the request thread. bcrypt releases the GIL, so a thread
+# pool lets several hashes run on separate cores while the request threads
+# only wait on the result. The number of calls queued or running is bounded;
+# once the pool is saturated new calls are rejected immediately with
+# PasswordServiceBusy (rendered as a 503) instead of piling up behind it.
+#
+# Config (read from the Flask app on first use):
+#   BCRYPT_LOG_ROUNDS        target cost factor (default 12)
+#   PASSWORD_POOL_WORKERS    threads hashing concurrently (default: CPU count)
+#   PASSWORD_POOL_QUEUE      max calls waiting for a thread (default: 4 x workers)
+#   PASSWORD_POOL_TIMEOUT    seconds a caller waits for its result (default 10)
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+from flask import current_app, render_template
+from app.services import metrics
+
+class PasswordServiceBusy(Exception):
+    pass
+
+class _CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def record(self, wait, run):
+        self.calls += 1
+        self.wait_seconds += wait
+        self.run_seconds += run
+        self.max_run_seconds = max(self.max_run_seconds, run)
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "wait_seconds": self.wait_seconds,
+            "run_seconds": self.run_seconds,
+            "max_run_seconds": self.max_run_seconds,
+            "avg_run_seconds": self.run_seconds / self.calls if self.calls else 0.0,
+        }
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=None, queue_size=None, timeout=10):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        # Slots for calls running or queued; acquiring never blocks
+        self._slots = threading.BoundedSemaphore(self.workers + (queue_size if queue_size is not None else self.workers * 4))
+        self._lock = threading.Lock()
+        self._stats = {"hash": _CallStats(), "check": _CallStats()}
+        self.rejected = 0
+
+    def _submit(self, op, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordServiceBusy("Password service is at capacity")
+
+        queued_at = time.perf_counter()
+        timings = {}
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings["wait"] = started - queued_at
+                timings["run"] = time.perf_counter() - started
+
+        def done(_):
+            self._slots.release()
+            with self._lock:
+                self._stats[op].record(timings.get("wait", 0.0), timings.get("run", 0.0))
+
+        future = self._executor.submit(run)
+        future.add_done_callback(done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordServiceBusy("Password service timed out")
+        finally:
+            metrics.record_bcrypt(op, time.perf_counter() - queued_at)
+
+    def hash_password(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._submit("hash", bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def check_password(self, password_hash, password):
+        if not password_hash or password is None:
+            return False
+        try:
+            return self._submit("check", bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+        except ValueError:
+            # Not a bcrypt hash (e.g. a legacy plain-text value)
+            return False
+
+    def needs_rehash(self, password_hash):
+        # "$2b$12$..." -> 12
+        try:
+            return int(password_hash.split("$")[2]) < self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            stats = {op: call_stats.snapshot() for op, call_stats in self._stats.items()}
+            stats["rejected"] = self.rejected
+        stats["workers"] = self.workers
+        stats["rounds"] = self.rounds
+        return stats
+
+def _busy(error):
+    return render_template("error.html", statusCode=503, message="Server is busy, please retry shortly."), 503, {"Retry-After": "1"}
+
+def init_app(app):
+    app.config.setdefault("BCRYPT_LOG_ROUNDS", 12)
+    app.config.setdefault("PASSWORD_POOL_WORKERS", None)
+    app.config.setdefault("PASSWORD_POOL_QUEUE", None)
+    app.config.setdefault("PASSWORD_POOL_TIMEOUT", 10)
+    app.register_error_handler(PasswordServiceBusy, _busy)
+
+_create_lock = threading.Lock()
+
+def get_hasher():
+    # One pool per app, created on first use so forked workers build their own
+    app = current_app._get_current_object()
+    hasher = app.extensions.get("password_hasher")
+    if hasher is None:
+        with _create_lock:
+            hasher = app.extensions.get("password_hasher")
+            if hasher is None:
+                hasher = PasswordHasher(
+                    rounds=app.config["BCRYPT_LOG_ROUNDS"],
+                    workers=app.config["PASSWORD_POOL_WORKERS"],
+                    queue_size=app.config["PASSWORD_POOL_QUEUE"],
+                    timeout=app.config["PASSWORD_POOL_TIMEOUT"],
+                )
+                app.extensions["password_hasher"] = hasher
+    return hasher
+
+def hash_password(password):
+    return get_hasher().hash_password(password)
+
+def check_password(password_hash, password):
+    return get_hasher().check_password(password_hash, password)
+
+def needs_rehash(password_hash):
+    return get_hasher().needs_rehash(password_hash)
+
+def stats():
+    return get_hasher().stats()
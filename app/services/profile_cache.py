@@ -0,0 +1,255 @@
+# app/services/profile_cache.py
+#
+# Read-through cache for profile pages. Profiles are read far more often than
+# they change, so show/edit views load the raw profile document (and small
+# derived lists such as the newest projects) through here, and every route
+# that writes a profile or its children calls invalidate().
+#
+# Backends are cachelib caches:
+#   "simple"      LRUCache below: per process, TTL plus least-recently-used eviction
+#   "filesystem"  cachelib FileSystemCache: shared by every worker on the host,
+#                 so an invalidation in one process is seen by all of them
+#
+# invalidate() only reaches the backend of the process that made the write.
+# With "simple" under several gunicorn workers (or hosts) the other workers
+# keep serving their copy until it expires, which is why the default TTL is
+# short; use "filesystem" to share invalidations between the workers of a
+# host. Nothing is shared between hosts.
+#
+# Concurrent misses on the same key are coalesced: one request loads from
+# MongoDB while the others wait for its result.
+#
+# Config:
+#   PROFILE_CACHE_TYPE     "simple" (default) or "filesystem"
+#   PROFILE_CACHE_DIR      directory for the filesystem backend
+#   PROFILE_CACHE_TTL      seconds an entry lives; bounds staleness in other workers (default 30)
+#   PROFILE_CACHE_SIZE     max entries before eviction (default 2048)
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from cachelib import BaseCache, FileSystemCache
+from flask import current_app, jsonify
+from mongoengine import DoesNotExist
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.services import metrics, reads, serialization
+
+PROFILE_MODELS = {"client": Client, "freelancer": Freelancer}
+# Derived per-profile entries dropped together with the profile itself
+VIEW_DATA = ("recent_projects", "recent_reviews")
+
+class LRUCache(BaseCache):
+    # In-process cachelib backend. Values are pickled like every other
+    # cachelib backend, so callers can never mutate a cached entry.
+
+    def __init__(self, threshold=2048, default_timeout=300):
+        super().__init__(default_timeout)
+        self._threshold = threshold
+        self._entries = OrderedDict()  # key -> (expires_at or 0, pickled value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        entry = (time.time() + timeout if timeout else 0, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._threshold:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key):
+        return self.get(key) is not None
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        return True
+
+    def __len__(self):
+        return len(self._entries)
+
+class _Flight:
+    # One in-progress load that other requests for the same key wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+        self.stale = False  # invalidated while loading; don't store the result
+
+class ProfileCache:
+    def __init__(self, backend, timeout=300, wait_timeout=5):
+        self.backend = backend
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader`` once on a miss.
+
+        ``None`` results are returned but never cached.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            # A broken cache must not take the page down; fall back to the database
+            self._count("errors")
+            value = None
+        if value is not None:
+            self._count("hits")
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self.wait_timeout) and not flight.failed:
+                self._count("coalesced")
+                return flight.value
+            # Leader failed or is stuck; load independently
+            self._count("misses")
+            return loader()
+
+        self._count("misses")
+        try:
+            flight.value = loader()
+            if flight.value is not None and not flight.stale:
+                try:
+                    self.backend.set(key, flight.value, timeout=self.timeout)
+                except Exception:
+                    self._count("errors")
+            return flight.value
+        except Exception:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, *keys):
+        for key in keys:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is not None:
+                    flight.stale = True
+                self._counters["invalidations"] += 1
+            try:
+                self.backend.delete(key)
+            except Exception:
+                self._count("errors")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        if isinstance(self.backend, LRUCache):
+            stats["evictions"] = self.backend.evictions
+            stats["entries"] = len(self.backend)
+        return stats
+
+def _make_backend(app):
+    config = app.config
+    if config["PROFILE_CACHE_TYPE"] == "filesystem":
+        directory = config["PROFILE_CACHE_DIR"] or os.path.join(app.instance_path, "profile-cache")
+        return FileSystemCache(directory, threshold=config["PROFILE_CACHE_SIZE"],
+                               default_timeout=config["PROFILE_CACHE_TTL"])
+    return LRUCache(threshold=config["PROFILE_CACHE_SIZE"], default_timeout=config["PROFILE_CACHE_TTL"])
+
+_create_lock = threading.Lock()
+
+def get_cache():
+    # One cache per app, created on first use so forked workers build their own
+    app = current_app._get_current_object()
+    cache = app.extensions.get("profile_cache")
+    if cache is None:
+        with _create_lock:
+            cache = app.extensions.get("profile_cache")
+            if cache is None:
+                cache = ProfileCache(_make_backend(app), timeout=app.config["PROFILE_CACHE_TTL"])
+                app.extensions["profile_cache"] = cache
+    return cache
+
+def profile_key(role, profile_id):
+    return f"{role}:{profile_id}"
+
+def get_profile(role, profile_id):
+    """Profile as a read record (see reads.py), never the password hash; raises DoesNotExist."""
+    model = PROFILE_MODELS[role]
+    raw = get_cache().get_or_load(
+        profile_key(role, profile_id),
+        lambda: model.objects(id=profile_id).exclude("password").as_pymongo().first(),
+    )
+    if raw is None:
+        raise DoesNotExist(f"{model.__name__} {profile_id} not found")
+    return serialization.convert(raw, reads.record_type(model))
+
+def get_view_data(role, profile_id, name, loader):
+    """Cached derived data for a profile page; ``loader`` must return picklable raw data."""
+    return get_cache().get_or_load(f"{profile_key(role, profile_id)}:{name}", loader)
+
+def peek(role, profile_id, name=None):
+    # The cached raw entry, if any; never loads and is not counted
+    key = profile_key(role, profile_id) + (f":{name}" if name else "")
+    try:
+        return get_cache().backend.get(key)
+    except Exception:
+        return None
+
+def invalidate(role, profile_id):
+    if profile_id is None:
+        return
+    key = profile_key(role, profile_id)
+    get_cache().invalidate(key, *(f"{key}:{name}" for name in VIEW_DATA))
+
+def stats():
+    return get_cache().stats()
+
+def _stats_view():
+    if not metrics.allowed():
+        return "Not found", 404
+    return jsonify(stats())
+
+def init_app(app):
+    app.config.setdefault("PROFILE_CACHE_TYPE", "simple")
+    app.config.setdefault("PROFILE_CACHE_DIR", None)
+    app.config.setdefault("PROFILE_CACHE_TTL", 30)
+    app.config.setdefault("PROFILE_CACHE_SIZE", 2048)
+    app.add_url_rule("/internal/cache-stats", "profile_cache_stats", _stats_view)
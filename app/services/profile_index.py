@@ -0,0 +1,131 @@
+# app/services/profile_index.py
+#
+# Keeps process-local indexes over freelancer profiles (search, matching) in
+# step with MongoDB.
+#
+# Each registered index is built from a projected scan on first use. Changes
+# made by this process are applied immediately: Document.save()/delete() fire
+# MongoEngine signals, and routes that use .update() call reindex(). Changes
+# made by other processes are picked up by a periodic delta scan on
+# ``Freelancer.updated_at`` and a periodic full rebuild in a background thread,
+# which also catches deletions.
+#
+# An index only needs ``upsert(doc)`` and ``remove(doc_id)``; ``doc`` is the
+# raw projected document.
+
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from mongoengine import signals
+from app.models.freelancer import Freelancer
+
+class FreelancerIndexer:
+    def __init__(self, name, make_index, fields, refresh_seconds=30, rebuild_seconds=900):
+        self.name = name
+        self.make_index = make_index
+        self.fields = ("id",) + tuple(field for field in fields if field != "id")
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.index = None
+        self._synced_at = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def _load(self, since=None):
+        query = Freelancer.objects
+        if since is not None:
+            query = query.filter(updated_at__gte=since)
+        return query.only(*self.fields).as_pymongo().batch_size(2000)
+
+    def build(self):
+        started = datetime.utcnow()
+        index = self.make_index()
+        for doc in self._load():
+            index.upsert(doc)
+        self.index = index
+        self._synced_at = started
+        self._built_at = self._checked_at = time.monotonic()
+        return index
+
+    def _rebuild_in_background(self, app):
+        def run():
+            try:
+                with app.app_context():
+                    self.build()
+            finally:
+                self._rebuilding = False
+        self._rebuilding = True
+        threading.Thread(target=run, name=f"{self.name}-rebuild", daemon=True).start()
+
+    def current(self):
+        """Return the index, building or refreshing it first when due."""
+        if self.index is None:
+            with self._lock:
+                if self.index is None:
+                    self.build()
+            return self.index
+        now = time.monotonic()
+        if now - self._built_at > self.rebuild_seconds and not self._rebuilding:
+            with self._lock:
+                if not self._rebuilding:
+                    self._rebuild_in_background(current_app._get_current_object())
+        if now - self._checked_at > self.refresh_seconds:
+            with self._lock:
+                if now - self._checked_at > self.refresh_seconds:
+                    started = datetime.utcnow()
+                    # Small overlap so writes racing the last scan are not missed
+                    for doc in self._load(since=self._synced_at - timedelta(seconds=5)):
+                        self.index.upsert(doc)
+                    self._synced_at = started
+                    self._checked_at = now
+        return self.index
+
+    def reindex(self, freelancer_id):
+        # Re-read the projected document so partial .update() calls are reflected
+        if self.index is None:
+            return
+        doc = Freelancer.objects(id=freelancer_id).only(*self.fields).as_pymongo().first()
+        if doc is None:
+            self.index.remove(freelancer_id)
+        else:
+            self.index.upsert(doc)
+
+def register(app, name, make_index, fields):
+    app.config.setdefault("PROFILE_INDEX_REFRESH_SECONDS", 30)
+    app.config.setdefault("PROFILE_INDEX_REBUILD_SECONDS", 900)
+    indexers = app.extensions.setdefault("freelancer_indexers", {})
+    indexers[name] = FreelancerIndexer(
+        name, make_index, fields,
+        refresh_seconds=app.config["PROFILE_INDEX_REFRESH_SECONDS"],
+        rebuild_seconds=app.config["PROFILE_INDEX_REBUILD_SECONDS"],
+    )
+    # connect() ignores a receiver that is already connected
+    signals.post_save.connect(_on_save, sender=Freelancer, weak=False)
+    signals.post_delete.connect(_on_delete, sender=Freelancer, weak=False)
+
+def _indexers():
+    if not has_app_context():
+        return []
+    return list(current_app.extensions.get("freelancer_indexers", {}).values())
+
+def get_indexer(name):
+    return current_app.extensions["freelancer_indexers"][name]
+
+def reindex(freelancer_id):
+    for indexer in _indexers():
+        indexer.reindex(freelancer_id)
+
+def _on_save(sender, document, **kwargs):
+    doc = None
+    for indexer in _indexers():
+        if indexer.index is not None:
+            doc = doc or document.to_mongo().to_dict()
+            indexer.index.upsert(doc)
+
+def _on_delete(sender, document, **kwargs):
+    for indexer in _indexers():
+        if indexer.index is not None:
+            indexer.index.remove(document.id)
@@ -0,0 +1,282 @@
+# app/services/profiling.py
+#
+# Profiling a live worker without redeploying. Two modes:
+#
+#   cProfile, one request at a time. A request carrying the header
+#   "X-Profile: <PROFILING_TOKEN>" is profiled and its response names the
+#   file in X-Profile-File; with PROFILING_SAMPLE_RATE set, that fraction of
+#   all requests is profiled too. Each profile is a pstats file named
+#   <time>-<endpoint>-<pid>-<n>.prof.
+#
+#   Stack sampling, for everything. With PROFILING_STACK_INTERVAL set, a
+#   background thread looks at the stack of every thread serving a request
+#   that often and counts them per endpoint. The counts are written every
+#   PROFILING_STACK_FLUSH_SECONDS as collapsed stacks
+#   ("endpoint;frame;frame count"), which flamegraph.pl and speedscope read.
+#   The request threads do nothing but note which endpoint they are serving.
+#
+# Files go to PROFILING_DIR; only the newest PROFILING_MAX_FILES are kept.
+# profiles.py merges them and ranks functions by cumulative time.
+#
+# Config:
+#   PROFILING_TOKEN                 secret for the X-Profile header (default None: header ignored)
+#   PROFILING_SAMPLE_RATE           fraction of requests to cProfile (default 0)
+#   PROFILING_STACK_INTERVAL        seconds between stack samples (default 0: off; 0.01 is ~1% CPU)
+#   PROFILING_STACK_FLUSH_SECONDS   seconds between collapsed-stack files (default 60)
+#   PROFILING_DIR                   where profiles are written (default "profiles")
+#   PROFILING_MAX_FILES             files kept in PROFILING_DIR (default 500)
+
+import atexit
+import fnmatch
+import hmac
+import itertools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Profile"
+MAX_DEPTH = 128  # frames kept per sampled stack, outermost dropped first
+
+_sequence = itertools.count()
+
+def _filename(endpoint, suffix, when=None):
+    stamp = (when or datetime.utcnow()).strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{endpoint}-{os.getpid()}-{next(_sequence)}{suffix}"
+
+def parse_filename(name):
+    """``(datetime, endpoint)`` from a profile file name, or None."""
+    try:
+        stamp, rest = name.split("-", 1)
+        endpoint = rest.rsplit("-", 2)[0]
+        return datetime.strptime(stamp, "%Y%m%dT%H%M%S"), endpoint
+    except ValueError:
+        return None
+
+def rotate(directory, keep):
+    # Drop the oldest files beyond ``keep``
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith((".prof", ".folded"))]
+    except FileNotFoundError:
+        return
+    if len(names) <= keep:
+        return
+    paths = sorted((os.path.join(directory, name) for name in names), key=os.path.getmtime)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # another worker got there first
+
+def _write(config, name, write):
+    directory = config["PROFILING_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    write(path + ".tmp")
+    os.replace(path + ".tmp", path)  # the CLI never sees half a file
+    rotate(directory, config["PROFILING_MAX_FILES"])
+    return name
+
+# --- per-request cProfile ---
+
+def _trigger(config):
+    # "header", "sample" or None
+    token, rate = config["PROFILING_TOKEN"], config["PROFILING_SAMPLE_RATE"]
+    if token:
+        header = request.headers.get(HEADER)
+        if header and hmac.compare_digest(header.encode(), token.encode()):
+            return "header"
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+def _start_profile():
+    trigger = _trigger(current_app.config)
+    if trigger:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # another profiler is active on this thread
+        g._profiler = (profiler, trigger)
+
+def _finish_profile(response):
+    profiling = g.pop("_profiler", None)
+    if profiling is not None:
+        profiler, trigger = profiling
+        profiler.disable()
+        name = _filename(request.endpoint or "unmatched", ".prof")
+        _write(current_app.config, name, profiler.dump_stats)
+        if trigger == "header":
+            response.headers["X-Profile-File"] = name
+    return response
+
+def _abandon_profile(error):
+    profiling = g.pop("_profiler", None)
+    if profiling is not None:
+        profiler = profiling[0]
+        profiler.disable()  # the view raised; after_request never ran
+        _write(current_app.config, _filename(request.endpoint or "unmatched", ".prof"), profiler.dump_stats)
+
+# --- stack sampling ---
+
+class StackSampler:
+    def __init__(self, interval, flush_seconds, config):
+        self.interval = interval
+        self.flush_seconds = flush_seconds
+        self.config = config
+        self.active = {}  # thread id -> endpoint, for threads serving a request
+        self.counts = Counter()  # (endpoint, stack) -> samples
+        self.samples = 0
+        self._labels = {}  # code object -> frame label
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join(self.interval * 10)
+            self.flush()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            short = os.path.relpath(filename) if filename.startswith(os.getcwd()) else os.path.basename(filename)
+            label = self._labels[code] = f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ",")
+        return label
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id, endpoint in self.active.copy().items():
+            frame = frames.get(thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                with self._lock:
+                    self.counts[(endpoint, ";".join(stack))] += 1
+        self.samples += 1
+
+    def flush(self):
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+        if not counts:
+            return None
+
+        def write(path):
+            with open(path, "w") as f:
+                for (endpoint, stack), count in counts.most_common():
+                    f.write(f"{endpoint};{stack} {count}\n")
+
+        return _write(self.config, _filename("stacks", ".folded"), write)
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+                if time.monotonic() >= next_flush:
+                    next_flush = time.monotonic() + self.flush_seconds
+                    self.flush()
+            except Exception:
+                logger.exception("Stack sampler failed")
+
+_create_lock = threading.Lock()
+
+def get_sampler():
+    # One sampler per process, started on first use so forked workers run their own
+    app = current_app._get_current_object()
+    sampler = app.extensions.get("stack_sampler")
+    if sampler is None or sampler[0] != os.getpid():
+        with _create_lock:
+            sampler = app.extensions.get("stack_sampler")
+            if sampler is None or sampler[0] != os.getpid():
+                instance = StackSampler(app.config["PROFILING_STACK_INTERVAL"],
+                                        app.config["PROFILING_STACK_FLUSH_SECONDS"], app.config)
+                instance.start()
+                sampler = app.extensions["stack_sampler"] = (os.getpid(), instance)
+    return sampler[1]
+
+def _enter_sampled():
+    if current_app.config["PROFILING_STACK_INTERVAL"]:
+        get_sampler().active[threading.get_ident()] = request.endpoint or "unmatched"
+
+def _leave_sampled(error):
+    sampler = current_app.extensions.get("stack_sampler")
+    if sampler is not None:
+        sampler[1].active.pop(threading.get_ident(), None)
+
+# --- reading captured profiles ---
+
+def _select(directory, suffix, endpoint=None, since=None):
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(suffix):
+            continue
+        parsed = parse_filename(name)
+        if parsed is None:
+            continue
+        when, name_endpoint = parsed
+        if since and when < since:
+            continue
+        if endpoint and suffix == ".prof" and not fnmatch.fnmatch(name_endpoint, endpoint):
+            continue
+        yield os.path.join(directory, name)
+
+def merge_profiles(directory, endpoint=None, since=None):
+    """Combine the cProfile files matching ``endpoint`` (a glob); ``(pstats.Stats or None, files)``."""
+    import pstats
+
+    stats, files = None, 0
+    for path in _select(directory, ".prof", endpoint, since):
+        try:
+            if stats is None:
+                stats = pstats.Stats(path)
+            else:
+                stats.add(path)
+        except (EOFError, TypeError, ValueError):
+            logger.warning("Skipping unreadable profile %s", path)
+            continue
+        files += 1
+    return stats, files
+
+def merge_stacks(directory, endpoint=None, since=None):
+    """Sum the collapsed-stack files; ``(Counter of "endpoint;frames" -> samples, files)``."""
+    counts, files = Counter(), 0
+    for path in _select(directory, ".folded", since=since):
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and (not endpoint or fnmatch.fnmatch(stack.split(";", 1)[0], endpoint)):
+                    counts[stack] += int(count)
+        files += 1
+    return counts, files
+
+def init_app(app):
+    app.config.setdefault("PROFILING_TOKEN", None)
+    app.config.setdefault("PROFILING_SAMPLE_RATE", 0.0)
+    app.config.setdefault("PROFILING_STACK_INTERVAL", 0)
+    app.config.setdefault("PROFILING_STACK_FLUSH_SECONDS", 60)
+    app.config.setdefault("PROFILING_DIR", "profiles")
+    app.config.setdefault("PROFILING_MAX_FILES", 500)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+    app.before_request(_enter_sampled)
+    app.teardown_request(_leave_sampled)
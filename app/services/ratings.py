@@ -0,0 +1,108 @@
+# app/services/ratings.py
+#
+# Materialized review aggregates on Freelancer.rating, so reputation can be
+# shown without reading the reviews collection.
+#
+# Review writes adjust the summary with a single $inc of deltas (a rating
+# change moves one unit between histogram buckets). reconcile() rebuilds every
+# summary from scratch with one aggregation pipeline and fixes any drift, e.g.
+# from a request that died between the review write and the $inc.
+
+from datetime import datetime
+from bson import ObjectId
+from app.models.freelancer import Freelancer
+from app.models.review import Review
+from app.services import jobs
+
+STARS = range(1, 6)
+
+class InvalidRating(ValueError):
+    pass
+
+def parse_rating(value):
+    # Form input to a star count; anything else would corrupt the histogram
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        rating = None
+    if rating not in STARS:
+        raise InvalidRating(f"Rating must be a whole number from {STARS[0]} to {STARS[-1]}")
+    return rating
+
+def empty_summary():
+    return {"count": 0, "total": 0, "histogram": {str(star): 0 for star in STARS}, "last_review_at": None}
+
+def apply(freelancer_id, added=None, removed=None, reviewed_at=None):
+    """Apply one review create (``added``), delete (``removed``) or edit (both)."""
+    deltas = {}
+
+    def bump(path, amount):
+        deltas[path] = deltas.get(path, 0) + amount
+
+    if added is not None:
+        bump("rating.count", 1)
+        bump("rating.total", int(added))
+        bump(f"rating.histogram.{int(added)}", 1)
+    if removed is not None:
+        bump("rating.count", -1)
+        bump("rating.total", -int(removed))
+        bump(f"rating.histogram.{int(removed)}", -1)
+    deltas = {path: amount for path, amount in deltas.items() if amount}
+
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+    if deltas:
+        update["$inc"] = deltas
+    if reviewed_at is not None:
+        update["$max"] = {"rating.last_review_at": reviewed_at}
+    Freelancer._get_collection().update_one({"_id": ObjectId(freelancer_id)}, update)
+
+def _pipeline(freelancer_ids=None):
+    pipeline = []
+    if freelancer_ids is not None:
+        pipeline.append({"$match": {"freelancer": {"$in": [ObjectId(i) for i in freelancer_ids]}}})
+    group = {
+        "_id": "$freelancer",
+        "count": {"$sum": 1},
+        "total": {"$sum": "$rating"},
+        "last_review_at": {"$max": "$created_at"},
+    }
+    for star in STARS:
+        group[f"star{star}"] = {"$sum": {"$cond": [{"$eq": ["$rating", star]}, 1, 0]}}
+    pipeline.append({"$group": group})
+    return pipeline
+
+def reconcile(freelancer_ids=None):
+    """Recompute summaries from the reviews collection; returns how many changed."""
+    collection = Freelancer._get_collection()
+    started = datetime.utcnow()
+    seen = set()
+    changed = 0
+    for row in Review._get_collection().aggregate(_pipeline(freelancer_ids), allowDiskUse=True):
+        seen.add(row["_id"])
+        summary = {
+            "count": row["count"],
+            "total": row["total"],
+            "histogram": {str(star): row[f"star{star}"] for star in STARS},
+            "last_review_at": row["last_review_at"],
+        }
+        # Only touch documents whose summary actually differs
+        result = collection.update_one(
+            {"_id": row["_id"], "rating": {"$ne": summary}},
+            {"$set": {"rating": summary, "updated_at": started}},
+        )
+        changed += result.modified_count
+
+    # Freelancers whose last review was deleted
+    query = {"rating.count": {"$ne": 0}}
+    if freelancer_ids is not None:
+        query["_id"] = {"$in": [ObjectId(i) for i in freelancer_ids]}
+    stale = [doc["_id"] for doc in collection.find(query, {"_id": 1}) if doc["_id"] not in seen]
+    if stale:
+        result = collection.update_many({"_id": {"$in": stale}},
+                                        {"$set": {"rating": empty_summary(), "updated_at": started}})
+        changed += result.modified_count
+    return changed
+
+@jobs.handler("ratings.reconcile")
+def reconcile_job(freelancer_ids=None):
+    reconcile(freelancer_ids)
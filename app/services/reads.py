@@ -0,0 +1,83 @@
+# app/services/reads.py
+#
+# Read side of the data layer. Pages that only display data run projected
+# as_pymongo() queries straight into msgspec records (the Structs in
+# serialization.py): no Document is built, validated, change-tracked or
+# lazily dereferenced. MongoEngine stays the write path.
+#
+# Records use the models' attribute names (``record.id``, ``record.location.city``,
+# ``record.rating.mean``), so templates render them like documents. Treat them
+# as read-only snapshots.
+#
+#   projects, next_cursor = reads.page(Project.objects(client=client_id), newest_first=True)
+#
+# attach() is the batched replacement for Mongoose-style populate(): instead
+# of MongoEngine dereferencing each reference on first access (one query per
+# review / reviewer), it collects the ids across all records and loads the
+# targets with a single $in query. It replaces the Document-based
+# resolver.resolve(), removed once every page it served read records.
+#
+#   reads.attach(reviews, "reviewer", Client, fields=("id", "first_name", "last_name"))
+
+from mongoengine import DoesNotExist
+from app.models.agreement import Agreement
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.models.project import Project
+from app.models.review import Review
+from app.models.transaction import Transaction
+from app.services import serialization
+from app.services.pagination import paginate
+
+RECORDS = {
+    Client: serialization.Client,
+    Freelancer: serialization.Freelancer,
+    Project: serialization.Project,
+    Review: serialization.Review,
+    Agreement: serialization.Agreement,
+    Transaction: serialization.Transaction,
+}
+
+def record_type(model):
+    return RECORDS[model]
+
+def _raw(queryset, fields):
+    schema = record_type(queryset._document)
+    return queryset.only(*(fields or serialization.fields(schema))).as_pymongo(), schema
+
+def find(queryset, fields=None):
+    """All matches of ``queryset`` as records, loading only ``fields`` (default: the record's)."""
+    docs, schema = _raw(queryset, fields)
+    return serialization.convert_many(docs, schema)
+
+def first(queryset, fields=None):
+    docs, schema = _raw(queryset, fields)
+    doc = docs.first()
+    return None if doc is None else serialization.convert(doc, schema)
+
+def get(queryset, fields=None):
+    record = first(queryset, fields)
+    if record is None:
+        raise DoesNotExist(f"{queryset._document.__name__} matching query does not exist.")
+    return record
+
+def page(queryset, cursor=None, limit=None, fields=None, newest_first=False):
+    """``paginate()`` returning records; see pagination.py for the cursor rules."""
+    schema = record_type(queryset._document)
+    docs, next_cursor = paginate(queryset, cursor=cursor, limit=limit,
+                                 fields=fields or serialization.fields(schema),
+                                 newest_first=newest_first, raw=True)
+    return serialization.convert_many(docs, schema), next_cursor
+
+def attach(records, name, model, fields=None):
+    """Replace the id in ``record.<name>`` with the referenced record, one ``$in`` query for all.
+
+    Dangling references become None. Returns ``records``.
+    """
+    wanted = {getattr(record, name) for record in records} - {None}
+    loaded = {}
+    if wanted:
+        loaded = {record.id: record for record in find(model.objects(id__in=list(wanted)), fields)}
+    for record in records:
+        setattr(record, name, loaded.get(getattr(record, name)))
+    return records
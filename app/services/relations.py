@@ -0,0 +1,75 @@
+# app/services/relations.py
+#
+# One-to-many relationships used to be reference arrays inside the profile
+# documents (Freelancer.reviews, Client.projects, ...). They grew without
+# bound, were loaded with every profile and rewritten by every push__. The
+# child collections now carry an indexed key back to their owner and are read
+# with paginated, newest-first queries; migrate() moves existing data over.
+
+from pymongo import UpdateOne
+from app.models.application import Application
+from app.models.agreement import Agreement
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.models.project import Project
+from app.models.review import Review
+from app.models.transaction import Transaction
+
+# (owner model, legacy array field, child collection, key on the child pointing at the owner)
+LEGACY_ARRAYS = [
+    (Client, "projects", lambda: Project._get_collection(), "client"),
+    (Client, "reviews", lambda: Review._get_collection(), "reviewer"),
+    (Client, "agreements", lambda: Agreement._get_collection(), "client"),
+    (Client, "transaction_history", lambda: Transaction._get_collection(), "user"),
+    (Freelancer, "reviews", lambda: Review._get_collection(), "freelancer"),
+    (Freelancer, "projects", lambda: Project._get_collection(), "assigned_freelancer"),
+    (Freelancer, "transaction_history", lambda: Transaction._get_collection(), "user"),
+    (Freelancer, "applied_projects", None, None),  # becomes Application documents
+]
+
+def _owned_arrays(model, field, batch_size):
+    # Owners that still carry the legacy array; ids only plus the array itself
+    return model._get_collection().find(
+        {field: {"$exists": True}}, {field: 1}, batch_size=batch_size
+    )
+
+def _backfill_key(children, key, owner_id, child_ids):
+    # Never overwrite an owner the child already records
+    result = children.update_many(
+        {"_id": {"$in": child_ids}, key: None},
+        {"$set": {key: owner_id}},
+    )
+    return result.modified_count
+
+def _backfill_applications(owner_id, project_ids):
+    if not project_ids:
+        return 0
+    requests = [
+        UpdateOne(
+            {"freelancer": owner_id, "project": project_id},
+            {"$setOnInsert": {"created_at": project_id.generation_time.replace(tzinfo=None)}},
+            upsert=True,
+        )
+        for project_id in project_ids
+    ]
+    return Application._get_collection().bulk_write(requests, ordered=False).upserted_count
+
+def migrate(batch_size=500, drop_arrays=True, log=print):
+    """Copy every legacy reference array onto its child collection, then unset it.
+
+    Safe to rerun; children that already point at an owner are left alone.
+    """
+    for model, field, children, key in LEGACY_ARRAYS:
+        collection = model._get_collection()
+        owners = 0
+        linked = 0
+        for owner in _owned_arrays(model, field, batch_size):
+            child_ids = [ref.id if hasattr(ref, "id") else ref for ref in owner.get(field) or []]
+            if children is None:
+                linked += _backfill_applications(owner["_id"], child_ids)
+            elif child_ids:
+                linked += _backfill_key(children(), key, owner["_id"], child_ids)
+            if drop_arrays:
+                collection.update_one({"_id": owner["_id"]}, {"$unset": {field: ""}})
+            owners += 1
+        log(f"{collection.name}.{field}: {owners} owners, {linked} children linked")
@@ -0,0 +1,223 @@
+# app/services/scheduler.py
+#
+# Acts on deadlines. Each tick:
+#   - cancels Open projects whose deadline has passed
+#   - terminates agreements still Pending after SCHEDULER_PENDING_AGREEMENT_DAYS
+#   - moves expired projects that were never assigned into projects_archive
+#     once they are SCHEDULER_ARCHIVE_AFTER_DAYS old; the archive drops them
+#     after SCHEDULER_ARCHIVE_TTL_DAYS (TTL index)
+#   - writes the Agreement of assignments whose request died before it
+#     (assignments.repair, read from the agreement_pending index)
+#
+# Due documents are read in batches from partial indexes (open_by_deadline,
+# pending_by_age, expired), so a tick touches only what is due and never
+# scans a collection. Each batch changes status with one update_many guarded
+# on the same conditions, so anything changed since it was read is skipped.
+# The update also sets expiry_pending; the status events and counters
+# (workflow.commit_many) are written next and the flag cleared. If the
+# scheduler dies in between, the next tick finds the flag and finishes.
+# Archiving works the same way: the copy in projects_archive carries
+# archive_pending until the project is deleted and its event written.
+#
+# Every event the scheduler writes has a key ("project:<id>:expired"), so a
+# replayed batch logs and counts each change once. The one gap is a death
+# after the events and before their counters: the replay can't tell, so it
+# queues a workflow.rebuild_counters job instead.
+#
+# Only the holder of the "scheduler" lease works; run as many scheduler
+# processes as you like and the others take over when it stops renewing.
+# Every step is safe to repeat, so a holder that overruns its lease does no
+# harm either.
+#
+# Config:
+#   SCHEDULER_INTERVAL                 seconds between ticks (default 30)
+#   SCHEDULER_LEASE_SECONDS            lease length; keep well above the interval (default 120)
+#   SCHEDULER_BATCH_SIZE               documents per update_many (default 500)
+#   SCHEDULER_MAX_BATCHES              batches per step per tick (default 20)
+#   SCHEDULER_PENDING_AGREEMENT_DAYS   unsigned agreements expire after (default 14)
+#   SCHEDULER_ARCHIVE_AFTER_DAYS       expired projects are archived after (default 30; 0 disables)
+#   SCHEDULER_ARCHIVE_TTL_DAYS         archived projects are deleted after (default 365)
+
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.models.agreement import AgreementStatus
+from app.models.lease import Lease
+from app.models.project import Project
+from app.services import assignments, jobs, profile_cache, workflow
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+ARCHIVE_COLLECTION = "projects_archive"
+
+def acquire(name, owner, seconds):
+    """Take or renew lease ``name`` for ``owner``; False while someone else holds it."""
+    now = datetime.utcnow()
+    try:
+        lease = Lease._get_collection().find_one_and_update(
+            {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=seconds), "renewed_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        return False  # held: the upsert tried to insert a second lease document
+    return lease is not None
+
+def release(name, owner):
+    Lease._get_collection().update_one({"_id": name, "owner": owner}, {"$set": {"expires_at": datetime.utcnow()}})
+
+def _touch(machine, docs):
+    if machine is workflow.PROJECT:
+        for doc in docs:
+            profile_cache.invalidate("client", doc.get("client"))
+            profile_cache.invalidate("freelancer", doc.get("assigned_freelancer"))
+
+def _commit(machine, changes, keys):
+    recorded = workflow.commit_many(machine, changes, keys=keys)
+    if recorded < len(changes):
+        # Some were logged by a run that may have died before counting them
+        logger.warning("Scheduler replayed %d %s changes; queueing a counter rebuild",
+                       len(changes) - recorded, machine.kind)
+        jobs.enqueue("workflow.rebuild_counters")
+
+def _log_expiries(machine, from_status, batch_size):
+    # Write events and counters for expiries flagged expiry_pending, then clear the flag
+    collection = machine.model._get_collection()
+    logged = 0
+    while True:
+        docs = list(collection.find({"expiry_pending": True}, sort=[("expired_at", 1)], limit=batch_size))
+        if not docs:
+            return logged
+        _commit(machine, [({**doc, "status": from_status}, doc) for doc in docs],
+                [f"{machine.kind}:{doc['_id']}:expired" for doc in docs])
+        collection.update_many({"_id": {"$in": [doc["_id"] for doc in docs]}}, {"$unset": {"expiry_pending": ""}})
+        _touch(machine, docs)
+        logged += len(docs)
+
+def _expire(machine, due, from_status, to_status, now, batch_size, max_batches):
+    collection = machine.model._get_collection()
+    expired = _log_expiries(machine, from_status, batch_size)  # left over from a previous run
+    for _ in range(max_batches):
+        ids = [doc["_id"] for doc in collection.find(due, {"_id": 1}, limit=batch_size)]
+        if not ids:
+            break
+        collection.update_many(
+            {**due, "_id": {"$in": ids}},
+            {"$set": {"status": to_status, "updated_at": now, "expired_at": now, "expiry_pending": True},
+             "$inc": {"version": 1}},
+        )
+        expired += _log_expiries(machine, from_status, batch_size)
+        if len(ids) < batch_size:
+            break
+    return expired
+
+def _settle_archived(archive, archivable, ids):
+    # Delete the projects copied into the archive, then log and count only
+    # those actually deleted; a project that changed since it was copied
+    # stays and its copy goes. Repeating this for the same ids is harmless.
+    projects = Project._get_collection()
+    projects.delete_many({**archivable, "_id": {"$in": ids}})
+    kept = {doc["_id"] for doc in projects.find({"_id": {"$in": ids}}, {"_id": 1})}
+    if kept:
+        archive.delete_many({"_id": {"$in": list(kept)}, "archive_pending": True})
+    docs = list(archive.find({"_id": {"$in": [i for i in ids if i not in kept]}, "archive_pending": True}))
+    _commit(workflow.PROJECT, [(doc, None) for doc in docs], [f"project:{doc['_id']}:archived" for doc in docs])
+    archive.update_many({"_id": {"$in": [doc["_id"] for doc in docs]}}, {"$unset": {"archive_pending": ""}})
+    _touch(workflow.PROJECT, docs)
+    return len(docs)
+
+def _archive(now, cutoff, batch_size, max_batches):
+    projects = Project._get_collection()
+    archive = projects.database[ARCHIVE_COLLECTION]
+    archivable = {"expired_at": {"$lt": cutoff}, "expiry_pending": {"$exists": False}, "status": "Cancelled",
+                  "assigned_freelancer": None, "agreement": None}
+    archived = 0
+    while True:  # left over from a previous run
+        ids = [doc["_id"] for doc in archive.find({"archive_pending": True}, {"_id": 1}, limit=batch_size)]
+        if not ids:
+            break
+        archived += _settle_archived(archive, archivable, ids)
+    for _ in range(max_batches):
+        docs = list(projects.find(archivable, limit=batch_size))
+        if not docs:
+            break
+        try:
+            archive.insert_many([{**doc, "archived_at": now, "archive_pending": True} for doc in docs], ordered=False)
+        except BulkWriteError as error:
+            # Duplicates were copied by a run that died before deleting them
+            if any(write_error["code"] != 11000 for write_error in error.details["writeErrors"]):
+                raise
+        archived += _settle_archived(archive, archivable, [doc["_id"] for doc in docs])
+        if len(docs) < batch_size:
+            break
+    return archived
+
+def tick(now=None):
+    """Run every step once; returns how many documents each one changed."""
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size, max_batches = config["SCHEDULER_BATCH_SIZE"], config["SCHEDULER_MAX_BATCHES"]
+    results = {
+        "projects_expired": _expire(
+            workflow.PROJECT, {"status": "Open", "deadline": {"$lt": now}},
+            "Open", "Cancelled", now, batch_size, max_batches),
+        "agreements_expired": _expire(
+            workflow.AGREEMENT,
+            {"status": AgreementStatus.PENDING.value,
+             "created_at": {"$lt": now - timedelta(days=config["SCHEDULER_PENDING_AGREEMENT_DAYS"])}},
+            AgreementStatus.PENDING.value, AgreementStatus.TERMINATED.value, now, batch_size, max_batches),
+        "projects_archived": 0,
+    }
+    if config["SCHEDULER_ARCHIVE_AFTER_DAYS"]:
+        results["projects_archived"] = _archive(
+            now, now - timedelta(days=config["SCHEDULER_ARCHIVE_AFTER_DAYS"]), batch_size, max_batches)
+    results["assignments_repaired"] = assignments.repair()
+    return results
+
+def ensure_archive_index():
+    archive = Project._get_collection().database[ARCHIVE_COLLECTION]
+    archive.create_index("archived_at", name="archive_ttl",
+                         expireAfterSeconds=current_app.config["SCHEDULER_ARCHIVE_TTL_DAYS"] * 24 * 3600)
+    archive.create_index("archive_pending", name="archive_pending",
+                         partialFilterExpression={"archive_pending": True})
+
+def run(interval=None, once=False, owner=None):
+    """Tick every ``interval`` seconds while holding the lease; with ``once`` tick (at most) once.
+
+    Returns the last tick's results, or None if the lease was never held.
+    """
+    config = current_app.config
+    interval = interval or config["SCHEDULER_INTERVAL"]
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    ensure_archive_index()
+    results = None
+    try:
+        while True:
+            if acquire(LEASE_NAME, owner, config["SCHEDULER_LEASE_SECONDS"]):
+                results = tick()
+                if any(results.values()):
+                    logger.info("Scheduler tick: %s", results)
+            else:
+                logger.debug("Scheduler lease held by another process; standing by")
+            if once:
+                return results
+            time.sleep(interval)
+    finally:
+        release(LEASE_NAME, owner)
+
+def init_app(app):
+    app.config.setdefault("SCHEDULER_INTERVAL", 30)
+    app.config.setdefault("SCHEDULER_LEASE_SECONDS", 120)
+    app.config.setdefault("SCHEDULER_BATCH_SIZE", 500)
+    app.config.setdefault("SCHEDULER_MAX_BATCHES", 20)
+    app.config.setdefault("SCHEDULER_PENDING_AGREEMENT_DAYS", 14)
+    app.config.setdefault("SCHEDULER_ARCHIVE_AFTER_DAYS", 30)
+    app.config.setdefault("SCHEDULER_ARCHIVE_TTL_DAYS", 365)
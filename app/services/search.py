@@ -0,0 +1,175 @@
+# app/services/search.py
+#
+# In-process inverted index over freelancer profiles for search and typeahead.
+# Each worker process keeps its own copy, kept current by profile_index.
+#
+# Scoring: every term carries its field weight (names > skills > location /
+# description), scaled by idf at query time. All query tokens must match; the
+# last token also matches as a prefix, which is what drives typeahead.
+
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from app.services import profile_index
+
+FIELD_WEIGHTS = {
+    "first_name": 3.0,
+    "last_name": 3.0,
+    "skills": 2.0,
+    "location": 1.0,
+    "description": 0.5,
+}
+PREFIX_BOOST = 0.6  # a prefix hit scores lower than the whole word
+MAX_PREFIX_TERMS = 64  # expand short prefixes to at most this many (most common) terms
+MAX_PREFIX_CANDIDATES = 5000  # stop expanding a bare prefix once this many profiles match
+RESULT_CACHE_SIZE = 2048  # pages of recent queries; short typeahead prefixes repeat constantly
+DISPLAY_FIELDS = ("first_name", "last_name", "profile_photo", "photo_variants", "skills", "location")
+_TOKEN = re.compile(r"[\w+#]+")
+
+def tokenize(text):
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN.findall(text.lower())
+
+def _weighted_terms(doc):
+    terms = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = doc.get(field)
+        if isinstance(value, dict):
+            value = " ".join(str(part) for part in value.values() if part)
+        elif isinstance(value, (list, tuple)):
+            value = " ".join(str(part) for part in value if part)
+        for term in tokenize(value):
+            # A term's weight is its best field, not the sum of repeats
+            if weight > terms.get(term, 0.0):
+                terms[term] = weight
+    return terms
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}  # term -> {doc_key: weight}
+        self._terms = []  # sorted vocabulary for prefix lookups
+        self._doc_terms = {}  # doc_key -> {term: weight}
+        self._records = {}  # doc_key -> display fields
+        self._keys = {}  # str(_id) -> doc_key
+        self._next_key = 0
+        self._results = OrderedDict()  # (tokens, prefix, offset, limit) -> page; cleared on any change
+
+    def __len__(self):
+        return len(self._records)
+
+    def upsert(self, doc):
+        doc_id = str(doc["_id"])
+        terms = _weighted_terms(doc)
+        record = {field: doc.get(field) for field in DISPLAY_FIELDS}
+        record["_id"] = doc_id
+        with self._lock:
+            key = self._keys.get(doc_id)
+            if key is None:
+                key = self._next_key
+                self._next_key += 1
+                self._keys[doc_id] = key
+            else:
+                self._unlink(key)
+            for term, weight in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._terms, term)
+                postings[key] = weight
+            self._doc_terms[key] = terms
+            self._records[key] = record
+            self._results.clear()
+
+    def remove(self, doc_id):
+        with self._lock:
+            key = self._keys.pop(str(doc_id), None)
+            if key is not None:
+                self._unlink(key)
+                self._records.pop(key, None)
+                self._results.clear()
+
+    def _unlink(self, key):
+        for term in self._doc_terms.pop(key, {}):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                if index < len(self._terms) and self._terms[index] == term:
+                    del self._terms[index]
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        # Most common completions first, so a capped expansion keeps the popular ones
+        return heapq.nlargest(MAX_PREFIX_TERMS, self._terms[start:end], key=lambda term: len(self._postings[term]))
+
+    def search(self, query, offset=0, limit=20, prefix=True):
+        """Return ``(records, total)`` for one page of ranked matches."""
+        tokens = tokenize(query)
+        if not tokens:
+            return [], 0
+
+        cache_key = (tuple(tokens), prefix, offset, limit)
+        with self._lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                self._results.move_to_end(cache_key)
+                return cached
+
+            total_docs = max(len(self._records), 1)
+            scores = None
+            for position, token in enumerate(tokens):
+                is_last = position == len(tokens) - 1
+                terms = self._prefix_terms(token) if prefix and is_last else [token]
+                token_scores = {}
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    boost = math.log(1.0 + total_docs / len(postings))
+                    if term != token:
+                        boost *= PREFIX_BOOST
+                    if scores is not None and len(scores) < len(postings):
+                        # Only documents that matched the earlier tokens can survive
+                        term_scores = {key: postings[key] * boost for key in scores if key in postings}
+                    else:
+                        term_scores = {key: weight * boost for key, weight in postings.items()}
+                    if token_scores:
+                        # A document matched by several expansions keeps its best one
+                        for key in term_scores.keys() & token_scores.keys():
+                            term_scores[key] = max(term_scores[key], token_scores[key])
+                        token_scores.update(term_scores)
+                    else:
+                        token_scores = term_scores
+                    if scores is None and len(token_scores) >= MAX_PREFIX_CANDIDATES:
+                        # One- or two-letter prefixes; the total becomes a lower bound
+                        break
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {key: scores[key] + score for key, score in token_scores.items() if key in scores}
+                if not scores:
+                    return [], 0
+
+            top = heapq.nlargest(offset + limit, scores, key=scores.get)
+            page = [self._records[key] for key in top[offset:]], len(scores)
+            self._results[cache_key] = page
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+            return page
+
+def search_freelancers(query, offset=0, limit=20):
+    return profile_index.get_indexer("search").current().search(query, offset=offset, limit=limit)
+
+def init_app(app):
+    profile_index.register(app, "search", SearchIndex, tuple(FIELD_WEIGHTS) + DISPLAY_FIELDS)
@@ -0,0 +1,160 @@
+# app/services/serialization.py
+#
+# msgspec schemas for the JSON API (/api/v1), also used as the read records of
+# app/services/reads.py. Each Struct mirrors a model's
+# stored fields, minus secrets such as the password hash, and is filled
+# straight from raw documents (``as_pymongo()`` / ``to_mongo()``) with
+# msgspec.convert: no MongoEngine documents are built on the way out.
+#
+# References stay as ids on the wire; ObjectIds and datetimes are encoded as
+# strings. Missing optional fields come out as null, so a projected query
+# (e.g. the listing fields) converts into the same schema.
+
+from datetime import datetime
+from typing import Dict, List, Optional
+import msgspec
+from bson import ObjectId
+from flask import current_app
+
+class Location(msgspec.Struct):
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    pincode: Optional[str] = None
+
+class RatingSummary(msgspec.Struct):
+    count: int = 0
+    total: int = 0
+    histogram: Dict[str, int] = {}
+    last_review_at: Optional[datetime] = None
+
+    @property
+    def mean(self):
+        return round(self.total / self.count, 2) if self.count else None
+
+class Client(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    company_name: Optional[str] = None
+    email: Optional[str] = None
+    profile_photo: Optional[str] = None
+    photo_variants: Dict[str, Dict[str, str]] = {}  # {"card": {"webp": url, "jpeg": url}}, see thumbnails
+    location: Optional[Location] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    credits: Optional[int] = None
+    phone_number: Optional[str] = None
+    instagram_link: Optional[str] = None
+    linkedin_link: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class Freelancer(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    username: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[str] = None
+    profile_photo: Optional[str] = None
+    photo_variants: Dict[str, Dict[str, str]] = {}  # {"card": {"webp": url, "jpeg": url}}, see thumbnails
+    location: Optional[Location] = None
+    experience: Optional[str] = None
+    rating: Optional[RatingSummary] = None
+    description: Optional[str] = None
+    credits: Optional[int] = None
+    phone_number: Optional[str] = None
+    instagram_link: Optional[str] = None
+    linkedin_link: Optional[str] = None
+    skills: List[str] = []
+    earnings: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+class Project(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    title: Optional[str] = None
+    description: Optional[str] = None
+    budget: Optional[int] = None
+    deadline: Optional[datetime] = None
+    status: Optional[str] = None
+    categories: List[str] = []
+    client: Optional[ObjectId] = None
+    assigned_freelancer: Optional[ObjectId] = None
+    agreement: Optional[ObjectId] = None
+    version: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+# What a marketplace feed card shows
+class ProjectCard(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    title: Optional[str] = None
+    budget: Optional[int] = None
+    deadline: Optional[datetime] = None
+    categories: List[str] = []
+    client: Optional[ObjectId] = None
+
+class Review(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    rating: Optional[int] = None
+    comment: Optional[str] = None
+    reviewer: Optional[ObjectId] = None
+    reviewer_model: Optional[str] = None
+    freelancer: Optional[ObjectId] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class Agreement(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    title: Optional[str] = None
+    description: Optional[str] = None
+    client: Optional[ObjectId] = None
+    freelancer: Optional[ObjectId] = None
+    project: Optional[ObjectId] = None
+    status: Optional[str] = None
+    version: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class Transaction(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    user: Optional[ObjectId] = None
+    user_role: Optional[str] = None
+    amount: Optional[int] = None
+    kind: Optional[str] = None
+    balance_after: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class ActivityCounters(msgspec.Struct):
+    id: ObjectId = msgspec.field(name="_id")
+    role: Optional[str] = None
+    open: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    earnings: int = 0
+
+def _enc_hook(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise NotImplementedError(f"Cannot encode {type(value).__name__}")
+
+# Encoders are thread-safe and reuse their internal buffer
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+def fields(schema):
+    # Projection for a schema, so queries never load what the API won't send
+    return tuple("id" if name == "_id" else name for name in schema.__struct_encode_fields__)
+
+def convert(raw, schema):
+    """Raw document -> ``schema``; unknown fields (the password hash...) are dropped."""
+    return msgspec.convert(raw, schema)
+
+def convert_many(raws, schema):
+    return msgspec.convert(list(raws), List[schema])
+
+def encode(payload):
+    return _encoder.encode(payload)
+
+def json_response(payload, status=200):
+    return current_app.response_class(encode(payload), status=status, mimetype="application/json")
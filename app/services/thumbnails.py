@@ -0,0 +1,118 @@
+# app/services/thumbnails.py
+#
+# Resized WebP/JPEG variants of profile photos, produced by the job worker
+# after registration. Variants are written next to the uploads under
+# variants/<sha[:2]>/<sha>-<variant>.<fmt>, keyed by the source image digest,
+# so identical photos share one set of variants.
+#
+# Profiles store the variant URLs in ``photo_variants``:
+#   {"card": {"webp": "/uploads/variants/...-card.webp", "jpeg": "..."}, ...}
+
+import hashlib
+import os
+from datetime import datetime
+from flask import current_app
+from PIL import Image, ImageOps
+from app.models.client import Client
+from app.models.freelancer import Freelancer
+from app.services import jobs, profile_cache
+from app.services.uploads import CHUNK_SIZE
+
+# Longest edge in pixels, smallest first
+VARIANTS = {
+    "avatar": 96,
+    "card": 320,
+    "full": 1280,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+PROFILE_MODELS = {"client": Client, "freelancer": Freelancer}
+
+def _disk_path(url):
+    # "/uploads/ab/abcd.png" -> "<UPLOAD_FOLDER>/ab/abcd.png"
+    relative = url[len("/uploads/"):] if url.startswith("/uploads/") else url.lstrip("/")
+    root = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    path = os.path.abspath(os.path.join(root, relative))
+    if not path.startswith(root + os.sep):
+        raise ValueError(f"Photo {url!r} is outside the upload folder")
+    return path
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _save_atomic(image, path, fmt, **options):
+    tmp_path = f"{path}.tmp"
+    image.save(tmp_path, fmt, **options)
+    os.replace(tmp_path, path)
+
+def generate_variants(photo_url):
+    """Write every variant of the uploaded photo and return their URLs."""
+    source_path = _disk_path(photo_url)
+    digest = _file_digest(source_path)
+    directory = os.path.join(current_app.config['UPLOAD_FOLDER'], "variants", digest[:2])
+    os.makedirs(directory, exist_ok=True)
+
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA" if "transparency" in original.info else "RGB")
+
+        urls = {}
+        for name, edge in VARIANTS.items():
+            variant = original.copy()
+            variant.thumbnail((edge, edge), Image.LANCZOS)  # never upscales
+            base = f"{digest}-{name}"
+            webp_path = os.path.join(directory, f"{base}.webp")
+            jpeg_path = os.path.join(directory, f"{base}.jpg")
+            if not os.path.exists(webp_path):
+                _save_atomic(variant, webp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+            if not os.path.exists(jpeg_path):
+                _save_atomic(variant.convert("RGB"), jpeg_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            urls[name] = {
+                "webp": f"/uploads/variants/{digest[:2]}/{base}.webp",
+                "jpeg": f"/uploads/variants/{digest[:2]}/{base}.jpg",
+            }
+    return urls
+
+@jobs.handler("thumbnails")
+def build_profile_thumbnails(role, user_id):
+    model = PROFILE_MODELS[role]
+    profile = model.objects(id=user_id).only("profile_photo").as_pymongo().first()
+    if not profile or not profile.get("profile_photo"):
+        return
+    variants = generate_variants(profile["profile_photo"])
+    # Only apply if the photo has not been replaced while we were working
+    model.objects(id=user_id, profile_photo=profile["profile_photo"]).update_one(
+        set__photo_variants=variants, set__updated_at=datetime.utcnow())
+    profile_cache.invalidate(role, user_id)
+
+def enqueue_for(role, user_id):
+    return jobs.enqueue("thumbnails", role=role, user_id=str(user_id))
+
+def backfill():
+    """Queue variant generation for every profile photo that has none yet."""
+    queued = 0
+    for role, model in PROFILE_MODELS.items():
+        # $in [null, {}] also matches documents saved before the field existed
+        pending = model.objects(__raw__={
+            "profile_photo": {"$nin": [None, ""]},
+            "photo_variants": {"$in": [None, {}]},
+        }).only("id").as_pymongo()
+        for doc in pending:
+            enqueue_for(role, doc["_id"])
+            queued += 1
+    return queued
+
+def photo_url(profile, variant="card", fmt="jpeg"):
+    """Smallest stored variant at least as large as ``variant``, else the original upload."""
+    variants = getattr(profile, "photo_variants", None) or {}
+    names = list(VARIANTS)
+    for name in names[names.index(variant):]:
+        if name in variants and fmt in variants[name]:
+            return variants[name][fmt]
+    return getattr(profile, "profile_photo", None) or ""
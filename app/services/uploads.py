@@ -0,0 +1,98 @@
+# app/services/uploads.py
+#
+# Content-addressed storage for uploaded files.
+#
+# UploadRequest replaces Werkzeug's upload spool with HashingSpool, so while
+# the multipart parser streams a file part to disk chunk by chunk the bytes are
+# also hashed and counted against UPLOAD_MAX_BYTES. store_upload() then moves
+# the finished temp file to <UPLOAD_FOLDER>/<sha[:2]>/<sha>.<ext>; if that path
+# already exists the upload is a duplicate and the temp file is simply dropped.
+# Nothing is ever stored under the client-supplied filename.
+
+import hashlib
+import os
+import shutil
+import tempfile
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+CHUNK_SIZE = 64 * 1024
+
+def allowed_file(filename):
+    return bool(filename) and '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def _tmp_dir(root):
+    # Temp files live under the upload root so the final move is a rename
+    path = os.path.join(root, '.tmp')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class HashingSpool:
+    # Writable temp file that hashes and size-checks every chunk written to it
+
+    def __init__(self, root, max_bytes):
+        self._file = tempfile.NamedTemporaryFile(dir=_tmp_dir(root), prefix='upload-', delete=False)
+        self.path = self._file.name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(f"Uploads are limited to {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        return self._file.write(chunk)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        # Unlinks the temp file unless store_upload() already moved it
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        config = current_app.config
+        return HashingSpool(config['UPLOAD_FOLDER'], config['UPLOAD_MAX_BYTES'])
+
+def store_upload(file_storage):
+    """Store an uploaded file once under its SHA-256 digest and return its URL."""
+    config = current_app.config
+    root = config['UPLOAD_FOLDER']
+    extension = file_storage.filename.rsplit('.', 1)[1].lower()
+
+    spool = file_storage.stream
+    if not isinstance(spool, HashingSpool):
+        # Stream did not come through UploadRequest (e.g. a test client); copy it in chunks
+        spool = HashingSpool(root, config['UPLOAD_MAX_BYTES'])
+        file_storage.stream.seek(0)
+        shutil.copyfileobj(file_storage.stream, spool, CHUNK_SIZE)
+    spool.flush()
+
+    digest = spool.hexdigest()
+    relative = f"{digest[:2]}/{digest}.{extension}"
+    target = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.exists(target):
+        spool.close()  # duplicate content, keep the stored copy
+    else:
+        spool._file.close()
+        os.replace(spool.path, target)
+    return f"/uploads/{relative}"
+
+def init_app(app):
+    app.config.setdefault('UPLOAD_FOLDER', 'public/uploads')
+    app.config.setdefault('UPLOAD_MAX_BYTES', 5 * 1024 * 1024)
+    # Reject oversized bodies from Content-Length before parsing starts; leave room for form fields
+    app.config.setdefault('MAX_CONTENT_LENGTH', app.config['UPLOAD_MAX_BYTES'] + 1024 * 1024)
+    app.request_class = UploadRequest
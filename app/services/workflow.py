@@ -0,0 +1,265 @@
+# app/services/workflow.py
+#
+# Status state machines for projects and agreements.
+#
+# A status change is a compare-and-set: the update only matches while the
+# document is in one of the states allowed to move to the target (and, when
+# given, still at the caller's ``version``), so concurrent or stale changes
+# are rejected instead of overwriting each other. Every accepted change is
+# appended to the status_events log and applied to the per-account
+# ActivityCounters with $inc, so dashboards read one document instead of
+# counting projects.
+#
+# begin() makes the change and commit() records it; transition() does both.
+# Callers that need another write in between (assignments.py writes the
+# Agreement) commit once that has succeeded. A request that dies between the
+# two leaves the counters short; rebuild_counters() recomputes them.
+
+import logging
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.models.agreement import Agreement, AgreementStatus
+from app.models.counters import ActivityCounters
+from app.models.event import StatusEvent
+from app.models.freelancer import Freelancer
+from app.models.project import Project
+from app.services import jobs, profile_cache
+
+logger = logging.getLogger(__name__)
+
+class Machine:
+    def __init__(self, kind, model, transitions, counted=False):
+        self.kind = kind
+        self.model = model
+        self.transitions = transitions  # status -> statuses it may move to
+        self.counted = counted  # maintains ActivityCounters
+
+    def sources(self, to_status):
+        return [status for status, targets in self.transitions.items() if to_status in targets]
+
+PROJECT = Machine("project", Project, {
+    "Open": {"In Progress", "Cancelled"},
+    "In Progress": {"Completed", "Cancelled"},
+    "Completed": set(),
+    "Cancelled": set(),
+}, counted=True)
+
+AGREEMENT = Machine("agreement", Agreement, {
+    AgreementStatus.PENDING.value: {AgreementStatus.ACTIVE.value, AgreementStatus.TERMINATED.value},
+    AgreementStatus.ACTIVE.value: {AgreementStatus.COMPLETED.value, AgreementStatus.TERMINATED.value},
+    AgreementStatus.COMPLETED.value: set(),
+    AgreementStatus.TERMINATED.value: set(),
+})
+
+# Ending a project ends its agreement
+AGREEMENT_FOLLOWS = {"Completed": AgreementStatus.COMPLETED.value, "Cancelled": AgreementStatus.TERMINATED.value}
+
+# Statuses each party may pick on the project edit form. "In Progress" is
+# not among them: only assignments.assign() moves a project there, since it
+# also sets the assignee and writes the Agreement.
+EDITABLE_STATUSES = {"client": {"Completed", "Cancelled"}, "freelancer": {"Completed"}}
+
+# Project fields the edit forms may change; the rest belong to the workflow
+EDITABLE_PROJECT_FIELDS = ("title", "description", "budget", "deadline")
+
+COUNTER_FIELDS = {"Open": "open", "In Progress": "in_progress", "Completed": "completed", "Cancelled": "cancelled"}
+
+class NotFound(Exception):
+    pass
+
+class InvalidTransition(Exception):
+    def __init__(self, message, current=None):
+        super().__init__(message)
+        self.current = current
+
+class VersionConflict(InvalidTransition):
+    pass
+
+def _version_filter(expected_version):
+    # Documents written before versioning have no field, which counts as 0
+    expected_version = int(expected_version)
+    return expected_version if expected_version else {"$in": [0, None]}
+
+def begin(machine, entity_id, to_status, match=None, set_fields=None, expected_version=None):
+    """Move ``entity_id`` to ``to_status`` if allowed; returns ``(before, after)`` or None.
+
+    ``match`` adds conditions to the compare-and-set and ``set_fields`` extra
+    fields to write with the status. None means nothing matched.
+    """
+    if to_status not in machine.transitions:
+        raise InvalidTransition(f"Unknown {machine.kind} status {to_status!r}")
+    query = {"_id": ObjectId(entity_id), "status": {"$in": machine.sources(to_status)}, **(match or {})}
+    if expected_version is not None:
+        query["version"] = _version_filter(expected_version)
+    fields = {**(set_fields or {}), "status": to_status, "updated_at": datetime.utcnow()}
+    before = machine.model._get_collection().find_one_and_update(
+        query, {"$set": fields, "$inc": {"version": 1}}, return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+    after = {**before, **fields, "version": (before.get("version") or 0) + 1}
+    return before, after
+
+def _counter_deltas(doc, sign, deltas):
+    # Add (sign=1) or remove (sign=-1) one project's contribution to its accounts
+    field = COUNTER_FIELDS.get(doc.get("status"))
+    if field is None:
+        return
+    for role, key in (("client", "client"), ("freelancer", "assigned_freelancer")):
+        owner = doc.get(key)
+        if owner is None:
+            continue
+        inc = deltas.setdefault((role, owner), {})
+        inc[field] = inc.get(field, 0) + sign
+        if role == "freelancer" and doc.get("status") == "Completed":
+            inc["earnings"] = inc.get("earnings", 0) + sign * (doc.get("budget") or 0)
+
+def _set_earnings(freelancer_id, update, match=None):
+    # Earnings show on the profile: bump updated_at with them (ETags, see
+    # http_cache) and drop the cached profile
+    update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+    result = Freelancer._get_collection().update_one({"_id": freelancer_id, **(match or {})}, update)
+    if result.modified_count:
+        profile_cache.invalidate("freelancer", freelancer_id)
+
+def _apply_counters(changes):
+    deltas = {}
+    for before, after in changes:
+        if before is not None:
+            _counter_deltas(before, -1, deltas)
+        if after is not None:
+            _counter_deltas(after, 1, deltas)
+    requests = []
+    for (role, owner), inc in deltas.items():
+        inc = {field: amount for field, amount in inc.items() if amount}
+        if inc:
+            requests.append(UpdateOne({"_id": owner}, {"$inc": inc, "$setOnInsert": {"role": role}}, upsert=True))
+            if inc.get("earnings"):
+                _set_earnings(owner, {"$inc": {"earnings": inc["earnings"]}})
+    if requests:
+        ActivityCounters._get_collection().bulk_write(requests, ordered=False)
+
+def _event(machine, before, after, actor):
+    doc = after if after is not None else before
+    return {
+        "e": doc["_id"],
+        "k": machine.kind,
+        "f": before and before.get("status"),
+        "t": after and after.get("status"),
+        **({"a": ObjectId(actor)} if actor is not None else {}),
+    }
+
+def commit(machine, before, after, actor=None):
+    """Log a change made by begin() (or a create / delete: ``before`` / ``after`` None) and count it."""
+    commit_many(machine, [(before, after)], actor=actor)
+
+def commit_many(machine, changes, actor=None, keys=None):
+    """commit() for a batch of ``(before, after)`` pairs: one insert and one counter write per account.
+
+    With ``keys`` (one string per change) a change whose key is already in
+    the log is skipped, counters included, so replaying a batch is harmless.
+    Returns how many changes were recorded.
+    """
+    if not changes:
+        return 0
+    events = [_event(machine, before, after, actor) for before, after in changes]
+    if keys is not None:
+        for event, key in zip(events, keys):
+            event["u"] = key
+    try:
+        StatusEvent._get_collection().insert_many(events, ordered=False)
+    except BulkWriteError as error:
+        if keys is None or any(write_error["code"] != 11000 for write_error in error.details["writeErrors"]):
+            raise
+        logged = {write_error["index"] for write_error in error.details["writeErrors"]}
+        changes = [change for index, change in enumerate(changes) if index not in logged]
+    if machine.counted:
+        _apply_counters(changes)
+    return len(changes)
+
+def transition(machine, entity_id, to_status, actor=None, match=None, set_fields=None, expected_version=None):
+    """begin() + commit(); returns the updated document.
+
+    Raises NotFound, VersionConflict or InvalidTransition (with the current
+    document) when the change is not allowed.
+    """
+    changed = begin(machine, entity_id, to_status, match=match, set_fields=set_fields,
+                    expected_version=expected_version)
+    if changed is None:
+        current = machine.model._get_collection().find_one({"_id": ObjectId(entity_id), **(match or {})})
+        if current is None:
+            raise NotFound(f"No {machine.kind} {entity_id}")
+        if current.get("status") in machine.sources(to_status):
+            raise VersionConflict(f"{machine.kind.capitalize()} changed since it was read; reload and retry", current)
+        raise InvalidTransition(f"Cannot move a {machine.kind} from {current.get('status')} to {to_status}", current)
+    before, after = changed
+    commit(machine, before, after, actor=actor)
+
+    if machine is PROJECT and after.get("agreement") and to_status in AGREEMENT_FOLLOWS:
+        try:
+            transition(AGREEMENT, after["agreement"], AGREEMENT_FOLLOWS[to_status], actor=actor)
+        except (NotFound, InvalidTransition):
+            pass  # no agreement yet, or it already ended
+    return after
+
+def created(machine, doc, actor=None):
+    commit(machine, None, doc, actor=actor)
+
+def removed(machine, doc, actor=None):
+    commit(machine, doc, None, actor=actor)
+
+def history(machine, entity_id, limit=50):
+    return [{
+        "from": event.get("f"), "to": event.get("t"), "actor": event.get("a"),
+        "at": event["_id"].generation_time.replace(tzinfo=None),
+    } for event in StatusEvent._get_collection().find(
+        {"e": ObjectId(entity_id), "k": machine.kind}, sort=[("_id", -1)], limit=limit)]
+
+def counters(user_id):
+    """Dashboard counters for a client or freelancer (zeros if it has no projects)."""
+    doc = ActivityCounters._get_collection().find_one({"_id": ObjectId(user_id)}) or {"_id": ObjectId(user_id)}
+    for field in ("open", "in_progress", "completed", "cancelled", "earnings"):
+        doc.setdefault(field, 0)
+    return doc
+
+def rebuild_counters():
+    """Recompute every ActivityCounters document from the projects; returns how many changed."""
+    totals = {}
+    for row in Project._get_collection().aggregate([
+        {"$match": {"status": {"$in": list(COUNTER_FIELDS)}}},
+        {"$group": {"_id": {"client": "$client", "freelancer": "$assigned_freelancer", "status": "$status"},
+                    "count": {"$sum": 1}, "budget": {"$sum": "$budget"}}},
+    ], allowDiskUse=True):
+        field = COUNTER_FIELDS[row["_id"]["status"]]
+        for role in ("client", "freelancer"):
+            owner = row["_id"].get(role)
+            if owner is None:
+                continue
+            doc = totals.setdefault(owner, {"role": role, "open": 0, "in_progress": 0, "completed": 0,
+                                            "cancelled": 0, "earnings": 0})
+            doc[field] += row["count"]
+            if role == "freelancer" and field == "completed":
+                doc["earnings"] += row["budget"]
+
+    collection = ActivityCounters._get_collection()
+    changed = 0
+    for owner, doc in totals.items():
+        result = collection.update_one({"_id": owner}, {"$set": doc}, upsert=True)
+        changed += result.modified_count + (result.upserted_id is not None)
+        if doc["role"] == "freelancer":
+            _set_earnings(owner, {"$set": {"earnings": doc["earnings"]}}, match={"earnings": {"$ne": doc["earnings"]}})
+    # Accounts whose last project went away
+    stale = [doc["_id"] for doc in collection.find({}, {"_id": 1}) if doc["_id"] not in totals]
+    if stale:
+        changed += collection.delete_many({"_id": {"$in": stale}}).deleted_count
+        for freelancer_id in stale:
+            _set_earnings(freelancer_id, {"$set": {"earnings": 0}}, match={"earnings": {"$ne": 0}})
+    return changed
+
+@jobs.handler("workflow.rebuild_counters")
+def rebuild_counters_job():
+    changed = rebuild_counters()
+    if changed:
+        logger.warning("Rebuilt %d drifted activity counters", changed)
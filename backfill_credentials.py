@@ -0,0 +1,13 @@
+# backfill_credentials.py
+#
+# One-off: create login credentials for clients / freelancers registered
+# before the credentials collection existed. Safe to rerun.
+
+from app import create_app
+from app.services import credentials
+
+app = create_app(web=False)
+
+with app.app_context():
+    created = credentials.backfill()
+    print(f"Created {created} credentials.")
@@ -0,0 +1,13 @@
+# backfill_thumbnails.py
+#
+# Queue thumbnail generation for profile photos uploaded before variants
+# existed. Run worker.py afterwards (or alongside) to process them.
+
+from app import create_app
+from app.services import thumbnails
+
+app = create_app(web=False)
+
+with app.app_context():
+    queued = thumbnails.backfill()
+    print(f"Queued {queued} thumbnail jobs.")
@@ -0,0 +1,88 @@
+# benchmarks/bench_assignment.py
+#
+# Parallel assign attempts against the same open projects: throughput of the
+# compare-and-set workflow and a check that every project ends up with
+# exactly one assignee and one agreement. Exits non-zero on a double
+# assignment.
+#
+#   python -m benchmarks.bench_assignment
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.common import connect_bench_db
+
+PROJECTS = int(os.environ.get('BENCH_PROJECTS', '200'))
+CONTENDERS = int(os.environ.get('BENCH_CONTENDERS', '16'))  # attempts per project
+THREADS = int(os.environ.get('BENCH_THREADS', '64'))
+FREELANCERS = 50
+
+def seed(db):
+    for name in ('clients', 'freelancers', 'projects', 'agreements'):
+        db.drop_collection(name)
+    client_id = ObjectId()
+    db.clients.insert_one({'_id': client_id, 'username': 'owner', 'email': 'owner@example.com', 'password': 'x'})
+    freelancers = [ObjectId() for _ in range(FREELANCERS)]
+    db.freelancers.insert_many([{'_id': fid, 'first_name': 'F', 'last_name': str(i), 'username': f'f{i}',
+                                 'email': f'f{i}@example.com', 'password': 'x'}
+                                for i, fid in enumerate(freelancers)])
+    projects = [ObjectId() for _ in range(PROJECTS)]
+    db.projects.insert_many([{'_id': pid, 'title': f'Project {i}', 'description': 'd', 'budget': 100,
+                              'deadline': datetime.utcnow() + timedelta(days=30), 'status': 'Open',
+                              'client': client_id, 'version': 0, 'created_at': datetime.utcnow()}
+                             for i, pid in enumerate(projects)])
+    return client_id, projects, freelancers
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.services import assignments
+
+    client_id, projects, freelancers = seed(db)
+    rng = random.Random(17)
+    attempts = [(project_id, rng.choice(freelancers)) for project_id in projects for _ in range(CONTENDERS)]
+    rng.shuffle(attempts)
+
+    def attempt(job):
+        project_id, freelancer_id = job
+        with flask_app.app_context():
+            try:
+                project, _ = assignments.assign(client_id, project_id, freelancer_id, expected_version=0)
+                return project_id, freelancer_id, "assigned"
+            except assignments.AssignmentConflict:
+                return project_id, freelancer_id, "conflict"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(attempt, attempts))
+    elapsed = time.perf_counter() - start
+
+    # A retry by the winner also reports "assigned"; count distinct winners
+    winners = {}
+    for project_id, freelancer_id, outcome in results:
+        if outcome == "assigned":
+            winners.setdefault(project_id, set()).add(freelancer_id)
+    agreements = Counter(doc['project'] for doc in db.agreements.find({}, {'project': 1}))
+    stored = {doc['_id']: doc.get('assigned_freelancer') for doc in db.projects.find({}, {'assigned_freelancer': 1})}
+
+    print(f"--- {len(attempts)} assign attempts on {PROJECTS} projects ({CONTENDERS} each), {THREADS} threads")
+    print(f"{'attempts/s':<40} {len(attempts) / elapsed:10,.0f}")
+    print(f"{'assignments/s':<40} {len(winners) / elapsed:10,.0f}")
+    print(f"{'outcomes':<40} {dict(Counter(outcome for _, _, outcome in results))}")
+
+    double = [pid for pid, won in winners.items() if len(won) > 1 or {stored[pid]} != won]
+    unassigned = [pid for pid in projects if pid not in winners]
+    extra = [pid for pid in projects if agreements.get(pid, 0) != 1]
+    print(f"{'double assignments':<40} {len(double)}")
+    print(f"{'projects without an assignee':<40} {len(unassigned)}")
+    print(f"{'projects without exactly one agreement':<40} {len(extra)}")
+    if double or unassigned or extra:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_listing_pagination.py
+#
+# Compares the old unbounded Freelancer.objects() listing with the keyset
+# paginated, projected listing as the collection grows.
+#
+#   python -m benchmarks.bench_listing_pagination
+
+import os
+from bson import ObjectId
+from benchmarks.common import connect_bench_db, measure, report
+
+SIZES = [int(n) for n in os.environ.get('BENCH_SIZES', '1000,10000,50000').split(',')]
+REFS_PER_PROFILE = 50
+
+def seed(db, count):
+    db.freelancers.drop()
+    batch = []
+    for i in range(count):
+        batch.append({
+            'first_name': f'First{i}',
+            'last_name': f'Last{i}',
+            'username': f'user{i}',
+            'email': f'user{i}@example.com',
+            'password': '$2b$12$' + 'x' * 53,
+            'profile_photo': f'/uploads/{i}.png',
+            'location': {'city': 'Pune', 'state': 'MH', 'country': 'India', 'pincode': '411001'},
+            'experience': '3 years',
+            'description': 'Freelancer description ' * 10,
+            'skills': ['python', 'flask', 'mongodb'],
+            'projects': [ObjectId() for _ in range(REFS_PER_PROFILE)],
+            'reviews': [ObjectId() for _ in range(REFS_PER_PROFILE)],
+            'applied_projects': [ObjectId() for _ in range(REFS_PER_PROFILE)],
+            'transaction_history': [ObjectId() for _ in range(REFS_PER_PROFILE)],
+        })
+        if len(batch) == 5000:
+            db.freelancers.insert_many(batch)
+            batch = []
+    if batch:
+        db.freelancers.insert_many(batch)
+
+def main():
+    db = connect_bench_db()
+    from app.models.freelancer import Freelancer, FREELANCER_LISTING_FIELDS
+    from app.services.pagination import paginate, encode_cursor
+
+    for size in SIZES:
+        seed(db, size)
+        print(f"--- {size} freelancers")
+        repeat = 5 if size > 10000 else 20
+        p50, p99, peak = measure(lambda: list(Freelancer.objects()), repeat=repeat)
+        report("unbounded Freelancer.objects()", p50, p99, peak)
+
+        p50, p99, peak = measure(lambda: paginate(Freelancer.objects, fields=FREELANCER_LISTING_FIELDS))
+        report("paginate() first page", p50, p99, peak)
+
+        middle = db.freelancers.find({}, {'_id': 1}).sort('_id', 1).skip(size // 2).limit(1).next()
+        cursor = encode_cursor(middle['_id'])
+        p50, p99, peak = measure(lambda: paginate(Freelancer.objects, cursor=cursor, fields=FREELANCER_LISTING_FIELDS))
+        report("paginate() mid-collection page", p50, p99, peak)
+
+    db.freelancers.drop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_login_lookup.py
+#
+# p50/p99 of the login account lookup under concurrent load: the old pair of
+# full Client + Freelancer hydrations versus the single projected credential
+# query. bcrypt is left out so the database cost is what gets compared.
+#
+#   python -m benchmarks.bench_login_lookup
+
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from benchmarks.common import connect_bench_db, percentile
+
+PROFILES = int(os.environ.get('BENCH_PROFILES', '20000'))
+LOGINS = int(os.environ.get('BENCH_LOGINS', '5000'))
+CONCURRENCY = int(os.environ.get('BENCH_CONCURRENCY', '16'))
+PASSWORD_HASH = '$2b$12$' + 'x' * 53
+
+def profile(kind, i):
+    return {
+        'first_name': f'{kind}{i}', 'last_name': 'Bench', 'username': f'{kind}{i}',
+        'email': f'{kind}{i}@example.com', 'password': PASSWORD_HASH,
+        'description': 'Profile description ' * 20,
+        'projects': [ObjectId() for _ in range(100)],
+        'reviews': [ObjectId() for _ in range(100)],
+        'transaction_history': [ObjectId() for _ in range(100)],
+    }
+
+def seed(db):
+    for name in ('clients', 'freelancers', 'credentials'):
+        db.drop_collection(name)
+    half = PROFILES // 2
+    db.clients.insert_many([profile('client', i) for i in range(half)])
+    db.freelancers.insert_many([profile('freelancer', i) for i in range(half)])
+    db.clients.create_index('email', unique=True)
+    db.freelancers.create_index('email', unique=True)
+    return [f'client{i}@example.com' for i in range(half)] + [f'freelancer{i}@example.com' for i in range(half)]
+
+def run(label, lookup, emails):
+    def timed(email):
+        start = time.perf_counter()
+        lookup(email)
+        return time.perf_counter() - start
+
+    sample = [random.choice(emails) for _ in range(LOGINS)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        samples = list(pool.map(timed, sample))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} p50={percentile(samples, 50) * 1000:7.2f} ms  "
+          f"p99={percentile(samples, 99) * 1000:7.2f} ms  {LOGINS / elapsed:8.0f} lookups/s")
+
+def main():
+    db = connect_bench_db()
+    from app.models.client import Client
+    from app.models.freelancer import Freelancer
+    from app.services import credentials
+
+    random.seed(42)
+    emails = seed(db)
+    credentials.backfill()
+
+    def before(email):
+        client = Client.objects(email=email).first()
+        freelancer = Freelancer.objects(email=email).first()
+        return client if client else freelancer
+
+    print(f"{PROFILES} profiles, {LOGINS} logins, {CONCURRENCY} threads")
+    run("before: Client + Freelancer .first()", before, emails)
+    run("after: credentials.lookup()", credentials.lookup, emails)
+
+    for name in ('clients', 'freelancers', 'credentials'):
+        db.drop_collection(name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_marketplace.py
+#
+# Marketplace feed over a large synthetic project collection (one million by
+# default): first pages per sort and filter, a deep keyset page against the
+# same depth with skip(), and the cached first page. Also prints how many
+# index keys and documents each query examined.
+#
+#   BENCH_PROJECTS=1000000 python -m benchmarks.bench_marketplace
+
+import os
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+from werkzeug.datastructures import MultiDict
+from benchmarks.common import connect_bench_db, measure, report
+
+PROJECTS = int(os.environ.get('BENCH_PROJECTS', '1000000'))
+DEEP_PAGES = int(os.environ.get('BENCH_DEEP_PAGES', '50'))
+CATEGORIES = ['python', 'web development', 'design', 'data science', 'mobile', 'devops', 'writing',
+              'marketing', 'video', 'translation', 'seo', 'qa', 'blockchain', 'ml', 'ios', 'android']
+STATUSES = ['Open'] * 7 + ['In Progress', 'Completed', 'Cancelled']
+
+def seed(db, count, rng):
+    db.projects.drop()
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(count):
+        created_at = start + timedelta(seconds=i * 365 * 86400 // count)
+        batch.append({
+            # Ids follow created_at, as they would for real inserts
+            '_id': ObjectId(ObjectId.from_datetime(created_at).binary[:4] + i.to_bytes(8, 'big')),
+            'title': f'Project {i}',
+            'description': 'Build a thing. ' * 10,
+            'budget': rng.randint(50, 20000),
+            'deadline': created_at + timedelta(days=rng.randint(7, 180)),
+            'status': rng.choice(STATUSES),
+            'categories': rng.sample(CATEGORIES, rng.randint(1, 3)),
+            'client': ObjectId(),
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+        if len(batch) == 10000:
+            db.projects.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.projects.insert_many(batch, ordered=False)
+
+def examined(db, query, sort, limit, skip=0):
+    stats = db.projects.find(query, sort=sort, limit=limit, skip=skip).explain()['executionStats']
+    return f"keys={stats['totalKeysExamined']} docs={stats['totalDocsExamined']}"
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.models.project import Project
+    from app.services import marketplace
+
+    rng = random.Random(19)
+    print(f"Seeding {PROJECTS} projects...")
+    seed(db, PROJECTS, rng)
+    Project.ensure_indexes()
+
+    cases = [
+        ("newest, no filter", MultiDict()),
+        ("budget desc, no filter", MultiDict({'sort': 'budget_desc'})),
+        ("newest, category", MultiDict({'category': 'design'})),
+        ("newest, 2 categories + budget range", MultiDict([('category', 'design'), ('category', 'ml'),
+                                                           ('min_budget', '1000'), ('max_budget', '5000')])),
+        ("budget asc, category + deadline window", MultiDict({
+            'sort': 'budget_asc', 'category': 'python',
+            'deadline_after': (datetime.utcnow() - timedelta(days=30)).date().isoformat(),
+            'deadline_before': (datetime.utcnow() + timedelta(days=60)).date().isoformat()})),
+    ]
+    with flask_app.app_context():
+        for label, args in cases:
+            filters = marketplace.parse_filters(args)
+            print(f"--- {label}")
+            p50, p99, peak = measure(lambda: marketplace.page(filters))
+            report("first page", p50, p99, peak)
+
+            cursor = None
+            for _ in range(DEEP_PAGES):
+                _, cursor = marketplace.page(filters, cursor=cursor)
+                if cursor is None:
+                    break
+            if cursor is not None:
+                p50, p99, peak = measure(lambda: marketplace.page(filters, cursor=cursor))
+                report(f"keyset page {DEEP_PAGES + 1}", p50, p99, peak)
+
+            query = marketplace._query(filters)
+            key, direction = marketplace.SORTS[filters['sort']]
+            sort = [(key, direction), ('_id', direction)]
+            depth = DEEP_PAGES * 20
+            p50, p99, peak = measure(lambda: list(db.projects.find(query, sort=sort, skip=depth, limit=21)), repeat=5)
+            report(f"skip({depth}) page, for comparison", p50, p99, peak)
+            print(f"    first page {examined(db, query, sort, 21)};  skip page {examined(db, query, sort, 21, depth)}")
+
+            flask_app.config['MARKETPLACE_CACHE_TTL'] = 60
+            marketplace.feed(filters)
+            p50, p99, peak = measure(lambda: marketplace.feed(filters), repeat=200)
+            report("cached first page (encoded)", p50, p99, peak)
+
+        print(marketplace.get_cache().stats())
+    db.projects.drop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_matching.py
+#
+# Build time, top-k latency and incremental update cost of the freelancer
+# skill matrix over a synthetic pool (100k profiles by default). No database
+# needed.
+#
+#   python -m benchmarks.bench_matching
+
+import os
+import random
+import time
+from bson import ObjectId
+from benchmarks.common import percentile
+
+POOL = int(os.environ.get('BENCH_POOL', '100000'))
+QUERIES = int(os.environ.get('BENCH_QUERIES', '500'))
+
+# A long tail of niche skills on top of a few very common ones
+COMMON = ["web development", "design", "python", "javascript", "marketing", "writing", "seo", "react"]
+NICHE = [f"skill {n}" for n in range(400)]
+CITIES = ["pune", "mumbai", "bangalore", "new york", "london", "berlin", "lisbon", "toronto", "sydney", "tokyo"]
+
+def synthetic(rng):
+    count = rng.randint(0, 50)
+    return {
+        "_id": ObjectId(),
+        "first_name": "F",
+        "last_name": "L",
+        "skills": rng.sample(COMMON, rng.randint(0, 3)) + rng.sample(NICHE, rng.randint(1, 4)),
+        "location": {"city": rng.choice(CITIES), "country": "x"},
+        "rating": {"count": count, "total": sum(rng.randint(3, 5) for _ in range(count))},
+    }
+
+def main():
+    from app.services.matching import SkillMatrix
+
+    rng = random.Random(11)
+    docs = [synthetic(rng) for _ in range(POOL)]
+    matrix = SkillMatrix()
+    start = time.perf_counter()
+    for doc in docs:
+        matrix.upsert(doc)
+    print(f"indexed {POOL} freelancers in {time.perf_counter() - start:.2f} s")
+
+    workloads = {
+        "niche categories (2)": lambda: rng.sample(NICHE, 2),
+        "mixed categories (3)": lambda: rng.sample(COMMON, 1) + rng.sample(NICHE, 2),
+        "common categories (2)": lambda: rng.sample(COMMON, 2),
+    }
+    for label, make_categories in workloads.items():
+        samples = []
+        for _ in range(QUERIES):
+            categories = make_categories()
+            location = {"city": rng.choice(CITIES)}
+            start = time.perf_counter()
+            matrix.top_k(categories, k=10, location=location)
+            samples.append(time.perf_counter() - start)
+        print(f"top-10 {label:<24} p50={percentile(samples, 50) * 1000:6.2f} ms  "
+              f"p99={percentile(samples, 99) * 1000:6.2f} ms")
+
+    start = time.perf_counter()
+    for doc in docs[:1000]:
+        doc["skills"] = rng.sample(NICHE, 3)
+        matrix.upsert(doc)
+    print(f"incremental update: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us per profile")
+
+if __name__ == '__main__':
+    main()
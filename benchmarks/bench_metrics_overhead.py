@@ -0,0 +1,87 @@
+# benchmarks/bench_metrics_overhead.py
+#
+# Cost of the request instrumentation (app/services/metrics.py): drives the
+# read-only routes of the load test with metrics off and on, alternating in
+# rounds so drift hits both sides alike, and prints the mean latency of each
+# route both ways. Exits 1 if the overall overhead is above --threshold.
+#
+# "Off" still has the command listener registered (pymongo has no way to
+# unregister one); it returns straight away when metrics are disabled.
+#
+#   python -m benchmarks.bench_metrics_overhead                 # seed + run
+#   python -m benchmarks.bench_metrics_overhead --no-seed --rounds 10
+
+import argparse
+import fnmatch
+import random
+import sys
+import time
+from benchmarks.common import connect_bench_db
+from benchmarks.loadtest import PASSWORD, Context, scenarios
+
+READ_ROUTES = ['api_v1.*', 'client.show_client', 'client.client_projects', 'client.search_freelancers',
+               'freelancer.show_freelancer', 'freelancer.freelancer_projects', 'freelancer.freelancer_reviews',
+               'auth.login_page']
+
+def timed(test_client, build, rng, requests):
+    total = 0.0
+    for _ in range(requests):
+        method, url, kwargs = build(rng)
+        start = time.perf_counter()
+        response = test_client.open(url, method=method, **kwargs)
+        response.get_data()
+        total += time.perf_counter() - start
+        response.close()
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency cost of request metrics.")
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--freelancers', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help="reuse the data already in the bench database")
+    parser.add_argument('--rounds', type=int, default=6, help="off/on rounds per route")
+    parser.add_argument('--requests', type=int, default=50, help="requests per route per round")
+    parser.add_argument('--threshold', type=float, default=0.05, help="overall overhead counted as a failure")
+    args = parser.parse_args()
+
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.services import indexes, metrics, passwords
+    from benchmarks import datagen
+
+    with flask_app.app_context():
+        if not args.no_seed:
+            datagen.generate(db, args.clients, args.freelancers, args.projects, seed=args.seed,
+                             password_hash=passwords.hash_password(PASSWORD))
+            indexes.sync_indexes(log=lambda *_: None)
+        ctx = Context(db)
+    flask_app.config['METRICS_SLOW_REQUEST_SECONDS'] = 0  # measure the recording, not the logging
+
+    routes = {name: build for name, (build, _) in scenarios(ctx).items()
+              if any(fnmatch.fnmatch(name, pattern) for pattern in READ_ROUTES)}
+    test_client = flask_app.test_client()
+    totals = {True: 0.0, False: 0.0}
+    print(f"{'route':<36} {'off ms':>9} {'on ms':>9} {'overhead':>9}")
+    for name, build in routes.items():
+        seconds = {True: 0.0, False: 0.0}
+        timed(test_client, build, random.Random(args.seed), 5)  # warm up
+        for round_ in range(args.rounds):
+            for enabled in ((False, True) if round_ % 2 == 0 else (True, False)):
+                metrics.enable(enabled)
+                # Same requests both ways
+                seconds[enabled] += timed(test_client, build, random.Random(args.seed + round_), args.requests)
+        for enabled in seconds:
+            totals[enabled] += seconds[enabled]
+        requests = args.rounds * args.requests
+        print(f"{name:<36} {seconds[False] / requests * 1000:>9.3f} {seconds[True] / requests * 1000:>9.3f}"
+              f" {seconds[True] / seconds[False] - 1:>+9.1%}")
+    metrics.enable(True)
+
+    overhead = totals[True] / totals[False] - 1
+    print(f"overall overhead {overhead:+.2%} (threshold {args.threshold:.0%})")
+    sys.exit(1 if overhead > args.threshold else 0)
+
+if __name__ == '__main__':
+    main()
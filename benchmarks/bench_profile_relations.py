@@ -0,0 +1,95 @@
+# benchmarks/bench_profile_relations.py
+#
+# Profile fetch size and latency for a freelancer with 10k reviews, before
+# (reference array inside the profile, reviews loaded through it) and after
+# (no array, one newest-first page queried through Review.freelancer).
+#
+#   python -m benchmarks.bench_profile_relations
+
+import os
+from datetime import datetime, timedelta
+import bson
+from bson import ObjectId
+from benchmarks.common import connect_bench_db, measure, report
+
+REVIEWS = int(os.environ.get('BENCH_REVIEWS', '10000'))
+PAGE = 20
+
+def profile(username):
+    return {
+        '_id': ObjectId(),
+        'first_name': 'Free', 'last_name': 'Lancer', 'username': username,
+        'email': f'{username}@example.com', 'password': '$2b$12$' + 'x' * 53,
+        'skills': ['python', 'flask'], 'rating': {'count': 0, 'total': 0},
+    }
+
+def seed(db):
+    for name in ('freelancers', 'reviews', 'clients'):
+        db.drop_collection(name)
+    from app.models.review import Review
+    Review.ensure_indexes()
+
+    reviewer = {'_id': ObjectId(), 'username': 'reviewer', 'email': 'r@example.com', 'password': 'x'}
+    db.clients.insert_one(reviewer)
+    legacy, current = profile('legacy'), profile('current')
+    started = datetime.utcnow() - timedelta(days=365)
+    for owner in (legacy, current):
+        reviews = [{
+            '_id': ObjectId(), 'rating': 4 + i % 2, 'comment': 'Great work, would hire again. ' * 3,
+            'reviewer': reviewer['_id'], 'freelancer': owner['_id'],
+            'created_at': started + timedelta(minutes=i),
+        } for i in range(REVIEWS)]
+        db.reviews.insert_many(reviews)
+        if owner is legacy:
+            owner['reviews'] = [review['_id'] for review in reviews]
+    db.freelancers.insert_many([legacy, current])
+    return legacy['_id'], current['_id']
+
+def main():
+    db = connect_bench_db()
+    from app.models.client import Client
+    from app.models.freelancer import Freelancer
+    from app.models.review import Review
+    from app.services import reads
+
+    legacy_id, current_id = seed(db)
+    print(f"--- freelancer with {REVIEWS} reviews")
+    for label, freelancer_id in (("before: profile with reviews array", legacy_id),
+                                 ("after:  profile without array", current_id)):
+        size = len(bson.encode(db.freelancers.find_one({'_id': freelancer_id})))
+        p50, p99, peak = measure(lambda: db.freelancers.find_one({'_id': freelancer_id}))
+        report(label, p50, p99, peak)
+        print(f"{'':<40} document size={size / 1024:8.1f} KiB")
+
+    def before_reviews_page():
+        # What the reviews page did: every review listed in the array, then their reviewers
+        doc = db.freelancers.find_one({'_id': legacy_id})
+        reviews = list(db.reviews.find({'_id': {'$in': doc['reviews']}}))
+        reviewers = {review['reviewer'] for review in reviews}
+        list(db.clients.find({'_id': {'$in': list(reviewers)}}))
+        return reviews
+
+    def after_reviews_page():
+        # What freelancer_reviews does now
+        reads.get(Freelancer.objects(id=current_id), fields=('id', 'first_name', 'last_name', 'rating'))
+        reviews, _ = reads.page(Review.objects(freelancer=current_id), limit=PAGE, newest_first=True)
+        reads.attach(reviews, 'reviewer', Client,
+                     fields=('id', 'first_name', 'last_name', 'company_name', 'profile_photo'))
+        return reviews
+
+    p50, p99, peak = measure(before_reviews_page, repeat=10)
+    report("before: reviews page (all reviews)", p50, p99, peak)
+    p50, p99, peak = measure(after_reviews_page)
+    report(f"after:  reviews page ({PAGE} newest)", p50, p99, peak)
+
+    # Writes: pushing onto the embedded array rewrites a growing document
+    p50, p99, _ = measure(lambda: db.freelancers.update_one({'_id': legacy_id}, {'$push': {'reviews': ObjectId()}}))
+    report("before: $push review id onto profile", p50, p99)
+    p50, p99, _ = measure(lambda: db.freelancers.update_one({'_id': current_id}, {'$inc': {'rating.count': 1}}))
+    report("after:  $inc rating summary only", p50, p99)
+
+    for name in ('freelancers', 'reviews', 'clients'):
+        db.drop_collection(name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_read_records.py
+#
+# Documents per second and retained memory per document when turning query
+# results into something a view can use, for the Client, Freelancer and
+# Project shapes:
+#   bson dicts        what pymongo / as_pymongo() hands back (decode only)
+#   mongoengine       decode + Document._from_son (the old read path)
+#   msgspec records   decode + reads.py records
+# Starts from an encoded BSON batch, so decoding is counted like a real reply.
+# No database needed.
+#
+#   python -m benchmarks.bench_read_records
+
+import gc
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime
+import bson
+from benchmarks.bench_serialization import freelancer, project
+
+DOCS = int(os.environ.get('BENCH_DOCS', '20000'))
+
+def client(rng, i):
+    return {
+        '_id': bson.ObjectId(), 'first_name': f'Client{i}', 'last_name': 'Co', 'username': f'client{i}',
+        'email': f'client{i}@example.com', 'password': '$2b$12$' + 'x' * 53, 'company_name': 'Acme Ltd',
+        'profile_photo': f'/static/uploads/c{i}.jpg', 'photo_variants': {'avatar': {'webp': f'/v/c{i}.webp', 'jpeg': f'/v/c{i}.jpg'}},
+        'location': {'city': 'Accra', 'state': 'GA', 'country': 'Ghana', 'pincode': '00233'},
+        'category': 'Software', 'description': 'We hire developers. ' * 6, 'credits': 40,
+        'phone_number': '+233 000 000', 'updated_at': datetime.utcnow(),
+    }
+
+def rate(fn, batch):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(batch)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return DOCS / best
+
+def retained(fn, batch):
+    # Bytes still held by the result list, per document
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = fn(batch)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (after - before) / DOCS
+
+def main():
+    from app.models.client import Client
+    from app.models.freelancer import Freelancer
+    from app.models.project import Project
+    from app.services import reads, serialization
+
+    rng = random.Random(15)
+    for label, model, make in (('Client', Client, client), ('Freelancer', Freelancer, freelancer),
+                               ('Project', Project, project)):
+        batch = b''.join(bson.encode(make(rng, i)) for i in range(DOCS))
+        schema = reads.record_type(model)
+        ways = (
+            ('bson dicts', lambda data: bson.decode_all(data)),
+            ('mongoengine', lambda data: [model._from_son(doc) for doc in bson.decode_all(data)]),
+            ('msgspec records', lambda data: serialization.convert_many(bson.decode_all(data), schema)),
+        )
+        print(f"--- {DOCS} {label} documents")
+        for name, fn in ways:
+            print(f"{name:<40} {rate(fn, batch):12,.0f} docs/s  {retained(fn, batch):8.0f} B/doc")
+
+if __name__ == '__main__':
+    main()
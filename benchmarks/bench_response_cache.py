@@ -0,0 +1,78 @@
+# benchmarks/bench_response_cache.py
+#
+# Repeated browsing of the listing and profile pages: bytes rendered and CPU
+# time per request with every page rendered in full, with listing cards
+# served from the fragment cache, and with a client that revalidates with
+# If-None-Match (304s).
+#
+#   python -m benchmarks.bench_response_cache
+
+import os
+import time
+from datetime import datetime
+from bson import ObjectId
+from benchmarks.common import connect_bench_db, query_counter
+
+PROFILES = int(os.environ.get('BENCH_PROFILES', '500'))
+ROUNDS = int(os.environ.get('BENCH_ROUNDS', '20'))
+
+def seed(db):
+    for name in ('clients', 'freelancers', 'projects', 'reviews'):
+        db.drop_collection(name)
+    now = datetime.utcnow()
+    db.freelancers.insert_many([{
+        '_id': ObjectId(), 'first_name': f'Free{i}', 'last_name': 'Lancer', 'username': f'free{i}',
+        'email': f'free{i}@example.com', 'password': 'x', 'skills': ['python', 'flask', 'mongodb'],
+        'location': {'city': 'Lagos', 'country': 'Nigeria'}, 'description': 'Backend developer. ' * 5,
+        'rating': {'count': 3, 'total': 13}, 'updated_at': now,
+    } for i in range(PROFILES)])
+    db.clients.insert_many([{
+        '_id': ObjectId(), 'first_name': f'Client{i}', 'last_name': 'Co', 'username': f'client{i}',
+        'email': f'client{i}@example.com', 'password': 'x', 'company_name': 'Acme',
+        'location': {'city': 'Accra', 'country': 'Ghana'}, 'updated_at': now,
+    } for i in range(PROFILES)])
+    freelancer = db.freelancers.find_one({}, {'_id': 1})['_id']
+    client = db.clients.find_one({}, {'_id': 1})['_id']
+    return [
+        '/api/freelancers/', '/api/clients/',
+        f'/api/freelancers/{freelancer}', f'/api/freelancers/{freelancer}/reviews',
+        f'/api/clients/{client}',
+    ]
+
+def browse(flask_app, paths, revalidate):
+    client = flask_app.test_client()
+    etags = {}
+    rendered = requests = 0
+    with query_counter.count():
+        start = time.process_time()
+        for _ in range(ROUNDS):
+            for path in paths:
+                headers = {'If-None-Match': etags[path]} if revalidate and path in etags else {}
+                response = client.get(path, headers=headers)
+                if response.headers.get('ETag'):
+                    etags[path] = response.headers['ETag']
+                rendered += len(response.data)
+                requests += 1
+        cpu = time.process_time() - start
+    return requests, rendered, cpu, query_counter.total()
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.services import http_cache
+
+    paths = seed(db)
+    print(f"--- {PROFILES} freelancers / clients, {ROUNDS} rounds over {len(paths)} pages")
+    for label, fragments, revalidate in (("full render", False, False),
+                                         ("fragment cache", True, False),
+                                         ("fragment cache + If-None-Match", True, True)):
+        flask_app.config['RESPONSE_FRAGMENT_CACHE'] = fragments
+        flask_app.extensions.pop('fragment_cache', None)
+        flask_app.extensions.pop('profile_cache', None)
+        requests, rendered, cpu, queries = browse(flask_app, paths, revalidate)
+        print(f"{label:<40} cpu/request={cpu / requests * 1000:8.2f} ms  "
+              f"bytes/request={rendered / requests / 1024:8.1f} KiB  queries/request={queries / requests:5.1f}")
+    print(http_cache.stats())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_search.py
+#
+# Build time and typeahead latency of the in-process freelancer index over a
+# synthetic corpus (100k profiles by default). No database needed.
+#
+#   python -m benchmarks.bench_search
+
+import os
+import random
+import time
+from bson import ObjectId
+from benchmarks.common import percentile
+
+CORPUS = int(os.environ.get('BENCH_CORPUS', '100000'))
+QUERIES = int(os.environ.get('BENCH_QUERIES', '2000'))
+
+FIRST = ["aarav", "priya", "john", "jane", "maria", "li", "ahmed", "sofia", "liam", "olivia", "noah", "emma",
+         "arjun", "ananya", "lucas", "mia", "ethan", "ava", "rohan", "isha", "mateo", "chloe", "omar", "zara"]
+LAST = ["sharma", "smith", "garcia", "chen", "khan", "rossi", "muller", "silva", "kim", "patel", "nguyen",
+        "johnson", "brown", "lopez", "martin", "singh", "kowalski", "ito", "dubois", "novak"]
+SKILLS = ["python", "django", "flask", "react", "node.js", "mongodb", "postgres", "figma", "photoshop",
+          "seo", "copywriting", "kotlin", "swift", "aws", "docker", "kubernetes", "c++", "c#", "unity",
+          "illustrator", "video editing", "data analysis", "machine learning", "wordpress", "shopify"]
+CITIES = ["pune", "mumbai", "bangalore", "new york", "london", "berlin", "lisbon", "toronto", "sydney", "tokyo"]
+WORDS = ["experienced", "freelancer", "building", "modern", "scalable", "apps", "design", "brand", "marketing",
+         "clients", "delivery", "quality", "startup", "enterprise", "remote", "agile", "creative", "analytics"]
+
+def synthetic(rng):
+    return {
+        "_id": ObjectId(),
+        "first_name": rng.choice(FIRST).title() + (str(rng.randint(1, 999)) if rng.random() < 0.3 else ""),
+        "last_name": rng.choice(LAST).title(),
+        "skills": rng.sample(SKILLS, rng.randint(2, 6)),
+        "location": {"city": rng.choice(CITIES), "country": "x"},
+        "description": " ".join(rng.choices(WORDS, k=12)),
+    }
+
+def main():
+    from app.services.search import SearchIndex
+
+    rng = random.Random(7)
+    docs = [synthetic(rng) for _ in range(CORPUS)]
+    index = SearchIndex()
+    start = time.perf_counter()
+    for doc in docs:
+        index.upsert(doc)
+    print(f"indexed {CORPUS} freelancers in {time.perf_counter() - start:.2f} s")
+
+    vocabulary = FIRST + LAST + [skill.split()[0] for skill in SKILLS] + CITIES
+    workloads = {
+        "typeahead 1-2 chars": lambda: rng.choice(vocabulary)[:rng.randint(1, 2)],
+        "typeahead 3-5 chars": lambda: rng.choice(vocabulary)[:rng.randint(3, 5)],
+        "two words + prefix": lambda: f"{rng.choice(FIRST)} {rng.choice(LAST)[:3]}",
+        "skill + city": lambda: f"{rng.choice(SKILLS)} {rng.choice(CITIES)}",
+    }
+    # cold: result cache cleared before every query; warm: realistic repeats hit the cache
+    for mode in ("cold", "warm"):
+        for label, make_query in workloads.items():
+            samples = []
+            for _ in range(QUERIES):
+                query = make_query()
+                if mode == "cold":
+                    index._results.clear()
+                start = time.perf_counter()
+                index.search(query, limit=10)
+                samples.append(time.perf_counter() - start)
+            print(f"{mode} {label:<22} p50={percentile(samples, 50) * 1000:6.2f} ms  "
+                  f"p99={percentile(samples, 99) * 1000:6.2f} ms")
+
+    start = time.perf_counter()
+    for doc in docs[:1000]:
+        doc["skills"] = rng.sample(SKILLS, 3)
+        index.upsert(doc)
+    print(f"incremental update: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us per profile")
+
+if __name__ == '__main__':
+    main()
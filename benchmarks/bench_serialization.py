@@ -0,0 +1,87 @@
+# benchmarks/bench_serialization.py
+#
+# Encoding a large list response (freelancer profiles, projects) three ways,
+# starting from the raw documents a query returns:
+#   mongoengine + jsonify   hydrate each Document, to_json() it, jsonify the list
+#   as_pymongo + json_util  bson.json_util.dumps over the raw dicts
+#   as_pymongo + msgspec    the /api/v1 path: convert into Structs, encode
+# No database needed.
+#
+#   python -m benchmarks.bench_serialization
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId, json_util
+from benchmarks.common import measure, report
+
+SIZES = tuple(int(size) for size in os.environ.get('BENCH_SIZES', '100,1000,10000').split(','))
+
+def variants(i):
+    # Shaped like thumbnails.generate_variants stores them
+    return {name: {'webp': f'/uploads/variants/{name}/{i}.webp', 'jpeg': f'/uploads/variants/{name}/{i}.jpg'}
+            for name in ('avatar', 'card', 'full')}
+
+def freelancer(rng, i):
+    count = rng.randint(0, 40)
+    return {
+        '_id': ObjectId(), 'first_name': f'Free{i}', 'last_name': 'Lancer', 'username': f'free{i}',
+        'email': f'free{i}@example.com', 'password': '$2b$12$' + 'x' * 53,
+        'profile_photo': f'/static/uploads/{i}.jpg', 'photo_variants': variants(i),
+        'location': {'city': 'Pune', 'state': 'MH', 'country': 'India'},
+        'experience': '5', 'description': 'Full-stack developer. ' * 8,
+        'skills': rng.sample(['python', 'flask', 'react', 'mongodb', 'design', 'seo', 'go', 'rust'], 4),
+        'rating': {'count': count, 'total': count * 4, 'histogram': {'1': 0, '2': 0, '3': 0, '4': count, '5': 0},
+                   'last_review_at': datetime.utcnow()},
+        'credits': 10, 'earnings': 1200, 'updated_at': datetime.utcnow(),
+    }
+
+def project(rng, i):
+    return {
+        '_id': ObjectId(), 'title': f'Project {i}', 'description': 'Build a thing. ' * 10,
+        'budget': rng.randint(100, 5000), 'deadline': datetime.utcnow() + timedelta(days=30),
+        'status': 'Open', 'categories': ['python', 'web development'], 'client': ObjectId(),
+        'assigned_freelancer': ObjectId(), 'created_at': datetime.utcnow(), 'updated_at': datetime.utcnow(),
+    }
+
+def main():
+    from app import app as flask_app
+    from flask import jsonify
+    from app.models.freelancer import Freelancer
+    from app.models.project import Project
+    from app.services import serialization
+
+    rng = random.Random(14)
+    # Round trip: a profile whose thumbnail job has run converts and encodes intact
+    raw = freelancer(rng, 0)
+    decoded = json.loads(serialization.encode(serialization.convert(raw, serialization.Freelancer)))
+    assert decoded['photo_variants'] == raw['photo_variants'], decoded['photo_variants']
+
+    for label, model, schema, make in (('freelancers', Freelancer, serialization.Freelancer, freelancer),
+                                       ('projects', Project, serialization.Project, project)):
+        for size in SIZES:
+            raws = [make(rng, i) for i in range(size)]
+            print(f"--- {size} {label}")
+
+            def with_jsonify():
+                docs = [model._from_son(raw) for raw in raws]
+                return jsonify([json.loads(doc.to_json()) for doc in docs]).get_data()
+
+            def with_json_util():
+                return json_util.dumps(raws).encode()
+
+            def with_msgspec():
+                return serialization.encode(serialization.convert_many(raws, schema))
+
+            with flask_app.test_request_context():
+                for name, fn in (('mongoengine + jsonify', with_jsonify),
+                                 ('as_pymongo + json_util', with_json_util),
+                                 ('as_pymongo + msgspec', with_msgspec)):
+                    repeat = 5 if size >= 10000 else 20
+                    p50, p99, peak = measure(fn, repeat=repeat)
+                    report(name, p50, p99, peak)
+                    print(f"{'':<40} body={len(fn()) / 1024:10.1f} KiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start cost, measured in fresh interpreters with ``python -X importtime``:
+#
+#   package     import app                         (Flask, MongoEngine and the db handle)
+#   script      create_app(web=False)              (what CLI scripts and the job worker build)
+#   web         from app import app                (what a gunicorn worker serves)
+#
+# For each it prints the median time to ready, the import time reported by
+# -X importtime, and the slowest top-level imports. It also checks that the
+# subsystems kept out of start-up stay lazy (LAZY below) and exits 1 if one
+# is imported, or if a case is slower than its --budget-ms.
+#
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --runs 10 --budget-ms script=400 --budget-ms web=900
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from benchmarks.common import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code run in the child; it prints how long reaching "ready" took
+CASES = {
+    'package': "import app",
+    'script': "from app import create_app; create_app(web=False)",
+    'web': "from app import app",
+}
+# Modules that must not be imported by the time each case is ready
+LAZY = {
+    'package': ['cProfile', 'pstats', 'flask_jwt_extended', 'app.routes', 'app.services'],
+    'script': ['cProfile', 'pstats', 'flask_jwt_extended', 'app.routes'],
+    'web': ['cProfile', 'pstats'],
+}
+CHILD = """
+import time
+_start = time.perf_counter()
+{code}
+import sys
+print(time.perf_counter() - _start)
+print(','.join(sorted(sys.modules)))
+"""
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def run_case(code):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD.format(code=code)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f"child failed:\n{result.stderr[-2000:]}")
+    seconds, modules = result.stdout.strip().splitlines()[-2:]
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            imports.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    return float(seconds), set(modules.split(',')), imports
+
+def top_level(imports, count, boot=frozenset()):
+    # Cumulative microseconds of the imports made by the case's code and, one
+    # level down, by those (less what the interpreter imports anyway), largest first
+    depth = min((indent for _, indent, _ in imports), default=0)
+    return sorted(((cumulative, name) for cumulative, indent, name in imports
+                   if indent <= depth + 2 and name not in boot), reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure start-up time and check lazy imports.")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per case")
+    parser.add_argument('--top', type=int, default=8, help="slowest top-level imports to list")
+    parser.add_argument('--budget-ms', action='append', default=[], metavar='CASE=MS',
+                        help="fail when the median time to ready of CASE exceeds MS (repeatable)")
+    args = parser.parse_args()
+    budgets = {case: float(ms) for case, ms in (item.split('=', 1) for item in args.budget_ms)}
+
+    boot = frozenset(name for _, _, name in run_case('pass')[2])
+    failures = []
+    for case, code in CASES.items():
+        runs = [run_case(code) for _ in range(args.runs)]
+        ready = percentile([seconds for seconds, _, _ in runs], 50) * 1000
+        seconds, modules, imports = runs[-1]
+        import_ms = sum(cumulative for cumulative, indent, name in imports
+                        if indent == min(i for _, i, _ in imports) and name not in boot) / 1000
+        print(f"--- {case:<7} ready in {ready:7.1f} ms (median of {args.runs}), "
+              f"imports {import_ms:7.1f} ms, {len(modules)} modules   [{code}]")
+        for cumulative, name in top_level(imports, args.top, boot):
+            print(f"    {cumulative / 1000:7.1f} ms  {name}")
+        eager = [name for name in LAZY[case] if name in modules]
+        if eager:
+            failures.append(f"{case}: imported {', '.join(eager)} at start-up")
+        if case in budgets and ready > budgets[case]:
+            failures.append(f"{case}: {ready:.0f} ms is over the {budgets[case]:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
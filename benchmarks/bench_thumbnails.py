@@ -0,0 +1,53 @@
+# benchmarks/bench_thumbnails.py
+#
+# Image bytes a listing page pulls with original uploads versus the card
+# variants, plus the time the worker spends per photo.
+#
+#   python -m benchmarks.bench_thumbnails
+
+import os
+import shutil
+import tempfile
+import time
+from PIL import Image
+
+PAGE_SIZE = int(os.environ.get('BENCH_PAGE_SIZE', '20'))
+PHOTO_SIZE = (3000, 2000)
+
+def synthetic_photo(path, seed):
+    # Noise over a gradient compresses roughly like a camera photo
+    noise = Image.effect_noise(PHOTO_SIZE, 40 + seed % 20).convert('RGB')
+    gradient = Image.linear_gradient('L').resize(PHOTO_SIZE).convert('RGB')
+    Image.blend(noise, gradient, 0.5).save(path, 'JPEG', quality=92)
+
+def main():
+    from app import app as flask_app
+    from app.services.thumbnails import generate_variants
+
+    workdir = tempfile.mkdtemp(prefix='bench-thumbs-')
+    flask_app.config['UPLOAD_FOLDER'] = workdir
+    original_bytes = 0
+    card_bytes = {'webp': 0, 'jpeg': 0}
+    elapsed = 0.0
+
+    with flask_app.app_context():
+        for i in range(PAGE_SIZE):
+            path = os.path.join(workdir, f'photo{i}.jpg')
+            synthetic_photo(path, i)
+            original_bytes += os.path.getsize(path)
+
+            start = time.perf_counter()
+            variants = generate_variants(f'/uploads/photo{i}.jpg')
+            elapsed += time.perf_counter() - start
+            for fmt in card_bytes:
+                card_bytes[fmt] += os.path.getsize(os.path.join(workdir, variants['card'][fmt][len('/uploads/'):]))
+
+    print(f"listing page of {PAGE_SIZE} cards")
+    print(f"originals:   {original_bytes / 1024:10.1f} KiB")
+    for fmt, size in card_bytes.items():
+        print(f"card {fmt:<6} {size / 1024:10.1f} KiB  ({original_bytes / size:5.1f}x smaller)")
+    print(f"variant generation: {elapsed / PAGE_SIZE * 1000:.1f} ms per photo")
+    shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_uploads.py
+#
+# Peak Python heap and wall time while several large profile photos are
+# uploaded concurrently: Werkzeug's default spool + file.save() versus the
+# hashing, content-addressed UploadRequest pipeline.
+#
+#   python -m benchmarks.bench_uploads
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from flask import Request, request
+from werkzeug.test import create_environ
+
+UPLOAD_MB = int(os.environ.get('BENCH_UPLOAD_MB', '20'))
+CONCURRENCY = int(os.environ.get('BENCH_CONCURRENCY', '8'))
+BOUNDARY = 'benchboundary'
+
+class MultipartBody:
+    # Serves a multipart body whose file part is read from disk on demand
+
+    def __init__(self, path):
+        self._parts = [
+            (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="profilePhoto"; '
+             f'filename="photo.png"\r\nContent-Type: image/png\r\n\r\n').encode(),
+            path,
+            f'\r\n--{BOUNDARY}--\r\n'.encode(),
+        ]
+        self.length = len(self._parts[0]) + os.path.getsize(path) + len(self._parts[2])
+        self._file = None
+
+    def read(self, size=-1):
+        while self._parts:
+            part = self._parts[0]
+            if isinstance(part, str):
+                self._file = self._file or open(part, 'rb')
+                chunk = self._file.read(size if size > 0 else 64 * 1024)
+                if chunk:
+                    return chunk
+                self._file.close()
+                self._parts.pop(0)
+                continue
+            chunk, rest = (part[:size], part[size:]) if size > 0 else (part, b'')
+            if rest:
+                self._parts[0] = rest
+            else:
+                self._parts.pop(0)
+            return chunk
+        return b''
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+def environ_for(path):
+    body = MultipartBody(path)
+    environ = create_environ('/bench-upload', method='POST')
+    environ.update({
+        'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+        'CONTENT_LENGTH': str(body.length),
+        'wsgi.input': body,
+    })
+    return environ
+
+def run(label, flask_app, handler, source):
+    def upload(i):
+        with flask_app.request_context(environ_for(source)):
+            handler(i)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(upload, range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed:6.2f} s  peak heap {peak / 1024 / 1024:7.2f} MiB")
+
+def main():
+    from app import app as flask_app
+    from app.services.uploads import UploadRequest, store_upload
+
+    workdir = tempfile.mkdtemp(prefix='bench-uploads-')
+    source = os.path.join(workdir, 'source.png')
+    with open(source, 'wb') as out:
+        for _ in range(UPLOAD_MB):
+            out.write(os.urandom(1024 * 1024))
+
+    flask_app.config['UPLOAD_FOLDER'] = os.path.join(workdir, 'uploads')
+    flask_app.config['UPLOAD_MAX_BYTES'] = (UPLOAD_MB + 1) * 1024 * 1024
+    flask_app.config['MAX_CONTENT_LENGTH'] = None
+    os.makedirs(flask_app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    def save_by_name(i):
+        request.files['profilePhoto'].save(os.path.join(flask_app.config['UPLOAD_FOLDER'], f'{i}-photo.png'))
+
+    def store_by_digest(i):
+        store_upload(request.files['profilePhoto'])
+
+    print(f"{CONCURRENCY} concurrent uploads of {UPLOAD_MB} MiB")
+    flask_app.request_class = Request
+    run("before: spool + file.save()", flask_app, save_by_name, source)
+    flask_app.request_class = UploadRequest
+    run("after: hashing spool + rename", flask_app, store_by_digest, source)
+
+    stored = sum(len(files) for _, _, files in os.walk(flask_app.config['UPLOAD_FOLDER']))
+    print(f"files on disk: {stored} ({CONCURRENCY} by name, deduplicated copies by digest)")
+    shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_workers.py
+#
+# Throughput against worker count: serves the app with gunicorn
+# (gunicorn.conf.py, so preload and the post-fork reconnect are exercised)
+# on the bench database with 1, 2, 4, ... workers, and drives a mix of the
+# load test's read routes from separate client processes over keep-alive
+# connections for a fixed time. Prints requests per second, speed-up over
+# the smallest worker count, and p50/p99 latency.
+#
+# Client processes share the machine with the workers; on small machines
+# give them fewer cores (--concurrency) or run the server elsewhere.
+#
+#   python -m benchmarks.bench_workers                          # seed + run
+#   python -m benchmarks.bench_workers --no-seed --workers 1 2 4 8 --duration 30
+
+import argparse
+import fnmatch
+import http.client
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from benchmarks.common import BENCH_MONGO_URI, connect_bench_db, percentile
+from benchmarks.loadtest import PASSWORD, Context, scenarios
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READ_ROUTES = ['api_v1.*', 'client.show_client', 'client.client_projects', 'client.search_freelancers',
+               'freelancer.show_freelancer', 'freelancer.freelancer_projects', 'freelancer.freelancer_reviews',
+               'auth.login_page']
+
+def urls(ctx, count, seed):
+    rng = random.Random(seed)
+    builds = [build for name, (build, _) in scenarios(ctx).items()
+              if any(fnmatch.fnmatch(name, pattern) for pattern in READ_ROUTES)]
+    return [rng.choice(builds)(rng)[1] for _ in range(count)]
+
+def drive(port, paths, duration, seed):
+    # One client: requests back to back over a keep-alive connection
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    samples, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request('GET', rng.choice(paths))
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        samples.append(time.perf_counter() - start)
+    connection.close()
+    return samples, errors
+
+def serve(workers, threads, port):
+    env = dict(os.environ, MONGO_URI=BENCH_MONGO_URI, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               BIND=f'127.0.0.1:{port}')
+    env.setdefault('SECRET_KEY', 'bench-secret')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', os.devnull],
+                              cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/auth/login')
+            connection.getresponse().read()
+            connection.close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("gunicorn did not start listening within 60s")
+
+def stop(server):
+    server.send_signal(signal.SIGTERM)  # graceful: workers finish what they're doing
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput scaling with gunicorn worker count.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, max(1, os.cpu_count() or 1)])
+    parser.add_argument('--threads', type=int, default=4, help="threads per worker")
+    parser.add_argument('--concurrency', type=int, default=32, help="client processes")
+    parser.add_argument('--duration', type=float, default=20, help="seconds of load per worker count")
+    parser.add_argument('--warmup', type=float, default=3, help="seconds of untimed load first")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--freelancers', type=int, default=5000)
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help="reuse the data already in the bench database")
+    args = parser.parse_args()
+
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.services import indexes, passwords
+    from benchmarks import datagen
+
+    with flask_app.app_context():
+        if not args.no_seed:
+            datagen.generate(db, args.clients, args.freelancers, args.projects, seed=args.seed,
+                             password_hash=passwords.hash_password(PASSWORD))
+            indexes.sync_indexes(log=lambda *_: None)
+        paths = urls(Context(db), 5000, args.seed)
+
+    print(f"{'workers':>7} {'req/s':>9} {'speed-up':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    baseline = None
+    with multiprocessing.get_context('spawn').Pool(args.concurrency) as pool:
+        for workers in sorted(set(args.workers)):
+            server = serve(workers, args.threads, args.port)
+            try:
+                pool.starmap(drive, [(args.port, paths, args.warmup, i) for i in range(args.concurrency)])
+                results = pool.starmap(drive, [(args.port, paths, args.duration, i) for i in range(args.concurrency)])
+            finally:
+                stop(server)
+            samples = [sample for client_samples, _ in results for sample in client_samples]
+            errors = sum(client_errors for _, client_errors in results)
+            throughput = len(samples) / args.duration
+            baseline = baseline or throughput
+            print(f"{workers:>7} {throughput:>9.1f} {throughput / baseline:>8.2f}x"
+                  f" {percentile(samples, 50) * 1000:>8.2f} {percentile(samples, 99) * 1000:>8.2f} {errors:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/check_ownership.py
+#
+# Asserts that a client or freelancer can only edit or delete their own
+# projects: the same request with another account's id in the URL must get
+# "Project not found" and leave the project (and its counters) alone. Exits
+# non-zero on the first route that lets a non-owner through.
+#
+#   python -m benchmarks.check_ownership
+
+import sys
+from datetime import datetime, timedelta
+from benchmarks.common import connect_bench_db
+
+FORM = {'title': 'Changed', 'description': 'd', 'budget': '1', 'deadline': '2030-01-01', 'status': 'Cancelled'}
+
+def seed(db):
+    from app.models.client import Client
+    from app.models.freelancer import Freelancer
+    from app.models.project import Project
+
+    for name in ('clients', 'freelancers', 'projects', 'status_events', 'activity_counters'):
+        db.drop_collection(name)
+    owner = Client(first_name='Own', last_name='Er', username='owner', email='owner@example.com', password='x').save()
+    other = Client(first_name='Oth', last_name='Er', username='other', email='other@example.com', password='x').save()
+    freelancer = Freelancer(first_name='Free', last_name='Lancer', username='free',
+                            email='free@example.com', password='x').save()
+    stranger = Freelancer(first_name='Str', last_name='Anger', username='stranger',
+                          email='stranger@example.com', password='x').save()
+    project = Project(title='Mine', description='d', budget=100, deadline=datetime.utcnow() + timedelta(days=30),
+                      status='In Progress', client=owner, assigned_freelancer=freelancer).save()
+    return owner.id, other.id, freelancer.id, stranger.id, project.id
+
+def flashed(test_client):
+    with test_client.session_transaction() as session:
+        return [message for _, message in session.pop('_flashes', [])]
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.models.project import Project
+
+    owner, other, freelancer, stranger, project_id = seed(db)
+    test_client = flask_app.test_client()
+
+    def client_says(response):
+        return 'Project not found' in response.get_data(as_text=True)
+
+    def freelancer_says(response):
+        return 'Project not found' in flashed(test_client)
+
+    checks = [
+        ('client edits another client\'s project', client_says,
+         lambda: test_client.post(f'/api/clients/{other}/projects/{project_id}/edit', data=FORM)),
+        ('client deletes another client\'s project', client_says,
+         lambda: test_client.delete(f'/api/clients/{other}/projects/{project_id}')),
+        ('freelancer edits a project not assigned to them', freelancer_says,
+         lambda: test_client.post(f'/api/freelancers/{stranger}/projects/{project_id}/edit', data=FORM)),
+        ('freelancer deletes a project not assigned to them', freelancer_says,
+         lambda: test_client.delete(f'/api/freelancers/{stranger}/projects/{project_id}')),
+    ]
+    failed = False
+    for label, refused, request in checks:
+        ok = refused(request())
+        project = Project.objects(id=project_id).first()
+        ok = ok and project is not None and project.title == 'Mine' and project.status == 'In Progress'
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label}")
+
+    # The owners still can
+    test_client.delete(f'/api/freelancers/{freelancer}/projects/{project_id}')
+    ok = Project.objects(id=project_id).first() is None
+    failed = failed or not ok
+    print(f"{'ok  ' if ok else 'FAIL'} assigned freelancer deletes the project")
+
+    for name in ('clients', 'freelancers', 'projects', 'status_events', 'activity_counters'):
+        db.drop_collection(name)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
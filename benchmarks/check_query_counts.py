@@ -0,0 +1,71 @@
+# benchmarks/check_query_counts.py
+#
+# Asserts that the detail pages cost a constant number of MongoDB queries no
+# matter how many projects / reviews a profile has. Exits non-zero on
+# the first route whose query count changes with the list length.
+#
+#   python -m benchmarks.check_query_counts
+
+import sys
+from benchmarks.common import connect_bench_db, query_counter
+
+LIST_LENGTHS = (1, 10, 100)
+
+def seed(db, length):
+    from app.models.client import Client
+    from app.models.freelancer import Freelancer
+    from app.models.project import Project
+    from app.models.review import Review
+
+    for name in ('clients', 'freelancers', 'projects', 'reviews'):
+        db.drop_collection(name)
+
+    owner = Client(username='owner', email='owner@example.com', password='x').save()
+    freelancer = Freelancer(first_name='Free', last_name='Lancer', username='free',
+                            email='free@example.com', password='x').save()
+    for i in range(length):
+        Project(title=f'Project {i}', description='d', budget=100,
+                deadline='2030-01-01', client=owner, assigned_freelancer=freelancer).save()
+        reviewer = Client(username=f'reviewer{i}', email=f'reviewer{i}@example.com', password='x').save()
+        Review(rating=5, comment='Great', reviewer=reviewer, freelancer=freelancer).save()
+    return str(owner.id), str(freelancer.id)
+
+def run_view(flask_app, endpoint, path, **view_args):
+    # Template errors still leave the queries issued up to that point counted;
+    # they are reported but do not hide a query-count regression.
+    with flask_app.test_request_context(path):
+        with query_counter.count():
+            try:
+                flask_app.view_functions[endpoint](**view_args)
+            except Exception as error:
+                print(f"note {endpoint}: view raised {type(error).__name__}: {error}")
+    return query_counter.total()
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+
+    counts = {}
+    for length in LIST_LENGTHS:
+        client_id, freelancer_id = seed(db, length)
+        routes = {
+            'freelancer.show_freelancer': (f'/api/freelancers/{freelancer_id}', {'freelancer_id': freelancer_id}),
+            'freelancer.freelancer_projects': (f'/api/freelancers/{freelancer_id}/projects', {'freelancer_id': freelancer_id}),
+            'freelancer.freelancer_reviews': (f'/api/freelancers/{freelancer_id}/reviews', {'freelancer_id': freelancer_id}),
+            'client.show_client': (f'/api/clients/{client_id}', {'client_id': client_id}),
+            'client.client_projects': (f'/api/clients/{client_id}/projects', {'client_id': client_id}),
+        }
+        for endpoint, (path, view_args) in routes.items():
+            counts.setdefault(endpoint, {})[length] = run_view(flask_app, endpoint, path, **view_args)
+
+    failed = False
+    for endpoint, by_length in counts.items():
+        constant = len(set(by_length.values())) == 1
+        failed = failed or not constant
+        detail = ', '.join(f'{length} refs: {count} queries' for length, count in by_length.items())
+        print(f"{'ok  ' if constant else 'FAIL'} {endpoint:<34} {detail}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/common.py
+#
+# Shared helpers for the benchmark scripts. Every benchmark runs against a
+# throwaway database (BENCH_MONGO_URI) so it can drop and reseed freely.
+
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pymongo import monitoring
+from mongoengine import connect, disconnect_all
+
+BENCH_MONGO_URI = os.environ.get('BENCH_MONGO_URI', 'mongodb://localhost:27017/freelaunch_bench')
+
+class QueryCounter(monitoring.CommandListener):
+    # Counts the commands pymongo sends while ``enabled`` is set
+
+    def __init__(self):
+        self.enabled = False
+        self.commands = []
+
+    def started(self, event):
+        if self.enabled:
+            self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    @contextmanager
+    def count(self):
+        self.commands = []
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = False
+
+    def total(self, *command_names):
+        return sum(1 for name, _ in self.commands if not command_names or name in command_names)
+
+query_counter = QueryCounter()
+
+def connect_bench_db():
+    # Building the app registers the default alias against the dev database,
+    # so drop that connection and point the models at the bench database.
+    from app import app  # noqa: F401
+    disconnect_all()
+    client = connect(host=BENCH_MONGO_URI, event_listeners=[query_counter])
+    return client.get_default_database()
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(fn, repeat=20):
+    # Returns (p50 seconds, p99 seconds, peak traced bytes of a single call)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return percentile(samples, 50), percentile(samples, 99), peak
+
+def report(label, p50, p99, peak=None):
+    line = f"{label:<40} p50={p50 * 1000:8.2f} ms  p99={p99 * 1000:8.2f} ms"
+    if peak is not None:
+        line += f"  peak={peak / 1024:10.1f} KiB"
+    print(line)
@@ -0,0 +1,314 @@
+# benchmarks/datagen.py
+#
+# Synthetic marketplace data at production scale: clients, freelancers (with
+# login credentials), projects in every status, their agreements and reviews,
+# plus the denormalized state the app maintains (rating summaries, earnings,
+# activity counters), all consistent with each other.
+#
+# Everything streams through insert_many in batches, so millions of documents
+# need little memory. The same seed and anchor date produce the same data,
+# ids included: ids are built from each document's creation time and index.
+#
+#   python init_db.py --clients 200000 --freelancers 500000 --projects 2000000
+#   python -m benchmarks.loadtest            # seeds a smaller set itself
+
+import random
+from array import array
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+BATCH_SIZE = 10000
+COLLECTIONS = ('clients', 'freelancers', 'credentials', 'projects', 'agreements', 'reviews',
+               'activity_counters', 'status_events', 'transactions', 'credit_snapshots')
+
+FIRST_NAMES = ['Aarav', 'Alice', 'Bo', 'Carmen', 'Dmitri', 'Emeka', 'Fatima', 'Grace', 'Hiro', 'Ines',
+               'Jamal', 'Kavya', 'Liam', 'Mei', 'Noah', 'Olga', 'Priya', 'Quentin', 'Rosa', 'Sven']
+LAST_NAMES = ['Adeyemi', 'Brown', 'Chen', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Hassan', 'Ivanova',
+              'Johnson', 'Kim', 'Lopez', 'Muller', 'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Singh']
+PLACES = [('New York', 'NY', 'USA', '10001'), ('San Francisco', 'CA', 'USA', '94101'),
+          ('Austin', 'TX', 'USA', '73301'), ('London', 'England', 'UK', 'EC1A'),
+          ('Berlin', 'Berlin', 'Germany', '10115'), ('Pune', 'MH', 'India', '411001'),
+          ('Bengaluru', 'KA', 'India', '560001'), ('Lagos', 'Lagos', 'Nigeria', '100001'),
+          ('Sao Paulo', 'SP', 'Brazil', '01000'), ('Toronto', 'ON', 'Canada', 'M5H')]
+SKILLS = ['Python', 'Flask', 'MongoDB', 'JavaScript', 'React', 'CSS', 'HTML', 'Design', 'Figma',
+          'Data Science', 'Machine Learning', 'DevOps', 'AWS', 'iOS', 'Android', 'Writing', 'SEO',
+          'Marketing', 'Video Editing', 'Translation', 'QA', 'Go', 'Rust', 'SQL']
+INDUSTRIES = ['Technology', 'Marketing', 'Finance', 'Healthcare', 'Education', 'Retail', 'Media']
+# Project status mix; Open projects have no freelancer, the rest (bar some
+# cancellations) have one and an agreement
+STATUS_WEIGHTS = [('Open', 50), ('In Progress', 20), ('Completed', 25), ('Cancelled', 5)]
+REVIEW_RATE = 0.8  # share of completed projects the client reviewed
+RATINGS = [1, 2, 3, 4, 5]
+RATING_WEIGHTS = [3, 5, 12, 35, 45]
+HISTORY = timedelta(days=730)  # creation times spread over this window before the anchor
+
+# Distinct id spaces per collection, so ids never collide across kinds
+KINDS = {'client': 1, 'freelancer': 2, 'project': 3, 'agreement': 4, 'review': 5, 'credential': 6}
+
+def object_id(kind, index, when):
+    return ObjectId(ObjectId.from_datetime(when).binary[:4] + bytes([KINDS[kind]]) + index.to_bytes(7, 'big'))
+
+def default_anchor():
+    # Midnight UTC today: stable for a day, and Open deadlines stay in the future
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+class Generator:
+    def __init__(self, clients, freelancers, projects, seed=42, anchor=None, password_hash='x'):
+        self.clients = clients
+        self.freelancers = freelancers
+        self.projects = projects
+        self.seed = seed
+        self.anchor = anchor or default_anchor()
+        self.password_hash = password_hash
+        # Per-account tallies gathered while generating projects, written with the profiles
+        self.client_counts = {field: array('q', bytes(8 * clients)) for field in ('open', 'in_progress', 'completed', 'cancelled')}
+        self.freelancer_counts = {field: array('q', bytes(8 * freelancers))
+                                  for field in ('in_progress', 'completed', 'cancelled', 'earnings',
+                                                'rating_count', 'rating_total', 'star1', 'star2', 'star3', 'star4', 'star5')}
+        self.last_review = array('d', bytes(8 * freelancers))  # seconds after the history start, 0 = none
+
+    def _rng(self, stream):
+        # One independent stream per collection, so changing one size leaves the others' data alone
+        return random.Random(f'{self.seed}:{stream}')
+
+    def _created(self, rng, index, count):
+        # Spread evenly over the history window with jitter, in index order
+        start = self.anchor - HISTORY
+        step = HISTORY.total_seconds() / max(count, 1)
+        return start + timedelta(seconds=index * step + rng.random() * step)
+
+    def _person(self, rng):
+        city, state, country, pincode = rng.choice(PLACES)
+        return {
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'location': {'city': city, 'state': state, 'country': country, 'pincode': pincode},
+        }
+
+    def _ids(self, kind, count):
+        rng = self._rng(f'{kind}-ids')
+        return [object_id(kind, i, self._created(rng, i, count)) for i in range(count)]
+
+    def client_ids(self):
+        return self._ids('client', self.clients)
+
+    def freelancer_ids(self):
+        return self._ids('freelancer', self.freelancers)
+
+    def _opening(self, role, user_id, credits):
+        # The ledger row credits.open_balances() would write for this balance
+        return {'_id': user_id, 'user': user_id, 'user_role': role, 'amount': credits, 'kind': 'opening',
+                'balance_after': credits, 'idempotency_key': 'opening',
+                'created_at': user_id.generation_time.replace(tzinfo=None)}
+
+    def client_docs(self, ids, ledger):
+        """Yield clients; opening ledger rows for their credits are appended to ``ledger``."""
+        rng = self._rng('clients')
+        for i, client_id in enumerate(ids):
+            person = self._person(rng)
+            credits = rng.randint(0, 1000)
+            if credits:
+                ledger.append(self._opening('client', client_id, credits))
+            yield {
+                '_id': client_id,
+                **person,
+                'username': f'client{i}',
+                'company_name': f"{person['last_name']} {rng.choice(['Labs', 'Studio', 'Group', 'Works'])}",
+                'email': f'client{i}@example.com',
+                'password': self.password_hash,
+                'category': rng.choice(INDUSTRIES),
+                'description': 'We hire freelancers for ' + ', '.join(rng.sample(SKILLS, 3)) + '.',
+                'credits': credits,
+                'updated_at': client_id.generation_time.replace(tzinfo=None),
+            }
+
+    def freelancer_docs(self, ids, ledger):
+        rng = self._rng('freelancers')
+        counts = self.freelancer_counts
+        start = self.anchor - HISTORY
+        for i, freelancer_id in enumerate(ids):
+            person = self._person(rng)
+            skills = rng.sample(SKILLS, rng.randint(2, 6))
+            years = rng.randint(0, 15)
+            credits = rng.randint(0, 500)
+            if credits:
+                ledger.append(self._opening('freelancer', freelancer_id, credits))
+            last_review = self.last_review[i]
+            yield {
+                '_id': freelancer_id,
+                **person,
+                'username': f'freelancer{i}',
+                'email': f'freelancer{i}@example.com',
+                'password': self.password_hash,
+                'experience': f'{years} years',
+                'description': f"{' / '.join(skills[:2])} freelancer with {years} years of experience.",
+                'skills': skills,
+                'credits': credits,
+                'earnings': counts['earnings'][i],
+                'rating': {
+                    'count': counts['rating_count'][i],
+                    'total': counts['rating_total'][i],
+                    'histogram': {str(star): counts[f'star{star}'][i] for star in RATINGS},
+                    'last_review_at': start + timedelta(seconds=last_review) if last_review else None,
+                },
+                'updated_at': freelancer_id.generation_time.replace(tzinfo=None),
+            }
+
+    def credential_docs(self, client_ids, freelancer_ids):
+        offset = 0
+        for role, ids in (('client', client_ids), ('freelancer', freelancer_ids)):
+            for i, user_id in enumerate(ids):
+                yield {'_id': object_id('credential', offset + i, user_id.generation_time),
+                       'email': f'{role}{i}@example.com', 'role': role, 'user_id': user_id,
+                       'password': self.password_hash}
+            offset += len(ids)
+
+    def project_docs(self, client_ids, freelancer_ids, agreements, reviews):
+        """Yield projects; their agreements and reviews are appended to the given lists."""
+        rng = self._rng('projects')
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        start = self.anchor - HISTORY
+        for i in range(self.projects):
+            created_at = self._created(rng, i, self.projects)
+            project_id = object_id('project', i, created_at)
+            status = rng.choices(statuses, weights)[0]
+            client = rng.randrange(self.clients)
+            budget = rng.choice([50, 100, 250, 500, 1000, 2500, 5000, 10000]) + rng.randint(0, 49)
+            if status == 'Open':
+                deadline = self.anchor + timedelta(days=rng.randint(14, 365))
+            else:
+                deadline = created_at + timedelta(days=rng.randint(7, 120))
+            assigned = status in ('In Progress', 'Completed') or (status == 'Cancelled' and rng.random() < 0.5)
+            freelancer = rng.randrange(self.freelancers) if assigned and self.freelancers else None
+            updated_at = min(created_at + timedelta(days=rng.randint(0, 60)), self.anchor)
+
+            doc = {
+                '_id': project_id,
+                'title': f"{rng.choice(SKILLS)} {rng.choice(['app', 'site', 'redesign', 'audit', 'migration', 'campaign'])} #{i}",
+                'description': 'Looking for help with ' + ', '.join(rng.sample(SKILLS, 2)) + '.',
+                'budget': budget,
+                'deadline': deadline,
+                'status': status,
+                'categories': rng.sample(SKILLS, rng.randint(1, 3)),
+                'client': client_ids[client],
+                'version': 0 if status == 'Open' else (1 if status == 'In Progress' or freelancer is None else 2),
+                'created_at': created_at,
+                'updated_at': updated_at,
+            }
+            field = {'Open': 'open', 'In Progress': 'in_progress', 'Completed': 'completed', 'Cancelled': 'cancelled'}[status]
+            self.client_counts[field][client] += 1
+            if freelancer is not None:
+                agreement_id = object_id('agreement', i, created_at)
+                doc['assigned_freelancer'] = freelancer_ids[freelancer]
+                doc['agreement'] = agreement_id
+                self.freelancer_counts[field][freelancer] += 1
+                agreements.append({
+                    '_id': agreement_id,
+                    'title': f"Agreement for {doc['title']}",
+                    'description': doc['description'],
+                    'client': doc['client'],
+                    'freelancer': doc['assigned_freelancer'],
+                    'project': project_id,
+                    'status': {'In Progress': 'Active', 'Completed': 'Completed', 'Cancelled': 'Terminated'}[status],
+                    'version': 0 if status == 'In Progress' else 1,
+                    'created_at': created_at,
+                    'updated_at': updated_at,
+                })
+                if status == 'Completed':
+                    self.freelancer_counts['earnings'][freelancer] += budget
+                    if rng.random() < REVIEW_RATE:
+                        rating = rng.choices(RATINGS, RATING_WEIGHTS)[0]
+                        reviewed_at = updated_at
+                        reviews.append({
+                            '_id': object_id('review', i, reviewed_at),
+                            'rating': rating,
+                            'comment': rng.choice(['Great work!', 'Delivered on time.', 'Would hire again.',
+                                                   'Good communication.', 'Needed a few revisions.', '']),
+                            'reviewer': doc['client'],
+                            'reviewer_model': 'Client',
+                            'freelancer': doc['assigned_freelancer'],
+                            'created_at': reviewed_at,
+                            'updated_at': reviewed_at,
+                        })
+                        counts = self.freelancer_counts
+                        counts['rating_count'][freelancer] += 1
+                        counts['rating_total'][freelancer] += rating
+                        counts[f'star{rating}'][freelancer] += 1
+                        seconds = (reviewed_at - start).total_seconds()
+                        self.last_review[freelancer] = max(self.last_review[freelancer], seconds)
+            yield doc
+
+    def counter_docs(self, client_ids, freelancer_ids):
+        for i, client_id in enumerate(client_ids):
+            counts = {field: values[i] for field, values in self.client_counts.items()}
+            if any(counts.values()):
+                yield {'_id': client_id, 'role': 'client', **counts, 'earnings': 0}
+        fields = ('in_progress', 'completed', 'cancelled', 'earnings')
+        for i, freelancer_id in enumerate(freelancer_ids):
+            counts = {field: self.freelancer_counts[field][i] for field in fields}
+            if any(counts.values()):
+                yield {'_id': freelancer_id, 'role': 'freelancer', 'open': 0, **counts}
+
+def _insert(collection, docs, batch_size=BATCH_SIZE, on_batch=None):
+    batch = []
+    inserted = 0
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+            batch = []
+            if on_batch:
+                on_batch(collection.name, inserted)
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        inserted += len(batch)
+    return inserted
+
+def generate(db, clients, freelancers, projects, seed=42, anchor=None, password_hash='x', log=print):
+    """Drop the app's collections in ``db`` and fill them; returns ``{collection: count}``.
+
+    Indexes are not built here; run indexes.sync_indexes() afterwards (building
+    them after the load is much faster than maintaining them during it).
+    """
+    if clients < 1:
+        raise ValueError("Need at least one client to own the projects")
+    for name in COLLECTIONS:
+        db.drop_collection(name)
+    gen = Generator(clients, freelancers, projects, seed=seed, anchor=anchor, password_hash=password_hash)
+    client_ids = gen.client_ids()
+    freelancer_ids = gen.freelancer_ids()
+
+    def progress(name, inserted):
+        if inserted % (BATCH_SIZE * 20) == 0:
+            log(f"  {name}: {inserted}")
+
+    counts = {}
+    children = {'agreements': [], 'reviews': [], 'transactions': []}
+
+    def flush(force=False):
+        # Child documents go out in batches as their parents produce them
+        for name, pending in children.items():
+            if pending and (force or len(pending) >= BATCH_SIZE):
+                db[name].insert_many(pending, ordered=False)
+                counts[name] = counts.get(name, 0) + len(pending)
+                pending.clear()
+
+    def flushing(docs):
+        for doc in docs:
+            yield doc
+            flush()
+
+    projects = gen.project_docs(client_ids, freelancer_ids, children['agreements'], children['reviews'])
+    counts['projects'] = _insert(db.projects, flushing(projects), on_batch=progress)
+    # Profiles after the projects: rating summaries and earnings come from them
+    counts['clients'] = _insert(db.clients, flushing(gen.client_docs(client_ids, children['transactions'])),
+                                on_batch=progress)
+    counts['freelancers'] = _insert(db.freelancers, flushing(gen.freelancer_docs(freelancer_ids, children['transactions'])),
+                                    on_batch=progress)
+    flush(force=True)
+    counts['credentials'] = _insert(db.credentials, gen.credential_docs(client_ids, freelancer_ids), on_batch=progress)
+    counts['activity_counters'] = _insert(db.activity_counters, gen.counter_docs(client_ids, freelancer_ids))
+    log(f"Generated {counts} (seed={seed}, anchor={gen.anchor.date().isoformat()})")
+    return counts
@@ -0,0 +1,362 @@
+# benchmarks/loadtest.py
+#
+# End-to-end load test: seeds synthetic data (benchmarks/datagen.py), then
+# drives every blueprint route through the Flask test client against the
+# bench mongod and reports throughput, p50/p99 latency and MongoDB commands
+# per request for each route. Results are written as JSON, one file per
+# commit, so two runs can be diffed:
+#
+#   python -m benchmarks.loadtest                                   # seed + run
+#   python -m benchmarks.loadtest --no-seed --requests 500 --route 'api_v1.*'
+#   python -m benchmarks.loadtest --compare results/loadtest-abc1234.json results/loadtest-def5678.json
+#
+# Routes that change data get fresh documents made for each request, outside
+# the timed and counted part, so every run exercises the same work.
+
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.common import BENCH_MONGO_URI, connect_bench_db, percentile, query_counter
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SAMPLE_SIZE = 1000  # ids of each kind the scenarios pick from
+PASSWORD = 'password123'
+
+class Context:
+    # Sampled ids of the seeded data, plus factories for throwaway documents
+    def __init__(self, db):
+        self.db = db
+        self.serial = 0
+
+        def sample(collection, match=None, fields=('_id',)):
+            pipeline = ([{'$match': match}] if match else []) + [
+                {'$sample': {'size': SAMPLE_SIZE}}, {'$project': {field: 1 for field in fields}}]
+            return sorted(db[collection].aggregate(pipeline), key=lambda doc: doc['_id'])
+
+        self.clients = [doc['_id'] for doc in sample('clients')]
+        self.freelancers = [doc['_id'] for doc in sample('freelancers')]
+        self.projects = sample('projects', fields=('_id', 'client', 'assigned_freelancer'))
+        self.reviews = sample('reviews', fields=('_id', 'freelancer'))
+        self.agreements = [doc['_id'] for doc in sample('agreements')]
+        self.skills = db.freelancers.distinct('skills')
+        # Generated accounts, whose password is PASSWORD
+        self.logins = [doc['email'] for doc in sample('credentials', {'email': {'$regex': r'^(client|freelancer)\d+@'}},
+                                                       fields=('_id', 'email'))]
+        if not (self.clients and self.freelancers and self.projects):
+            raise SystemExit("The bench database has no data; run without --no-seed")
+
+    def _next(self):
+        self.serial += 1
+        return f'{os.getpid()}x{self.serial}'
+
+    def new_client(self):
+        tag = self._next()
+        client_id = self.db.clients.insert_one({
+            'username': f'lt-client-{tag}', 'email': f'lt-client-{tag}@example.com', 'password': 'x',
+            'first_name': 'Load', 'last_name': 'Test', 'updated_at': datetime.utcnow(),
+        }).inserted_id
+        self.db.credentials.insert_one({'email': f'lt-client-{tag}@example.com', 'role': 'client',
+                                        'user_id': client_id, 'password': 'x'})
+        return client_id
+
+    def new_freelancer(self):
+        tag = self._next()
+        freelancer_id = self.db.freelancers.insert_one({
+            'username': f'lt-freelancer-{tag}', 'email': f'lt-freelancer-{tag}@example.com', 'password': 'x',
+            'first_name': 'Load', 'last_name': 'Test', 'skills': ['Python'], 'updated_at': datetime.utcnow(),
+        }).inserted_id
+        self.db.credentials.insert_one({'email': f'lt-freelancer-{tag}@example.com', 'role': 'freelancer',
+                                        'user_id': freelancer_id, 'password': 'x'})
+        return freelancer_id
+
+    def new_project(self, client_id, status='Open', freelancer_id=None):
+        now = datetime.utcnow()
+        return self.db.projects.insert_one({
+            'title': 'Load test project', 'description': 'Throwaway', 'budget': 500,
+            'deadline': now + timedelta(days=30), 'status': status, 'categories': ['Python'],
+            'client': client_id, 'assigned_freelancer': freelancer_id, 'version': 0,
+            'created_at': now, 'updated_at': now,
+        }).inserted_id
+
+    def new_review(self, freelancer_id, client_id):
+        now = datetime.utcnow()
+        return self.db.reviews.insert_one({
+            'rating': 4, 'comment': 'Throwaway', 'reviewer': client_id, 'reviewer_model': 'Client',
+            'freelancer': freelancer_id, 'created_at': now, 'updated_at': now,
+        }).inserted_id
+
+def _form(**fields):
+    return {'data': fields}
+
+def scenarios(ctx):
+    """endpoint -> build(rng) returning (method, url, test client kwargs).
+
+    ``weight`` scales the request count for routes dominated by bcrypt.
+    """
+    pick = lambda rng, items: items[rng.randrange(len(items))]
+    client = lambda rng: pick(rng, ctx.clients)
+    freelancer = lambda rng: pick(rng, ctx.freelancers)
+    project = lambda rng: pick(rng, ctx.projects)
+    assigned = [p for p in ctx.projects if p.get('assigned_freelancer')] or ctx.projects
+    review = lambda rng: pick(rng, ctx.reviews) if ctx.reviews else {'_id': ObjectId(), 'freelancer': freelancer(rng)}
+    skill = lambda rng: pick(rng, ctx.skills) if ctx.skills else 'Python'
+
+    def login(rng):
+        email = pick(rng, ctx.logins) if ctx.logins else 'nobody@example.com'
+        return 'POST', '/auth/login', _form(email=email, password=PASSWORD)
+
+    def register(role):
+        def build(rng):
+            tag = ctx._next()
+            fields = {'email': f'lt-reg-{role}-{tag}@example.com', 'password': PASSWORD,
+                      'username': f'lt-reg-{role}-{tag}', 'first_name': 'Load', 'last_name': 'Test',
+                      'profilePhoto': (io.BytesIO(b''), '')}
+            return 'POST', f'/auth/register/{role}', {'data': fields, 'content_type': 'multipart/form-data'}
+        return build
+
+    def assign(rng):
+        client_id = ctx.new_client()
+        project_id = ctx.new_project(client_id)
+        return 'POST', f'/api/clients/{client_id}/projects/{project_id}/assign-freelancer', \
+            _form(freelancerId=str(freelancer(rng)))
+
+    def update_project_status(prefix, owner_field):
+        def build(rng):
+            client_id = ctx.new_client()
+            project_id = ctx.new_project(client_id)
+            owner = client_id if owner_field == 'client' else freelancer(rng)
+            return 'POST', f'/api/{prefix}/{owner}/projects/{project_id}/edit', _form(
+                title='Renamed', description='Edited', budget='750', deadline='2031-01-01', status='Cancelled')
+        return build
+
+    def delete_project(prefix):
+        def build(rng):
+            client_id = ctx.new_client()
+            project_id = ctx.new_project(client_id)
+            return 'DELETE', f'/api/{prefix}/{client_id}/projects/{project_id}', {}
+        return build
+
+    def delete_review(rng):
+        freelancer_id = freelancer(rng)
+        review_id = ctx.new_review(freelancer_id, client(rng))
+        return 'DELETE', f'/api/freelancers/{freelancer_id}/reviews/{review_id}', {}
+
+    def get(url):
+        return lambda rng: ('GET', url(rng), {})
+
+    routes = {
+        # auth
+        'auth.login_page': (get(lambda rng: '/auth/login'), 1),
+        'auth.login': (login, 0.1),
+        'auth.logout': (get(lambda rng: '/auth/logout'), 1),
+        'auth.register_client_page': (get(lambda rng: '/auth/register/client'), 1),
+        'auth.register_client': (register('client'), 0.1),
+        'auth.register_freelancer_page': (get(lambda rng: '/auth/register/freelancer'), 1),
+        'auth.register_freelancer': (register('freelancer'), 0.1),
+        # client pages
+        'client.show_clients': (get(lambda rng: '/api/clients/'), 1),
+        'client.show_client': (get(lambda rng: f'/api/clients/{client(rng)}'), 1),
+        'client.edit_client': (get(lambda rng: f'/api/clients/{client(rng)}/edit'), 1),
+        'client.update_client': (lambda rng: ('PUT', f'/api/clients/{client(rng)}',
+                                              _form(description=f'Updated {rng.random()}')), 1),
+        'client.delete_client': (lambda rng: ('DELETE', f'/api/clients/{ctx.new_client()}', {}), 1),
+        'client.client_projects': (get(lambda rng: f'/api/clients/{client(rng)}/projects'), 1),
+        'client.add_project_form': (get(lambda rng: f'/api/clients/{client(rng)}/projects/add'), 1),
+        'client.add_project': (lambda rng: ('POST', f'/api/clients/{client(rng)}/projects/add', _form(
+            title='New', description='Load test', budget='100', deadline='2031-01-01')), 1),
+        'client.edit_project_form': (get(lambda rng: (lambda p: f"/api/clients/{p['client']}/projects/{p['_id']}/edit")(project(rng))), 1),
+        'client.update_project': (update_project_status('clients', 'client'), 1),
+        'client.delete_project': (delete_project('clients'), 1),
+        'client.assign_freelancer': (assign, 1),
+        'client.project_matches': (get(lambda rng: (lambda p: f"/api/clients/{p['client']}/projects/{p['_id']}/matches")(project(rng))), 1),
+        'client.search_freelancers': (get(lambda rng: f'/api/clients/freelancers/search?q={skill(rng)}'), 1),
+        'client.earn_referral_credits': (lambda rng: ('POST', f'/api/clients/{client(rng)}/earn-referral-credits', {}), 1),
+        'client.post_project': (lambda rng: ('POST', f'/api/clients/{client(rng)}/post-project', _form(projectCost='1')), 1),
+        # freelancer pages
+        'freelancer.show_freelancers': (get(lambda rng: '/api/freelancers/'), 1),
+        'freelancer.show_freelancer': (get(lambda rng: f'/api/freelancers/{freelancer(rng)}'), 1),
+        'freelancer.edit_freelancer': (get(lambda rng: f'/api/freelancers/{freelancer(rng)}/edit'), 1),
+        'freelancer.update_freelancer': (lambda rng: ('PUT', f'/api/freelancers/{freelancer(rng)}',
+                                                      _form(description=f'Updated {rng.random()}')), 1),
+        'freelancer.delete_freelancer': (lambda rng: ('DELETE', f'/api/freelancers/{ctx.new_freelancer()}', {}), 1),
+        'freelancer.freelancer_projects': (get(lambda rng: f'/api/freelancers/{freelancer(rng)}/projects'), 1),
+        'freelancer.add_project_form': (get(lambda rng: f'/api/freelancers/{freelancer(rng)}/projects/add'), 1),
+        'freelancer.add_project': (lambda rng: ('POST', f'/api/freelancers/{freelancer(rng)}/projects/add', _form(
+            title='New', description='Load test', budget='100', deadline='2031-01-01')), 1),
+        'freelancer.edit_project_form': (get(lambda rng: (lambda p: f"/api/freelancers/{p['assigned_freelancer']}/projects/{p['_id']}/edit")(pick(rng, assigned))), 1),
+        'freelancer.update_project': (update_project_status('freelancers', 'freelancer'), 1),
+        'freelancer.delete_project': (delete_project('freelancers'), 1),
+        'freelancer.freelancer_reviews': (get(lambda rng: f'/api/freelancers/{freelancer(rng)}/reviews'), 1),
+        'freelancer.create_review': (lambda rng: ('POST', f'/api/freelancers/{freelancer(rng)}/reviews',
+                                                  _form(rating='5', comment='Load test')), 1),
+        'freelancer.edit_review_form': (get(lambda rng: (lambda r: f"/api/freelancers/{r['freelancer']}/reviews/{r['_id']}/edit")(review(rng))), 1),
+        'freelancer.update_review': (lambda rng: (lambda r: ('POST', f"/api/freelancers/{r['freelancer']}/reviews/{r['_id']}/edit",
+                                                             _form(rating=str(rng.randint(1, 5)), comment='Edited')))(review(rng)), 1),
+        'freelancer.delete_review': (delete_review, 1),
+        # JSON API
+        'api_v1.list_clients': (get(lambda rng: '/api/v1/clients'), 1),
+        'api_v1.get_client': (get(lambda rng: f'/api/v1/clients/{client(rng)}'), 1),
+        'api_v1.client_dashboard': (get(lambda rng: f'/api/v1/clients/{client(rng)}/dashboard'), 1),
+        'api_v1.client_projects': (get(lambda rng: f'/api/v1/clients/{client(rng)}/projects'), 1),
+        'api_v1.client_reviews': (get(lambda rng: f'/api/v1/clients/{client(rng)}/reviews'), 1),
+        'api_v1.client_agreements': (get(lambda rng: f'/api/v1/clients/{client(rng)}/agreements'), 1),
+        'api_v1.client_transactions': (get(lambda rng: f'/api/v1/clients/{client(rng)}/transactions'), 1),
+        'api_v1.list_freelancers': (get(lambda rng: '/api/v1/freelancers'), 1),
+        'api_v1.get_freelancer': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}'), 1),
+        'api_v1.freelancer_dashboard': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}/dashboard'), 1),
+        'api_v1.freelancer_projects': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}/projects'), 1),
+        'api_v1.freelancer_reviews': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}/reviews'), 1),
+        'api_v1.freelancer_agreements': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}/agreements'), 1),
+        'api_v1.freelancer_transactions': (get(lambda rng: f'/api/v1/freelancers/{freelancer(rng)}/transactions'), 1),
+        'api_v1.marketplace_feed': (get(lambda rng: f"/api/v1/marketplace/projects?category={skill(rng)}&sort={rng.choice(['recent', 'budget_desc'])}"), 1),
+        'api_v1.get_project': (get(lambda rng: f"/api/v1/projects/{project(rng)['_id']}"), 1),
+        'api_v1.project_history': (get(lambda rng: f"/api/v1/projects/{project(rng)['_id']}/history"), 1),
+        'api_v1.get_agreement': (get(lambda rng: f'/api/v1/agreements/{pick(rng, ctx.agreements) if ctx.agreements else ObjectId()}'), 1),
+    }
+    return routes
+
+def run_route(test_client, build, rng, requests, warmup):
+    for _ in range(warmup):
+        method, url, kwargs = build(rng)
+        test_client.open(url, method=method, **kwargs).close()
+
+    samples, queries, statuses = [], [], Counter()
+    started = time.perf_counter()
+    for _ in range(requests):
+        method, url, kwargs = build(rng)  # setup stays outside the timed, counted part
+        with query_counter.count():
+            start = time.perf_counter()
+            response = test_client.open(url, method=method, **kwargs)
+            response.get_data()
+            samples.append(time.perf_counter() - start)
+        response.close()
+        queries.append(query_counter.total())
+        statuses[str(response.status_code)] += 1
+    busy = sum(samples)
+    return {
+        'requests': requests,
+        'throughput_rps': round(requests / busy, 1) if busy else None,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'mean_ms': round(busy / requests * 1000, 3),
+        'queries_per_request': round(sum(queries) / requests, 2),
+        'max_queries': max(queries),
+        'status_codes': dict(sorted(statuses.items())),
+        'wall_s': round(time.perf_counter() - started, 3),
+    }
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                         stderr=subprocess.DEVNULL).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             text=True, stderr=subprocess.DEVNULL).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+def compare(old_path, new_path, threshold):
+    # Exit status 1 when a route got slower than ``threshold`` or issues more queries
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'route':<36} {'p50 ms':>18} {'p99 ms':>18} {'queries':>12}")
+    regressed = []
+    for name in sorted(set(old['routes']) | set(new['routes'])):
+        before, after = old['routes'].get(name), new['routes'].get(name)
+        if before is None or after is None:
+            print(f"{name:<36} {'only in ' + ('new' if before is None else 'old'):>18}")
+            continue
+        slower = after['p50_ms'] > before['p50_ms'] * (1 + threshold)
+        more_queries = after['queries_per_request'] > before['queries_per_request']
+        flag = ' <-- ' + ', '.join(label for label, hit in (('slower', slower), ('more queries', more_queries)) if hit) \
+            if slower or more_queries else ''
+        if flag:
+            regressed.append(name)
+        print(f"{name:<36} {before['p50_ms']:>8.2f} {after['p50_ms']:>8.2f} {before['p99_ms']:>8.2f} {after['p99_ms']:>8.2f}"
+              f" {before['queries_per_request']:>5.1f} {after['queries_per_request']:>5.1f}{flag}")
+    print(f"{len(regressed)} regressed route(s)" if regressed else "No regressions.")
+    return 1 if regressed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive every route and record latency and query counts.")
+    parser.add_argument('--clients', type=int, default=int(os.environ.get('BENCH_CLIENTS', '2000')))
+    parser.add_argument('--freelancers', type=int, default=int(os.environ.get('BENCH_FREELANCERS', '5000')))
+    parser.add_argument('--projects', type=int, default=int(os.environ.get('BENCH_PROJECTS', '20000')))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help="reuse the data already in the bench database")
+    parser.add_argument('--requests', type=int, default=200, help="timed requests per route")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--route', action='append', help="only routes matching this endpoint glob (repeatable)")
+    parser.add_argument('--output', help="result file (default benchmarks/results/loadtest-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="diff two result files and exit")
+    parser.add_argument('--threshold', type=float, default=0.2, help="p50 slowdown counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.services import indexes, passwords
+    from benchmarks import datagen
+
+    with flask_app.app_context():
+        if args.no_seed:
+            dataset = {name: db[name].estimated_document_count() for name in datagen.COLLECTIONS}
+        else:
+            dataset = datagen.generate(db, args.clients, args.freelancers, args.projects, seed=args.seed,
+                                       password_hash=passwords.hash_password(PASSWORD))
+            indexes.sync_indexes(log=lambda *_: None)
+            dataset['seed'] = args.seed
+        ctx = Context(db)
+
+    routes = scenarios(ctx)
+    missing = {rule.endpoint for rule in flask_app.url_map.iter_rules() if '.' in rule.endpoint} - set(routes)
+    if missing:
+        print(f"note: no scenario for {', '.join(sorted(missing))}")
+
+    rng = random.Random(args.seed)
+    test_client = flask_app.test_client()
+    results = {}
+    for name, (build, weight) in routes.items():
+        if args.route and not any(fnmatch.fnmatch(name, pattern) for pattern in args.route):
+            continue
+        requests = max(1, int(args.requests * weight))
+        results[name] = run_route(test_client, build, rng, requests, args.warmup if weight == 1 else 1)
+        r = results[name]
+        print(f"{name:<36} {r['throughput_rps']:>8} req/s  p50={r['p50_ms']:8.2f} ms  p99={r['p99_ms']:8.2f} ms"
+              f"  queries={r['queries_per_request']:5.1f}  {r['status_codes']}")
+
+    commit, dirty = git_revision()
+    report = {
+        'meta': {
+            'commit': commit + ('-dirty' if dirty else ''),
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'mongo': BENCH_MONGO_URI.rsplit('@', 1)[-1],  # never the credentials
+            'dataset': dataset,
+            'requests_per_route': args.requests,
+        },
+        'routes': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True, default=str)
+    print(f"Wrote {output}")
+
+if __name__ == '__main__':
+    main()
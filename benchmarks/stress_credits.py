@@ -0,0 +1,95 @@
+# benchmarks/stress_credits.py
+#
+# Hammers one account with parallel debits and checks the ledger invariants:
+# never overdrawn, exactly balance / cost debits succeed, one ledger row per
+# successful debit, retried idempotency keys charge once, and the balance
+# rebuilt from snapshots matches the profile. Exits non-zero on the first
+# violation.
+#
+#   python -m benchmarks.stress_credits
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from benchmarks.common import connect_bench_db
+
+DEBITS = int(os.environ.get('BENCH_DEBITS', '500'))
+THREADS = int(os.environ.get('BENCH_THREADS', '64'))
+BALANCE = DEBITS * 3 // 5  # enough for some of the debits only
+RETRIED_KEYS = 20
+
+def check(label, ok, detail=""):
+    print(f"{'ok  ' if ok else 'FAIL'} {label} {detail}")
+    if not ok:
+        sys.exit(1)
+
+def attempt(fn):
+    from app.services import credits
+    try:
+        fn()
+        return "debited"
+    except credits.InsufficientCredits:
+        return "insufficient"
+    except credits.RequestInProgress:
+        return "in progress"
+
+def main():
+    db = connect_bench_db()
+    from app import app as flask_app
+    from app.models.client import Client
+    from app.models.transaction import Transaction, CreditSnapshot
+    from app.services import credits
+
+    for name in ('clients', 'transactions', 'credit_snapshots'):
+        db.drop_collection(name)
+    Transaction.ensure_indexes()
+    CreditSnapshot.ensure_indexes()
+    account = Client(username='spender', email='spender@example.com', password='x').save()
+
+    with flask_app.app_context():
+        credits.credit("client", account.id, BALANCE, "purchase")
+
+        def debit():
+            with flask_app.app_context():
+                return attempt(lambda: credits.debit("client", account.id, 1, "project_post"))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(THREADS) as pool:
+            outcomes = list(pool.map(lambda _: debit(), range(DEBITS)))
+        elapsed = time.perf_counter() - start
+        print(f"--- {DEBITS} debits of 1 credit from a balance of {BALANCE}, {THREADS} threads, "
+              f"{DEBITS / elapsed:,.0f} debits/s")
+
+        balance = Client.objects(id=account.id).only('credits').as_pymongo().first()['credits']
+        rows = Transaction.objects(user=account.id, kind="project_post").count()
+        check("never overdrawn", balance >= 0, f"balance={balance}")
+        check("every affordable debit succeeded", outcomes.count("debited") == BALANCE,
+              f"succeeded={outcomes.count('debited')} expected={BALANCE}")
+        check("one ledger row per debit", rows == outcomes.count("debited"), f"rows={rows}")
+
+        # Retries: every key sent from several threads at once
+        credits.credit("client", account.id, RETRIED_KEYS, "purchase")
+
+        def retried(i):
+            with flask_app.app_context():
+                return attempt(lambda: credits.debit("client", account.id, 1, "project_post",
+                                                     idempotency_key=f"retry-{i % RETRIED_KEYS}"))
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(retried, range(RETRIED_KEYS * 10)))
+        balance = Client.objects(id=account.id).only('credits').as_pymongo().first()['credits']
+        keyed = Transaction.objects(user=account.id, idempotency_key__startswith="retry-").count()
+        check("retried keys charged once", keyed == RETRIED_KEYS and balance == 0,
+              f"rows={keyed} balance={balance}")
+
+        pending = Client.objects(id=account.id).only('pending_credits').as_pymongo().first().get('pending_credits')
+        check("nothing left pending", not pending, f"pending={len(pending or [])}")
+        credits.snapshot(settle=timedelta(0))
+        check("ledger balance matches profile", credits.ledger_balance(account.id) == balance,
+              f"ledger={credits.ledger_balance(account.id)} profile={balance}")
+        check("no drift reported", not credits.audit("client", [account.id]))
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,35 @@ from dotenv import load_dotenv
 # Load environment variables from .env
 load_dotenv()
 
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return None if value.lower() == 'none' else int(value)
+
 class Config:
-    # MongoDB Connection URI
-    MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/freelaunch'
+    # MongoDB Connection URI (the database name is taken from it)
+    MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/sureConnectPython'
+
+    # MongoDB connection pool, per process: a deployment opens up to
+    # workers x MONGO_MAX_POOL_SIZE connections
+    MONGO_MAX_POOL_SIZE = _env_int('MONGO_MAX_POOL_SIZE', 50)
+    MONGO_MIN_POOL_SIZE = _env_int('MONGO_MIN_POOL_SIZE', 0)
+    MONGO_MAX_IDLE_TIME_MS = _env_int('MONGO_MAX_IDLE_TIME_MS', 300000)
+    MONGO_CONNECT_TIMEOUT_MS = _env_int('MONGO_CONNECT_TIMEOUT_MS', 5000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)
+    MONGO_SOCKET_TIMEOUT_MS = _env_int('MONGO_SOCKET_TIMEOUT_MS', None)  # None: wait for slow queries
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS', None)  # wait for a pooled connection
 
-    # Secret key for sessions and JWT
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'supersecretkey'
+    # Secret key for sessions and JWT. Every process must share them, so set
+    # them in the environment; without one each process makes up its own.
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or os.environ.get('JWT_SECRET') or SECRET_KEY
+    SECRET_KEY_REQUIRED = False
 
     # Debug mode (set to False in production)
-    DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
\ No newline at end of file
+    DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
+
+class ProductionConfig(Config):
+    DEBUG = False
+    SECRET_KEY_REQUIRED = True  # refuse to start with per-process keys
@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+#
+# Pre-fork serving: the master imports the app once (preload_app) and forks
+# the workers, each of which then opens its own MongoDB connection pool
+# (post_fork). Pool size and timeouts come from config.Config (MONGO_*).
+#
+# Reloads, without dropping requests:
+#   kill -HUP <master>     new workers replace the old ones once these finish
+#                          their requests; with preload_app this reuses the code
+#                          loaded at start, so to deploy new code either set
+#                          GUNICORN_PRELOAD=false or do a binary upgrade:
+#   kill -USR2 <master>    start a second master on the new code, then
+#   kill -WINCH <old>      stop the old workers and
+#   kill -QUIT <old>       the old master.
+#
+# Environment:
+#   BIND                 address to listen on (default 0.0.0.0:8000)
+#   WEB_CONCURRENCY      worker processes (default 2 x CPUs + 1)
+#   GUNICORN_THREADS     threads per worker (default 4)
+#   GUNICORN_PRELOAD     import the app in the master before forking (default true)
+#   GUNICORN_TIMEOUT     seconds before a stuck worker is killed (default 30)
+
+import multiprocessing
+import os
+
+os.environ.setdefault('APP_CONFIG', 'config.ProductionConfig')
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then, staggered so they don't all restart at once
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = '-'
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import app, reconnect
+        reconnect(app)
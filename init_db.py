@@ -1,14 +1,43 @@
 # init_db.py
+#
+#   python init_db.py                       # a handful of sample documents
+#   python init_db.py --clients 200000 --freelancers 500000 --projects 2000000 [--seed 42]
+#
+# With sizes, the collections are filled with consistent synthetic data
+# instead (benchmarks/datagen.py); the same seed and --anchor give the same data.
 
-from app import app, db
+import argparse
+from datetime import datetime
+from app import create_app, db
 from app.models.client import Client
 from app.models.freelancer import Freelancer
 from app.models.project import Project
 from app.models.review import Review
 from app.models.agreement import Agreement
 
-# Initialize the Flask application
-with app.app_context():
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Initialize the database with sample or synthetic data.")
+parser.add_argument('--clients', type=int, help="generate this many clients")
+parser.add_argument('--freelancers', type=int, default=0)
+parser.add_argument('--projects', type=int, default=0)
+parser.add_argument('--seed', type=int, default=42)
+parser.add_argument('--anchor', type=datetime.fromisoformat, help="date the data ends at (default: today)")
+parser.add_argument('--password', default="password123", help="password of every generated account")
+args = parser.parse_args()
+
+def generate_data():
+    from benchmarks.datagen import generate
+    from app.services import indexes, passwords
+
+    # One hash shared by every account; hashing millions would take hours
+    counts = generate(db.get_db(), args.clients, args.freelancers, args.projects, seed=args.seed,
+                      anchor=args.anchor, password_hash=passwords.hash_password(args.password))
+    print("Building indexes...")
+    indexes.sync_indexes()
+    print(f"Database initialized with synthetic data: {counts}")
+
+def sample_data():
     # Drop existing collections (optional)
     db.get_db().drop_collection('clients')
     db.get_db().drop_collection('freelancers')
@@ -94,4 +123,11 @@ with app.app_context():
     )
     agreement1.save()
 
-    print("Database initialized with sample data.")
\ No newline at end of file
+    print("Database initialized with sample data.")
+
+# Initialize the Flask application
+with app.app_context():
+    if args.clients:
+        generate_data()
+    else:
+        sample_data()
@@ -0,0 +1,23 @@
+# migrate_relations.py
+#
+# One-off: move the reference arrays that used to live inside client and
+# freelancer documents (reviews, projects, applied_projects,
+# transaction_history, agreements) onto their child collections, then unset
+# the arrays. Safe to rerun.
+#
+#   python migrate_relations.py              # backfill and unset
+#   python migrate_relations.py --keep-arrays
+
+import argparse
+from app import create_app
+from app.services import relations
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Move profile reference arrays into child collections.")
+parser.add_argument('--keep-arrays', action='store_true', help="backfill only; leave the arrays in place")
+parser.add_argument('--batch-size', type=int, default=500)
+args = parser.parse_args()
+
+with app.app_context():
+    relations.migrate(batch_size=args.batch_size, drop_arrays=not args.keep_arrays)
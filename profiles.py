@@ -0,0 +1,62 @@
+# profiles.py
+#
+# Merge the profiles captured by live workers (see app/services/profiling.py)
+# and rank functions by cumulative time.
+#
+#   python profiles.py                                   # every cProfile capture
+#   python profiles.py --endpoint 'freelancer.*' --since 2026-10-01 --top 40
+#   python profiles.py --endpoint client.show_clients --output show_clients.prof   # for snakeviz etc.
+#   python profiles.py --stacks --endpoint freelancer.freelancer_reviews > reviews.folded
+#
+# With --stacks, the sampled collapsed stacks are merged instead and written
+# to stdout (flamegraph.pl reviews.folded > reviews.svg), with a ranking of
+# functions by inclusive samples on stderr.
+
+import argparse
+import sys
+from collections import Counter
+from datetime import datetime
+from app import create_app
+from app.services import profiling
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Merge and rank captured profiles.")
+parser.add_argument('--dir', help="profile directory (default PROFILING_DIR)")
+parser.add_argument('--endpoint', help="only these endpoints (glob, e.g. 'api_v1.*')")
+parser.add_argument('--since', type=datetime.fromisoformat, help="only captures from this UTC time on")
+parser.add_argument('--top', type=int, default=25, help="functions to list")
+parser.add_argument('--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'])
+parser.add_argument('--output', help="also write the merged cProfile stats here")
+parser.add_argument('--stacks', action='store_true', help="merge sampled collapsed stacks instead")
+args = parser.parse_args()
+
+with app.app_context():
+    directory = args.dir or app.config['PROFILING_DIR']
+
+try:
+    if args.stacks:
+        counts, files = profiling.merge_stacks(directory, args.endpoint, args.since)
+    else:
+        stats, files = profiling.merge_profiles(directory, args.endpoint, args.since)
+except FileNotFoundError:
+    sys.exit(f"No profile directory at {directory}")
+if not files:
+    sys.exit("No matching profiles.")
+
+if args.stacks:
+    for stack, count in counts.most_common():
+        print(f"{stack} {count}")
+    # A function counts once per sample it appears in, however deep it recursed
+    total, inclusive = sum(counts.values()), Counter()
+    for stack, count in counts.items():
+        for frame in set(stack.split(';')[1:]):
+            inclusive[frame] += count
+    print(f"{total} samples from {files} file(s)", file=sys.stderr)
+    for frame, count in inclusive.most_common(args.top):
+        print(f"{count / total:7.1%}  {frame}", file=sys.stderr)
+else:
+    print(f"{files} profile(s) merged")
+    stats.sort_stats(args.sort).print_stats(args.top)
+    if args.output:
+        stats.dump_stats(args.output)
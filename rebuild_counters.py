@@ -0,0 +1,14 @@
+# rebuild_counters.py
+#
+# Recompute every client's and freelancer's activity counters (and freelancer
+# earnings) from the projects collection. Safe to rerun; schedule it
+# periodically (or queue a "workflow.rebuild_counters" job) to repair drift.
+
+from app import create_app
+from app.services import workflow
+
+app = create_app(web=False)
+
+with app.app_context():
+    changed = workflow.rebuild_counters()
+    print(f"Updated {changed} activity counters.")
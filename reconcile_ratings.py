@@ -0,0 +1,14 @@
+# reconcile_ratings.py
+#
+# Rebuild every freelancer's rating summary from the reviews collection.
+# Safe to rerun; schedule it periodically (or queue a "ratings.reconcile" job)
+# to repair drift.
+
+from app import create_app
+from app.services import ratings
+
+app = create_app(web=False)
+
+with app.app_context():
+    changed = ratings.reconcile()
+    print(f"Updated {changed} rating summaries.")
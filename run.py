@@ -1,4 +1,5 @@
 from app import app  # Import the Flask app from the app package
 
 if __name__ == '__main__':
-    app.run(debug=True)  # Start the Flask development server with debug mode enabled
\ No newline at end of file
+    # Development server; in production serve wsgi:app with gunicorn (gunicorn.conf.py)
+    app.run(debug=app.config['DEBUG'])
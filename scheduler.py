@@ -0,0 +1,27 @@
+# scheduler.py
+#
+# Deadline scheduler: expires overdue projects and unsigned agreements and
+# archives old expired projects (see app/services/scheduler.py). Running
+# more than one is safe; only the lease holder works.
+#
+#   python scheduler.py               # tick forever
+#   python scheduler.py --once        # one tick, e.g. from cron
+
+import argparse
+import logging
+from app import create_app
+from app.services import scheduler
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Act on project and agreement deadlines.")
+parser.add_argument('--once', action='store_true', help="tick once (if the lease is free) and exit")
+parser.add_argument('--interval', type=float, help="seconds between ticks (default SCHEDULER_INTERVAL)")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO)
+
+with app.app_context():
+    results = scheduler.run(interval=args.interval, once=args.once)
+    if args.once:
+        print(results if results is not None else "Lease held by another scheduler; nothing done.")
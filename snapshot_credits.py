@@ -0,0 +1,23 @@
+# snapshot_credits.py
+#
+# Finish ledger entries left pending by dead requests, then snapshot every
+# account balance that changed since the last run. Schedule it periodically
+# (or queue a "credits.snapshot" job). On the first run pass --open to write
+# opening rows for balances that predate the ledger.
+
+import argparse
+from app import create_app
+from app.services import credits
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Snapshot credit balances from the transaction ledger.")
+parser.add_argument('--open', action='store_true', help="first write opening rows for pre-ledger balances")
+args = parser.parse_args()
+
+with app.app_context():
+    for role in credits.PROFILE_MODELS:
+        if args.open:
+            print(f"{role}: {credits.open_balances(role)} opening balances written")
+        print(f"{role}: {credits.recover(role)} pending entries recovered")
+    print(f"Wrote {credits.snapshot()} snapshots.")
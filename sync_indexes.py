@@ -0,0 +1,34 @@
+# sync_indexes.py
+#
+# Creates / reconciles the indexes declared in app/models/*.py and prints the
+# query plan of every registered query shape. Exits non-zero if an index
+# conflict is left unresolved or a shape falls back to a COLLSCAN, so it can
+# gate a deploy.
+#
+#   python sync_indexes.py            # create missing indexes, explain shapes
+#   python sync_indexes.py --prune    # also drop undeclared / conflicting indexes
+#   python sync_indexes.py --explain-only
+
+import argparse
+import sys
+from app import create_app
+from app.services.indexes import sync_indexes, explain_shapes
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Sync MongoDB indexes and explain hot query shapes.")
+parser.add_argument('--prune', action='store_true', help="drop indexes that are no longer declared")
+parser.add_argument('--explain-only', action='store_true', help="skip index creation")
+args = parser.parse_args()
+
+with app.app_context():
+    ok = True
+    if not args.explain_only:
+        ok = sync_indexes(prune=args.prune)
+
+    print()
+    collscans = explain_shapes()
+    if collscans:
+        print(f"\nCOLLSCAN regressions: {', '.join(collscans)}")
+
+    sys.exit(0 if ok and not collscans else 1)
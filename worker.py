@@ -0,0 +1,26 @@
+# worker.py
+#
+# Background job worker. Run one or more of these next to the web processes:
+#
+#   python worker.py                   # poll forever
+#   python worker.py --burst           # drain the queue and exit
+#   python worker.py --kind thumbnails
+
+import argparse
+import logging
+from app import create_app
+from app.services import jobs
+
+app = create_app(web=False)
+
+parser = argparse.ArgumentParser(description="Process queued background jobs.")
+parser.add_argument('--kind', action='append', help="only run jobs of this kind (repeatable)")
+parser.add_argument('--burst', action='store_true', help="exit when the queue is empty")
+parser.add_argument('--poll-interval', type=float, default=1.0, help="seconds to sleep when idle")
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO)
+
+with app.app_context():
+    processed = jobs.run_worker(kinds=args.kind, poll_interval=args.poll_interval, burst=args.burst)
+    print(f"Processed {processed} jobs.")
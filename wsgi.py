@@ -0,0 +1,8 @@
+# wsgi.py
+#
+# Production entry point. Serve with gunicorn, which reads gunicorn.conf.py
+# from this directory:
+#
+#   SECRET_KEY=... MONGO_URI=mongodb://db:27017/sureConnectPython gunicorn wsgi:app
+
+from app import app  # noqa: F401